@@ -7,8 +7,31 @@ import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from collections import defaultdict
 import sys
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Iterator, Callable, Set
 import csv
+import threading
+import functools
+import heapq
+import contextlib
+import atexit
+import argparse
+import codecs
+import mmap
+import signal
+import uuid
+import hashlib
+import html
+import re
+import zlib
+import asyncio
+import ctypes
+import select
+import socket
+import struct
+import queue
+from collections.abc import Mapping, Sequence
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 # ======================
 # 🎨 UI Configuration
@@ -31,359 +54,2287 @@ BANNER = f"""
 {COLORS['reset']}
 """
 
-EMOJI_MAP = {
-    "happy": "😊", "tired": "😴", "bored": "😐",
-    "anxious": "😟", "motivated": "💪", "sad": "😢",
-    "stressed": "😤", "overwhelmed": "😵", "confused": "🤔",
-    "inspired": "💡"
-}
-
-ENCOURAGING_REACTIONS = {
-    "happy": "Keep the good vibes rolling! 🌈",
-    "sad": "Sending you a virtual hug 🤗. It's okay to feel this way.",
-    "anxious": "Breathe in... breathe out. You’re doing great 💖. Take it one moment at a time.",
-    "motivated": "Go get 'em, tiger! 🐯 The world awaits your brilliance!",
-    "bored": "Let’s spark some curiosity 🔍! There's a whole world to explore.",
-    "tired": "Rest is productive too 😌. Recharge yourself, you deserve it.",
-    "stressed": "Take a deep breath. You're stronger than you think! 💪",
-    "overwhelmed": "One step at a time. Break it down, you got this! ✨",
-    "confused": "It's okay to not know everything. Let's find some clarity together! 🧭",
-    "inspired": "Oh, the possibilities! Chase that amazing idea! 🌟"
-}
-
 # ======================
 # 📦 Data Configuration
 # ======================
 LOG_FILE = "moodmate_log.json"
 BACKUP_FILE = "moodmate_backup.json"
-MAX_LOG_ENTRIES = 1000  # Prevent log file from growing indefinitely
+MAX_LOG_ENTRIES = 1000  # Prevent log file from growing indefinitely: older entries are rolled up...
+LOG_LOW_WATER = 0.9  # ...down to this share of the cap, so the next appends do not rewrite the log again
 EXPORT_FOLDER = "moodmate_exports"
+SHARD_ROOT = "moodmate_shards"  # Per-user shard directories for multi-user deployments
+ANALYTICS_WORKERS = os.cpu_count() or 1  # Processes used by `--workers` map-reduce analytics
+RETENTION_RAW_DAYS = 365  # Keep individual entries this long, then roll them up per day...
+RETENTION_DAILY_DAYS = 730  # ...and merge daily rollups older than this into weekly ones
+ROLLUP_KEEP_NOTES = True  # Keep short excerpts of the latest notes in each rollup
+COMPACT_INTERVAL_HOURS = 24  # How often compaction runs on its own
+SUMMARY_DAYS = 7  # Days the weekly summary looks back; the entry cap never rolls these up
+CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "moodmate_catalog")  # <locale>.json task catalogs
+CATALOG_CACHE_DIR = os.path.join(os.path.dirname(CATALOG_DIR), "moodmate_cache")  # Compiled catalogs, one per combination of sources
+CATALOG_LOCALE_ENV_VAR = "MOODMATE_LOCALE"  # Catalog language, e.g. "de" for moodmate_catalog/de.json
+CATALOG_ORG_ENV_VAR = "MOODMATE_ORG"  # Overlay moodmate_catalog/orgs/<org>/<locale>.json on top
+DEFAULT_LOCALE = "en"
+DASHBOARD_REFRESH_SECONDS = 1.0  # Live dashboard redraws at this fixed pace...
+DASHBOARD_MAX_EVENTS = 500  # ...applying at most this many changes per redraw
+DASHBOARD_DAYS = 7  # Days in the dashboard's weekly view, today included
+REPORT_FOLDER = "reports"  # Generated reports (and their section cache) inside the export folder
+HISTORY_DEPTH = 100  # Edits and deletes that can still be undone; compaction prunes older history
+HISTORY_OVERLAY_MAX = 256  # Edits kept on top of the stored log before it is rewritten with them
+FEED_POLL_INTERVAL = 0.5  # Seconds between checks when following the change feed without inotify
+CHANGE_LOG_TRUNCATE_MIN = 10000  # Changes every known replica has pulled before they are dropped from the change log
+WRITE_BEHIND_ENV_VAR = "MOODMATE_WRITE_BEHIND"  # Set to 1 to store new entries in the background
+WRITE_BEHIND_BATCH = 32  # Flush as soon as this many entries are queued...
+WRITE_BEHIND_DELAY = 2.0  # ...or this many seconds after the oldest queued entry
 
-# Enhanced Mood Dictionary with categorized tasks
-MOOD_TASKS = {
-    "happy": {
-        "energize": [
-            "Go for a brisk walk outdoors and enjoy the weather, perhaps discovering a new path.",
-            "Listen to your favorite upbeat music and sing along loudly, feeling the rhythm.",
-            "Plan a fun, low-key activity for later today or this week, like a movie night or picnic.",
-            "Do a quick burst of physical activity like dancing, jumping jacks, or a short jog.",
-            "Engage in a favorite sport or physical game.",
-            "Take on a new small challenge that excites you.",
-            "Spend time in natural sunlight.",
-            "Organize a playlist of songs that make you feel good."
-        ],
-        "connect": [
-            "Call or text a friend or family member just to say hello and share positive news.",
-            "Send a thoughtful message to someone you appreciate, expressing your gratitude.",
-            "Share a positive update or a funny anecdote with a loved one.",
-            "Offer a small, genuine compliment to someone you interact with today.",
-            "Plan a virtual coffee break with a distant friend.",
-            "Help a neighbor with a small task.",
-            "Write a thank-you note to someone who made your day.",
-            "Join a social club or group that aligns with your interests."
-        ],
-        "create_and_grow": [
-            "Start a new small creative project you've been wanting to try, like a sketch or a craft.",
-            "Brainstorm new ideas for a personal goal, hobby, or even a community initiative.",
-            "Learn a new interesting fact or skill online, like a simple magic trick or a basic coding command.",
-            "Organize an area of your space that brings you joy, making it more aesthetically pleasing.",
-            "Work on a passion project that aligns with your interests.",
-            "Explore a new app or tool that enhances productivity or creativity.",
-            "Read an inspiring biography or success story.",
-            "Set a new personal best in a hobby or activity."
-        ]
-    },
-    "tired": {
-        "recharge_mind": [
-            "Take a short, restful power nap (20-30 minutes) in a quiet, dark room.",
-            "Listen to a calming audiobook or a gentle, non-demanding podcast.",
-            "Do a quick guided meditation for relaxation, focusing on your breath.",
-            "Close your eyes and practice deep breathing for a few minutes, counting your breaths.",
-            "Rest your eyes by looking out a window at something distant.",
-            "Avoid screen time for 15-30 minutes.",
-            "Practice mindful breathing exercises.",
-            "Do a brief body scan to identify tension."
-        ],
-        "restore_body": [
-            "Drink a full glass of water and rest in a comfortable position.",
-            "Do some gentle stretching or light, restorative yoga poses.",
-            "Take a warm, comforting shower or bath with soothing scents.",
-            "Prepare a simple, nutritious snack like fruit or nuts.",
-            "Give yourself a gentle hand or foot massage.",
-            "Lie down with your legs elevated against a wall.",
-            "Apply a soothing eye mask.",
-            "Wear comfortable, loose clothing."
-        ],
-        "light_engagement": [
-            "Do light reading from a non-demanding book or magazine, or browse a light article online.",
-            "Look at calming images or watch a slow-paced nature video on mute.",
-            "Sit quietly and observe your surroundings without judgment or analysis.",
-            "Listen to instrumental or ambient music that promotes relaxation.",
-            "Do a very simple, repetitive task like folding laundry or tidying a drawer.",
-            "Journal a few unedited thoughts or feelings.",
-            "Sit outside and listen to the sounds of nature.",
-            "Watch clouds or observe simple natural patterns."
-        ]
-    },
-    "bored": {
-        "stimulate_mind": [
-            "Explore a random topic on Wikipedia or an educational website like Khan Academy.",
-            "Watch an educational YouTube video or a short documentary on a new subject.",
-            "Try a new online puzzle game or brain teaser, like Sudoku or a logic puzzle.",
-            "Learn a few new words in a language you're interested in using a flashcard app.",
-            "Research a niche topic you've always wondered about.",
-            "Listen to a podcast about an unusual subject.",
-            "Do a quick online course on a skill you'd like to learn.",
-            "Read a compelling non-fiction article or essay."
-        ],
-        "engage_creativity": [
-            "Doodle, sketch, or color in a coloring book, experimenting with colors.",
-            "Write a short journal entry about anything that comes to mind, a dream, or a hypothetical scenario.",
-            "Organize a digital folder or clean up your desktop files, making it more efficient.",
-            "Plan a hypothetical trip or event, researching destinations, activities, and budget.",
-            "Start a collection of interesting facts or quotes.",
-            "Design a simple graphic or logo for a fictional company.",
-            "Try a simple craft project like origami or making a paper airplane.",
-            "Brainstorm ideas for a fictional story or character."
-        ],
-        "explore_new": [
-            "Discover a new music artist or genre you've never listened to before, and create a playlist.",
-            "Browse an online store for interesting new products or ideas (no pressure to buy anything).",
-            "Try a simple new recipe or mix a new non-alcoholic drink or smoothie.",
-            "Walk a different route than usual if you go outside, observing new details.",
-            "Explore a virtual museum or art gallery online.",
-            "Do an online quiz about a random, fun topic.",
-            "Try a new physical activity for a short period, like juggling or stretching differently.",
-            "Browse through a cookbook for inspiration."
-        ]
-    },
-    "anxious": {
-        "grounding": [
-            "Focus on your breath: inhale slowly for 4, hold for 4, exhale for 6, repeating several times.",
-            "Use the '5-4-3-2-1' technique: name 5 things you see, 4 you feel, 3 you hear, 2 you smell, 1 you taste.",
-            "Hold an ice cube in your hand until it melts, focusing on the cold sensation.",
-            "Press your feet firmly into the ground and notice the sensation, feeling connected to the earth.",
-            "Splash cold water on your face or wrists to reset your system.",
-            "Gently massage your temples or neck.",
-            "Focus on a repetitive action, like snapping your fingers.",
-            "Identify and name objects of a specific color around you."
-        ],
-        "soothe": [
-            "Listen to calming nature sounds (rain, ocean waves) or soft, instrumental music.",
-            "Drink a warm cup of herbal tea slowly and mindfully, noticing its warmth and flavor.",
-            "Take a slow, gentle walk in a quiet area, paying attention to your steps.",
-            "Light a calming scented candle or use an essential oil diffuser with lavender.",
-            "Wrap yourself in a cozy blanket and feel its comfort.",
-            "Do a guided meditation focused on releasing tension.",
-            "Practice mindful eating with a small snack, noticing textures and flavors.",
-            "Look at comforting pictures or photos."
-        ],
-        "process": [
-            "Write down all your worries and thoughts in a journal, then close it and put it away.",
-            "Talk to a trusted friend or family member about how you're feeling, without seeking solutions.",
-            "Do a quick, repetitive task like tidying a small area of your room or desk.",
-            "Allow yourself to feel the emotion without judgment, reminding yourself that it will pass.",
-            "Visualize a safe and peaceful place in your mind.",
-            "Challenge one anxious thought and find evidence against it.",
-            "Do a simple, distracting puzzle or word game.",
-            "Listen to a podcast that diverts your attention."
-        ]
-    },
-    "motivated": {
-        "productivity_boost": [
-            "Start the most important task on your list, even if it's just for 15 minutes to build momentum.",
-            "Break down a large project into its absolute smallest, actionable steps, and tackle one.",
-            "Organize your workspace for optimal efficiency, decluttering distractions.",
-            "Review your goals and select one to make immediate, tangible progress on.",
-            "Block out specific time slots for focused work.",
-            "Use the Pomodoro technique to maintain focus.",
-            "Complete a quick, easy task to build confidence.",
-            "Set a challenging but achievable deadline for a small task."
-        ],
-        "plan_and_strategize": [
-            "Create a detailed plan for an upcoming assignment or project, outlining all stages.",
-            "Set new, challenging but achievable goals for yourself for the next week or month.",
-            "Research advanced topics related to your interests or academic field.",
-            "Update your resume or professional portfolio with your latest achievements.",
-            "Create a visual timeline for a long-term goal.",
-            "Brainstorm potential challenges and proactive solutions.",
-            "Review successful strategies you've used in the past.",
-            "Outline key steps for a new skill acquisition."
-        ],
-        "skill_development": [
-            "Learn a new complex concept by breaking it down and explaining it aloud to yourself.",
-            "Practice a specific skill you want to improve, setting a clear objective.",
-            "Watch an in-depth tutorial or webinar to enhance your knowledge in a specific area.",
-            "Seek out resources (books, articles, experts) to deepen your understanding of a topic.",
-            "Take a short online course related to your field.",
-            "Apply a new technique you've learned in your work.",
-            "Teach a concept to someone else to solidify your understanding.",
-            "Engage in deliberate practice for a specific skill."
-        ]
-    },
-    "sad": {
-        "comfort_and_care": [
-            "Listen to calm, soothing music that brings you peace and allows for quiet reflection.",
-            "Wrap yourself in a cozy blanket and allow yourself to simply rest and feel the emotions.",
-            "Prepare a warm, favorite comforting meal or bake something simple and aromatic.",
-            "Watch an uplifting or heartwarming movie or show that offers a sense of solace.",
-            "Drink a warm beverage like hot chocolate or herbal tea.",
-            "Light a comforting candle and enjoy its glow.",
-            "Take a warm bath with Epsom salts.",
-            "Wear your most comfortable clothes."
-        ],
-        "gentle_connection": [
-            "Call or text a trusted loved one for a supportive chat, even if it's just to listen.",
-            "Spend time with a pet, enjoying their unconditional affection and calming presence.",
-            "Look at old photos that bring back happy memories and cherished connections.",
-            "Do a small, kind act for yourself, like enjoying a favorite snack or a small treat.",
-            "Send a loving text to someone you care about.",
-            "Have a comforting conversation with someone who understands.",
-            "Spend time in a quiet, familiar place with someone you trust.",
-            "Watch an old comfort movie with a loved one."
-        ],
-        "creative_release": [
-            "Write a positive diary entry, focusing on good memories, things you're grateful for, or future hopes.",
-            "Draw, paint, or doodle freely, without pressure for perfection or specific outcome.",
-            "Listen to a guided meditation focused on self-compassion and acceptance.",
-            "Take a break from social media to avoid comparisons or overwhelming content.",
-            "Listen to music that allows you to process your emotions.",
-            "Journal about your feelings without censoring yourself.",
-            "Write a short, reflective poem or piece of prose.",
-            "Engage in a simple craft like knitting or coloring."
-        ]
-    },
-    "stressed": {
-        "physical_release": [
-            "Go for a brisk walk or jog outdoors to clear your head and burn off excess energy.",
-            "Squeeze a stress ball or clench and release your fists several times.",
-            "Do some quick stretches or light exercise like push-ups or squats.",
-            "Put on some energetic music and dance it out for a few minutes.",
-            "Do some vigorous cleaning or organizing to channel energy.",
-            "Take a few minutes to jump rope or do jumping jacks.",
-            "Engage in a short burst of cardio.",
-            "Do a series of progressive muscle relaxations."
-        ],
-        "mental_unload": [
-            "Write down all your worries and concerns on a 'brain dump' list to get them out of your head.",
-            "Prioritize your tasks and identify the single most critical one to focus on.",
-            "Take 5 minutes to plan out the next hour of your day, making it manageable.",
-            "Practice a quick mindfulness exercise for 2-3 minutes, focusing on sounds or sights.",
-            "Do a quick review of your schedule to identify and eliminate any unnecessary commitments.",
-            "Break down a daunting task into tiny, manageable steps.",
-            "Use the 'two-minute rule' for quick tasks.",
-            "Visualize success in a difficult situation."
-        ],
-        "mini_break": [
-            "Step away from your work area and look out a window, observing the outside world.",
-            "Listen to a short, calming audio track or a favorite song.",
-            "Have a healthy snack and a full glass of water, focusing on hydrating.",
-            "Do a few deep belly breaths to activate your parasympathetic nervous system.",
-            "Look at something beautiful or pleasant for a few moments, like a plant or artwork.",
-            "Do a quick crossword puzzle or sudoku.",
-            "Stand up and stretch for 5 minutes.",
-            "Walk to another room and back."
-        ]
-    },
-    "overwhelmed": {
-        "simplify": [
-            "Write down absolutely everything on your mind, then categorize or group similar items.",
-            "Choose only the top 1-3 most important tasks to focus on right now, deferring others.",
-            "Break down a large, daunting task into its absolute smallest, actionable steps.",
-            "Eliminate anything from your list that isn't truly essential or urgent, or postpone it.",
-            "Create an 'ignore list' for things you actively choose not to worry about for now.",
-            "Automate any repetitive tasks if possible.",
-            "Cancel or reschedule non-essential commitments.",
-            "Focus on completing just one small thing."
-        ],
-        "structure": [
-            "Create a very detailed, step-by-step plan for just one specific task.",
-            "Set a timer for 15-20 minutes and work on one thing without distractions, then take a break.",
-            "Organize a small physical or digital workspace area to bring a sense of order.",
-            "Review your calendar and reschedule any non-urgent commitments to free up mental space.",
-            "Use a project management tool or app to visually organize your tasks.",
-            "Create a 'done' list to see your progress.",
-            "Color-code your tasks or notes for better visual organization.",
-            "Set a clear start and end time for your work."
-        ],
-        "seek_support": [
-            "Talk to a mentor, supervisor, or trusted friend about your workload and feelings.",
-            "Ask a friend or colleague for help with a specific task, explaining what you need.",
-            "Communicate your boundaries or needs to others clearly and kindly.",
-            "Take a quick break to connect with someone for emotional support and a different perspective.",
-            "Delegate tasks if you have the option.",
-            "Consider professional support if feelings persist.",
-            "Look for online resources or communities for similar experiences.",
-            "Share your workload concerns with a peer."
-        ]
-    },
-    "confused": {
-        "clarify_information": [
-            "Re-read the instructions or material slowly, focusing on each sentence and key terms.",
-            "Look up unfamiliar terms or concepts immediately using a reliable dictionary or search engine.",
-            "Break the confusing problem down into smaller, simpler components to understand each piece.",
-            "Try to explain the concept aloud to yourself as if teaching someone else, identifying gaps in understanding.",
-            "Highlight or underline key phrases in the confusing text.",
-            "Draw a diagram or flowchart to visualize the information.",
-            "Summarize the information in your own words.",
-            "Search for different explanations or analogies online."
-        ],
-        "seek_external_help": [
-            "Ask a specific, well-articulated question to a teacher, peer, or online forum.",
-            "Review examples or case studies related to the confusing topic to see application.",
-            "Watch an explanatory video or tutorial on the subject from a different source.",
-            "Consult a different textbook or resource for an alternative explanation or perspective.",
-            "Schedule a short meeting with an expert or peer for clarification.",
-            "Collaborate with a classmate on the confusing material.",
-            "Use a Q&A platform to pose your specific question.",
-            "Find a study group to discuss the topic."
-        ],
-        "mental_reset": [
-            "Take a short break (5-10 minutes) to clear your mind completely before returning.",
-            "Do a quick, unrelated mental exercise like a simple puzzle or brain teaser.",
-            "Drink water and do some light physical stretches to refresh your body and mind.",
-            "Return to the problem with fresh eyes after stepping away, often seeing new insights.",
-            "Listen to calming music that doesn't distract you.",
-            "Close your eyes and breathe deeply for a minute.",
-            "Change your study location for a fresh perspective.",
-            "Do something completely different for 15 minutes."
-        ]
-    },
-    "inspired": {
-        "capture_and_develop": [
-            "Immediately write down all your thoughts and ideas, no matter how wild or unformed.",
-            "Create a mind map or concept web to connect different aspects of your inspiration visually.",
-            "Record a voice memo describing your ideas in detail, allowing for free flow.",
-            "Sketch out rough visuals or diagrams if the inspiration is visual, capturing the essence.",
-            "Start a dedicated 'inspiration' journal or digital note file.",
-            "Collect images or sounds that resonate with your idea.",
-            "Freewrite about the implications of your inspiration.",
-            "Create a mood board for the idea."
-        ],
-        "take_action": [
-            "Start a small, actionable step towards realizing your inspired idea, like basic research or an outline.",
-            "Conduct preliminary research on components needed to bring your idea to life.",
-            "Share your idea with someone who can offer constructive feedback or excitement.",
-            "Block out dedicated time in your schedule to work on this new inspiration.",
-            "Create a simple prototype or mock-up.",
-            "Identify the first three steps to move forward.",
-            "Set a mini-deadline for the initial phase.",
-            "Reach out to someone who could help you develop the idea."
-        ],
-        "nurture_flow": [
-            "Listen to music that enhances your creative flow or concentration.",
-            "Visit a place that stimulates your imagination (e.g., museum, park, unique store, art exhibition).",
-            "Read about others who have pursued similar inspirations or creative paths.",
-            "Keep an 'inspiration' journal where you regularly collect new ideas and observations.",
-            "Engage in freeform brainstorming sessions.",
-            "Allow for periods of unstructured thinking.",
-            "Surround yourself with aesthetically pleasing or stimulating objects.",
-            "Take a nature walk to observe patterns and details."
+# ======================
+# 📚 Task Catalog
+# ======================
+# Moods with their categorized tasks, emoji and encouraging reactions live in
+# moodmate_catalog/<locale>.json, optionally overlaid by an organization's
+# moodmate_catalog/orgs/<org>/<locale>.json. The merged catalog is compiled once into
+# moodmate_cache/catalog-<hash of the sources>.jsonl next to moodmate_catalog/ (kept in
+# memory where that is read-only): a first line with a small index (moods, emoji,
+# reactions, and where each mood's tasks are) followed by one line per mood. A start
+# reads only the index; a mood's tasks are read the first time it is used.
+CATALOG_FORMAT = "moodmate-catalog"
+CATALOG_FIELDS = ("emoji", "reactions", "scores")  # Per-mood tables kept in the index
+
+
+def _merge_catalogs(base: Dict, overlay: Dict) -> Dict:
+    """Layers `overlay` over `base`: moods and categories are added or replaced."""
+    merged = {field: {**base.get(field, {}), **overlay.get(field, {})} for field in CATALOG_FIELDS}
+    merged["tasks"] = {mood: dict(categories) for mood, categories in base.get("tasks", {}).items()}
+    for mood, categories in overlay.get("tasks", {}).items():
+        merged["tasks"].setdefault(mood, {}).update(categories)
+    return merged
+
+
+def _read_catalogs(sources: List[str]) -> Dict:
+    catalog: Dict = {}
+    for source in sources:
+        with open(source, 'r', encoding='utf-8') as f:
+            catalog = _merge_catalogs(catalog, json.load(f))
+    return catalog
+
+
+def compile_catalog(sources: List[str], output: str) -> None:
+    """Merges the catalog files in `sources` (later ones win) into the compiled format."""
+    catalog = _read_catalogs(sources)
+    lines, moods, offset = [], {}, 0
+    for mood, categories in catalog["tasks"].items():
+        line = json.dumps(categories, ensure_ascii=False).encode('utf-8') + b"\n"
+        moods[mood] = [offset, len(line)]
+        offset += len(line)
+        lines.append(line)
+    index = json.dumps(
+        {"format": CATALOG_FORMAT, "moods": moods, **{field: catalog[field] for field in CATALOG_FIELDS}},
+        ensure_ascii=False
+    ).encode('utf-8') + b"\n"
+    tmp = f"{output}.{os.getpid()}.tmp" # Other processes may be compiling the same catalog
+    with open(tmp, 'wb') as f:
+        f.write(index)
+        f.writelines(lines)
+    os.replace(tmp, output)
+
+
+class TaskCatalog(Mapping):
+    """Mood -> {category: [tasks]}, loaded from the compiled catalog on first use."""
+
+    def __init__(self, locale: Optional[str] = None, org: Optional[str] = None, directory: str = CATALOG_DIR):
+        self._lock = threading.Lock()
+        self.directory = directory
+        self.configure(locale, org)
+
+    def configure(self, locale: Optional[str] = None, org: Optional[str] = None,
+                  directory: Optional[str] = None) -> None:
+        """Switches locale and organization; nothing is read until the catalog is used."""
+        with self._lock:
+            self.locale = locale or os.environ.get(CATALOG_LOCALE_ENV_VAR) or DEFAULT_LOCALE
+            self.org = org or os.environ.get(CATALOG_ORG_ENV_VAR)
+            self.directory = directory or self.directory
+            self._index: Optional[Dict] = None
+            self._path: Optional[str] = None
+            self._catalog: Optional[Dict] = None # Only when the compiled file could not be written
+            self._moods: Dict[str, Dict[str, List[str]]] = {}
+            self._flat: Dict[str, List[str]] = {}
+
+    def sources(self) -> List[str]:
+        """Catalog files in the order they are layered; unknown locales fall back to DEFAULT_LOCALE."""
+        base = os.path.join(self.directory, f"{self.locale}.json")
+        if not os.path.exists(base):
+            base = os.path.join(self.directory, f"{DEFAULT_LOCALE}.json")
+        sources = [base]
+        if self.org:
+            overlay = os.path.join(self.directory, "orgs", self.org, f"{self.locale}.json")
+            if os.path.exists(overlay):
+                sources.append(overlay)
+        return sources
+
+    def _open(self) -> Dict:
+        """Loads the index, compiling the catalog first if its sources changed."""
+        if self._index is not None:
+            return self._index
+        with self._lock:
+            if self._index is None:
+                sources = self.sources()
+                digest = hashlib.sha256(CATALOG_FORMAT.encode())
+                for source in sources:
+                    with open(source, 'rb') as f:
+                        digest.update(hashlib.sha256(f.read()).digest())
+                path = os.path.join(CATALOG_CACHE_DIR, f"catalog-{digest.hexdigest()[:24]}.jsonl")
+                try:
+                    try:
+                        self._index = self._read_index(path)
+                    except (OSError, ValueError): # Not compiled yet, or unreadable
+                        os.makedirs(CATALOG_CACHE_DIR, exist_ok=True)
+                        compile_catalog(sources, path)
+                        self._index = self._read_index(path)
+                    self._path = path
+                except OSError: # Read-only location: keep the merged catalog in memory instead
+                    self._catalog = _read_catalogs(sources)
+                    self._index = {"moods": dict.fromkeys(self._catalog["tasks"]),
+                                   **{field: self._catalog[field] for field in CATALOG_FIELDS}}
+        return self._index
+
+    def _read_index(self, path: str) -> Dict:
+        with open(path, 'rb') as f:
+            line = f.readline()
+        index = json.loads(line)
+        if not isinstance(index, dict) or index.get("format") != CATALOG_FORMAT:
+            raise ValueError(f"'{path}' is not a compiled MoodMate catalog")
+        index["data_start"] = len(line)
+        return index
+
+    def __getitem__(self, mood: str) -> Dict[str, List[str]]:
+        categories = self._moods.get(mood)
+        if categories is not None:
+            return categories
+        while True:
+            index = self._open()
+            if mood not in index["moods"]:
+                raise KeyError(mood)
+            with self._lock:
+                if self._index is not index:
+                    continue # Reconfigured meanwhile
+                if mood not in self._moods:
+                    if self._catalog is not None:
+                        self._moods[mood] = self._catalog["tasks"][mood]
+                    else:
+                        offset, size = index["moods"][mood]
+                        with open(self._path, 'rb') as f:
+                            f.seek(index["data_start"] + offset)
+                            self._moods[mood] = json.loads(f.read(size))
+                return self._moods[mood]
+
+    def __contains__(self, mood: object) -> bool:
+        return mood in self._open()["moods"]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._open()["moods"])
+
+    def __len__(self) -> int:
+        return len(self._open()["moods"])
+
+    def all_tasks(self, mood: str) -> List[str]:
+        """Every task of a mood across its categories, flattened once and kept."""
+        flat = self._flat.get(mood)
+        if flat is None:
+            categories = self.get(mood, {})
+            flat = [task for tasks in categories.values() for task in tasks]
+            with self._lock:
+                if self._moods.get(mood) is categories: # Not reconfigured meanwhile
+                    flat = self._flat.setdefault(mood, flat)
+        return flat
+
+
+class _CatalogField(Mapping):
+    """A per-mood table of the catalog index, such as its emoji."""
+
+    def __init__(self, catalog: TaskCatalog, field: str):
+        self._catalog = catalog
+        self._field = field
+
+    def __getitem__(self, mood: str) -> str:
+        return self._catalog._open()[self._field][mood]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._catalog._open()[self._field])
+
+    def __len__(self) -> int:
+        return len(self._catalog._open()[self._field])
+
+
+MOOD_TASKS = TaskCatalog()
+EMOJI_MAP = _CatalogField(MOOD_TASKS, "emoji")
+ENCOURAGING_REACTIONS = _CatalogField(MOOD_TASKS, "reactions")
+MOOD_SCORES = _CatalogField(MOOD_TASKS, "scores")  # Mood -> [valence, arousal], each in [-1, 1]
+
+
+def tasks_for_mood(mood: str) -> List[str]:
+    """Returns every suggested task for a mood, across all of its categories."""
+    return MOOD_TASKS.all_tasks(mood)
+
+
+# ======================
+# 📐 Instrumentation
+# ======================
+METRICS_ENV_VAR = "MOODMATE_METRICS"   # "1" records call counts, latency and I/O per operation
+PROFILE_ENV_VAR = "MOODMATE_PROFILE"   # "cprofile", "tracemalloc" or "cprofile,tracemalloc"
+METRICS_FILE = "moodmate_metrics.prom"  # Written to EXPORT_FOLDER
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)  # Seconds
+
+
+class Metrics:
+    """Opt-in registry of per-operation call counts, latency histograms and I/O volume.
+
+    Disabled by default: the operation wrappers are only installed by `enable()`, so
+    an uninstrumented session pays nothing beyond a flag check on each file read/write.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._local = threading.local()  # Per-thread stack of running operation names
+        self._ops: Dict[str, Dict] = {}
+
+    def enable(self) -> None:
+        """Turns on collection and instruments MoodLogger and MoodAnalyzer."""
+        if self.enabled:
+            return
+        self.enabled = True
+        for cls in (MoodLogger, MoodAnalyzer):
+            _instrument_class(cls)
+
+    def _op(self, name: str) -> Dict:
+        if name not in self._ops:
+            self._ops[name] = {
+                "calls": 0, "errors": 0, "seconds": 0.0,
+                "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+                "bytes_read": 0, "bytes_written": 0, "entries_scanned": 0,
+            }
+        return self._ops[name]
+
+    def _stack(self) -> List[str]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def observe(self, name: str, seconds: float, failed: bool = False) -> None:
+        """Records one finished call of an operation."""
+        with self._lock:
+            op = self._op(name)
+            op["calls"] += 1
+            op["errors"] += int(failed)
+            op["seconds"] += seconds
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    op["buckets"][i] += 1
+                    break
+            else:
+                op["buckets"][-1] += 1
+
+    def record_io(self, bytes_read: int = 0, bytes_written: int = 0, entries: int = 0) -> None:
+        """Attributes file I/O to every operation currently running on this thread."""
+        names = self._stack() or ["(untracked)"]
+        with self._lock:
+            for name in set(names):
+                op = self._op(name)
+                op["bytes_read"] += bytes_read
+                op["bytes_written"] += bytes_written
+                op["entries_scanned"] += entries
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Returns a copy of the collected metrics, keyed by operation name."""
+        with self._lock:
+            return {name: dict(op, buckets=list(op["buckets"])) for name, op in self._ops.items()}
+
+    def format_report(self) -> str:
+        """Renders the collected metrics as a human-readable table."""
+        ops = self.snapshot()
+        if not ops:
+            return "No operations recorded yet."
+        lines = [f"{'operation':<40} {'calls':>7} {'avg ms':>9} {'read KiB':>10} {'written KiB':>12} {'scanned':>10}"]
+        for name, op in sorted(ops.items()):
+            avg_ms = op["seconds"] / op["calls"] * 1000 if op["calls"] else 0.0
+            lines.append(
+                f"{name:<40} {op['calls']:>7} {avg_ms:>9.2f} {op['bytes_read'] / 1024:>10.1f} "
+                f"{op['bytes_written'] / 1024:>12.1f} {op['entries_scanned']:>10}"
+            )
+        return "\n".join(lines)
+
+    def to_prometheus(self) -> str:
+        """Renders the collected metrics in the Prometheus text exposition format."""
+        ops = sorted(self.snapshot().items())
+        lines = [
+            "# HELP moodmate_op_duration_seconds Latency of MoodMate operations.",
+            "# TYPE moodmate_op_duration_seconds histogram",
         ]
+        for name, op in ops:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), op["buckets"]):
+                cumulative += count
+                lines.append(f'moodmate_op_duration_seconds_bucket{{op="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'moodmate_op_duration_seconds_sum{{op="{name}"}} {op["seconds"]:.6f}')
+            lines.append(f'moodmate_op_duration_seconds_count{{op="{name}"}} {op["calls"]}')
+        for metric, key, help_text in (
+            ("moodmate_op_errors_total", "errors", "Operations that raised an exception."),
+            ("moodmate_bytes_read_total", "bytes_read", "Bytes read from storage, inclusive of nested calls."),
+            ("moodmate_bytes_written_total", "bytes_written", "Bytes written to storage, inclusive of nested calls."),
+            ("moodmate_entries_scanned_total", "entries_scanned", "Log entries parsed or analyzed."),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, op in ops:
+                lines.append(f'{metric}{{op="{name}"}} {op[key]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Optional[str] = None) -> str:
+        """Writes the Prometheus text dump (default: EXPORT_FOLDER/METRICS_FILE)."""
+        path = path or os.path.join(EXPORT_FOLDER, METRICS_FILE)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(self.to_prometheus())
+        return path
+
+
+METRICS = Metrics()
+
+
+def _instrumented(name: str, func):
+    """Wraps a function so each call is timed and recorded under `name`."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stack = METRICS._stack()
+        stack.append(name)
+        started = time.perf_counter()
+        failed = False
+        try:
+            if name.startswith("MoodAnalyzer.") and args and isinstance(args[0], list):
+                METRICS.record_io(entries=len(args[0]))
+            return func(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            stack.pop()
+            METRICS.observe(name, time.perf_counter() - started, failed)
+    wrapper.__wrapped_by_metrics__ = True
+    return wrapper
+
+
+def _instrument_class(cls) -> None:
+    """Replaces every public method of `cls` with an instrumented wrapper."""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_"):
+            continue
+        name = f"{cls.__name__}.{attr}"
+        if isinstance(value, staticmethod):
+            setattr(cls, attr, staticmethod(_instrumented(name, value.__func__)))
+        elif callable(value) and not getattr(value, "__wrapped_by_metrics__", False):
+            setattr(cls, attr, _instrumented(name, value))
+
+
+@contextlib.contextmanager
+def profile_flow(name: str):
+    """Profiles the wrapped flow when MOODMATE_PROFILE is set, saving results to EXPORT_FOLDER."""
+    modes = {mode.strip() for mode in os.environ.get(PROFILE_ENV_VAR, "").lower().split(",") if mode.strip()}
+    if not modes:
+        yield
+        return
+
+    import cProfile
+    import tracemalloc
+
+    os.makedirs(EXPORT_FOLDER, exist_ok=True)
+    stem = os.path.join(EXPORT_FOLDER, f"profile_{name.strip('_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    profiler = cProfile.Profile() if "cprofile" in modes else None
+    tracing = "tracemalloc" in modes and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(f"{stem}.prof")
+        if tracing:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(f"{stem}_memory.txt", 'w') as f:
+                f.write(f"Peak traced memory: {peak / 1024:.1f} KiB\n\n")
+                for stat in snapshot.statistics("lineno")[:25]:
+                    f.write(f"{stat}\n")
+
+
+# ======================
+# ⏱️ Timestamps
+# ======================
+# Entries carry an integer epoch ("ts", seconds) and the UTC offset they were logged
+# with ("tz", seconds) next to the human-readable ISO "timestamp", so range filters
+# and day grouping are integer arithmetic instead of an ISO parse per entry.
+SECONDS_PER_DAY = 86400
+EPOCH = datetime(1970, 1, 1)
+EPOCH_DATE = EPOCH.date()
+
+
+def _now_fields() -> Dict:
+    """Returns the timestamp fields for an entry logged right now."""
+    now = datetime.now().astimezone()
+    return {
+        "timestamp": now.replace(tzinfo=None).isoformat(),
+        "ts": int(now.timestamp()),
+        "tz": int(now.utcoffset().total_seconds()),
+    }
+
+
+def _entry_fields(entry: Dict) -> Dict:
+    """Returns an entry's data fields, i.e. everything except its id."""
+    return {field: value for field, value in entry.items() if field != "id"}
+
+
+def _local_day(entry: Dict, tz: Optional[int] = None) -> int:
+    """Day number (days since 1970-01-01) of an entry, in its own offset or in `tz` seconds."""
+    return (entry["ts"] + (entry["tz"] if tz is None else tz)) // SECONDS_PER_DAY
+
+
+def _day_to_date(day: int):
+    """Converts a day number from `_local_day` back into a date."""
+    return EPOCH_DATE + timedelta(days=day)
+
+
+def _format_entry_time(entry: Dict, fmt: str = "%Y-%m-%d %H:%M") -> str:
+    """Formats an entry's wall-clock time as it was when logged."""
+    return (EPOCH + timedelta(seconds=entry["ts"] + entry["tz"])).strftime(fmt)
+
+
+# ======================
+# 🧬 Schema & Migrations
+# ======================
+# Stored logs start with a header record naming the entry schema they were written in:
+# [\n{"format": "moodmate-log", "schema": 3},\n{entry},\n...\n]. Loading a log in an
+# older schema runs the registered steps (N -> N + 1) on each entry and saves it once,
+# so everything past loading can rely on every field being present. Logs without a
+# header predate versioning and run every step; steps leave fields that are already
+# there alone.
+LOG_FORMAT = "moodmate-log"
+SCHEMA_VERSION = 3
+ENTRY_KEYS = {"id", "timestamp", "ts", "tz", "mood", "task", "note", "completed"}  # Every entry has these
+MIGRATIONS: Dict[int, Callable[[Dict], Dict]] = {}
+MIGRATE_CHECKPOINT_EVERY = 10000  # Entries between progress checkpoints of `migrate_log`
+_HEADER_PREFIX = b'[\n{"format": "' + LOG_FORMAT.encode() + b'"'
+
+
+def migration(from_version: int):
+    """Registers a function upgrading one entry from `from_version` to the next version."""
+    def register(step: Callable[[Dict], Dict]) -> Callable[[Dict], Dict]:
+        MIGRATIONS[from_version] = step
+        return step
+    return register
+
+
+@migration(0)
+def _add_completed(entry: Dict) -> Dict:
+    """v0 -> v1: tasks can be marked completed; every entry has a (possibly empty) note."""
+    entry.setdefault("completed", False)
+    entry.setdefault("note", None)
+    return entry
+
+
+@migration(1)
+def _upgrade_timestamp(entry: Dict) -> Dict:
+    """v1 -> v2: adds "ts"/"tz" to an entry that only has an ISO timestamp (naive = local time)."""
+    if "ts" not in entry:
+        moment = datetime.fromisoformat(entry["timestamp"])
+        epoch = int(moment.timestamp())
+        offset = moment.utcoffset() if moment.tzinfo else None
+        entry["ts"] = epoch
+        entry["tz"] = int(offset.total_seconds()) if offset is not None else time.localtime(epoch).tm_gmtoff
+    return entry
+
+
+@migration(2)
+def _add_id(entry: Dict) -> Dict:
+    """v2 -> v3: entries get a stable id."""
+    if "id" not in entry:
+        entry["id"] = uuid.uuid4().hex
+    return entry
+
+
+def migrate_entry(entry: Dict, version: int = 0) -> Dict:
+    """Upgrades an entry stored in schema `version` to the current schema."""
+    for step in range(version, SCHEMA_VERSION):
+        entry = MIGRATIONS[step](entry)
+    return entry
+
+
+def _log_header() -> Dict:
+    return {"format": LOG_FORMAT, "schema": SCHEMA_VERSION}
+
+
+def _is_header(record: Dict) -> bool:
+    return record.get("format") == LOG_FORMAT
+
+
+def _schema_of(header: Optional[Dict]) -> int:
+    """Schema version named by a log header (0 for logs without one)."""
+    if header is None:
+        return 0
+    if header["schema"] > SCHEMA_VERSION:
+        raise ValueError(f"This log uses schema v{header['schema']}; please update MoodMate to read it.")
+    return header["schema"]
+
+
+def _iter_array_items(f, offset: int = 0, chunk_size: int = 1 << 16) -> Iterator[Tuple[Dict, int]]:
+    """Streams the items of a JSON array from a binary file as (item, byte offset after it).
+
+    Works for any formatting (one record per line or `json.dump(indent=4)`) while holding
+    only about one chunk in memory. A nonzero `offset` resumes after an item yielded earlier.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    f.seek(offset)
+    buffer, pos, eof = "", 0, False
+    opened = offset > 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+            offset += 1
+        if pos < len(buffer) and not opened:
+            if buffer[pos] != "[":
+                raise ValueError("Not a JSON array")
+            opened = True
+            pos += 1
+            offset += 1
+            continue
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            if pos == len(buffer):
+                raise ValueError("Need more input")
+            item, end = decoder.raw_decode(buffer, pos)
+        except ValueError:
+            if eof:
+                raise ValueError(f"Unexpected end of log at byte {offset}")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + text.decode(chunk, final=eof)
+            pos = 0
+            continue
+        offset += len(buffer[pos:end].encode("utf-8"))
+        pos = end
+        yield item, offset
+
+
+def migrate_log(source: str, output: Optional[str] = None,
+                checkpoint_every: int = MIGRATE_CHECKPOINT_EVERY) -> int:
+    """Streams a log of any size and schema into the current storage format.
+
+    Memory use is constant. Progress is checkpointed every `checkpoint_every` entries to
+    <output>.migrate.json, so an interrupted run resumes where it stopped as long as the
+    source is unchanged. `output` defaults to the source itself, which is replaced only
+    once the new file is complete. A log with edits in its history overlay is written with
+    them applied (and is not resumable). Returns the number of entries written.
+    """
+    output = output or source
+    overlay = _history_overlay(source)
+    temp_path = output + ".migrating"
+    progress_path = output + ".migrate.json"
+    signature = list(_file_signature(source))
+    progress = None
+    try:
+        with open(progress_path, 'r') as f:
+            progress = json.load(f)
+        if progress.get("source") != signature or not os.path.exists(temp_path) or overlay:
+            progress = None
+    except (OSError, ValueError):
+        pass
+
+    with open(source, 'rb') as src:
+        if progress is None:
+            out = open(temp_path, 'wb')
+            out.write(b"[\n" + json.dumps(_log_header()).encode())
+            offset, records, version = 0, 0, None
+        else:
+            out = open(temp_path, 'r+b')
+            out.truncate(progress["output_bytes"])
+            out.seek(progress["output_bytes"])
+            offset, records, version = progress["input_offset"], progress["records"], progress["schema"]
+
+        if overlay: # Only logs a MoodLogger has opened, so already in the current schema
+            items = ((entry, 0) for entry in scan_records(source))
+            version = SCHEMA_VERSION
+        else:
+            items = _iter_array_items(src, offset)
+        with out:
+            for item, offset in items:
+                if version is None: # First item: the header, or an entry of an unversioned log
+                    version = _schema_of(item if _is_header(item) else None)
+                    if _is_header(item):
+                        continue
+                out.write(b",\n" + _encode_record(migrate_entry(_strip_checksum(item), version)).encode())
+                records += 1
+                if records % checkpoint_every == 0 and not overlay:
+                    out.flush()
+                    os.fsync(out.fileno())
+                    with open(progress_path + ".tmp", 'w') as f:
+                        json.dump({"source": signature, "input_offset": offset, "output_bytes": out.tell(),
+                                   "records": records, "schema": version}, f)
+                    os.replace(progress_path + ".tmp", progress_path)
+            out.write(b"\n]\n")
+            out.flush()
+            os.fsync(out.fileno())
+
+    _install_log(temp_path, output)
+    if os.path.exists(progress_path):
+        os.remove(progress_path)
+    return records
+
+
+def _install_log(temp_path: str, output: str) -> None:
+    """Moves a log written next to `output` into its place."""
+    os.replace(temp_path, output)
+    # The output's checkpoint describes its old layout
+    stale_checkpoint = os.path.splitext(output)[0] + ".pending.json"
+    if os.path.exists(stale_checkpoint):
+        os.remove(stale_checkpoint)
+    invalidate_log_cache(output)
+
+
+# ======================
+# 🧾 Record Checksums
+# ======================
+# Each stored record ends with a CRC-32 of the record without it, e.g.
+# {"id": ..., "completed": false, "crc": "1c291ca3"}, so a record cut short by an
+# interrupted write is told apart from an intact one without parsing the whole log.
+CHECKSUM_FIELD = "crc"
+_CHECKSUM_SUFFIX = len(', "crc": "00000000"}')
+
+
+def _encode_record(entry: Dict) -> str:
+    """Serializes an entry as one checksummed JSON line (without separator)."""
+    body = json.dumps(entry)
+    return f'{body[:-1]}, "{CHECKSUM_FIELD}": "{zlib.crc32(body.encode()):08x}"}}'
+
+
+def _checksum_ok(line: bytes) -> bool:
+    """False if a stored record line (without separator) carries a checksum it does not match."""
+    if line[-_CHECKSUM_SUFFIX:-10] != b', "crc": "':
+        return True # Records written before checksums are taken as they are
+    return b"%08x" % zlib.crc32(b"}", zlib.crc32(line[:-_CHECKSUM_SUFFIX])) == line[-10:-2]
+
+
+def _checksum_failures(data: bytes) -> List[Tuple[int, bytes]]:
+    """(position, line) of every record in a one-record-per-line log that fails its checksum.
+
+    Positions count the records (header included) in the order they are stored.
+    """
+    failures = []
+    position = 0
+    for line in data.split(b"\n"):
+        if line[:1] == b"{":
+            line = line.rstrip(b", \r")
+            if not _checksum_ok(line):
+                failures.append((position, line))
+            position += 1
+    return failures
+
+
+def _decode_record(line: bytes) -> Optional[Dict]:
+    """Parses one stored record line; returns None if it is torn or fails its checksum."""
+    line = line.rstrip(b", \r\n")
+    if not line.startswith(b"{") or not _checksum_ok(line):
+        return None
+    if line[-_CHECKSUM_SUFFIX:-10] == b', "crc": "':
+        line = line[:-_CHECKSUM_SUFFIX] + b"}"
+    try:
+        return json.loads(line) # Records written before checksums are taken as they are
+    except ValueError:
+        return None
+
+
+def _strip_checksum(entry: Dict) -> Dict:
+    """Drops the stored checksum from a parsed record."""
+    entry.pop(CHECKSUM_FIELD, None)
+    return entry
+
+
+def _parse_tail(tail: bytes) -> Tuple[List[Tuple[int, Dict]], int, bool]:
+    """Splits the bytes that follow a checkpoint's last record into intact records.
+
+    Returns [(offset in `tail`, entry)], the length of the intact part (up to the last
+    good record's closing brace) and whether the log's closing bracket follows it.
+    """
+    records: List[Tuple[int, Dict]] = []
+    first_newline = tail.find(b"\n")
+    if first_newline == -1 or tail[:first_newline] not in (b"", b","):
+        return records, 0, False
+    good = 0
+    pos = first_newline + 1
+    while pos < len(tail):
+        line_end = tail.find(b"\n", pos)
+        line_end = len(tail) if line_end == -1 else line_end
+        line = tail[pos:line_end]
+        if line.strip() == b"]":
+            return records, good, not tail[line_end:].strip()
+        entry = _decode_record(line)
+        if entry is None:
+            break
+        records.append((pos, entry))
+        good = pos + len(line.rstrip(b", \r"))
+        pos = line_end + 1
+    return records, good, False
+
+
+# ======================
+# 🗃️ Log Cache
+# ======================
+# Parsed logs shared by every MoodLogger in the process, keyed by absolute path.
+# Each entry is validated against the file's (mtime, size, inode) before reuse, so
+# writes from other processes are still picked up on the next read.
+_LOG_CACHE: Dict[str, Tuple[Tuple[int, int, int], List[Dict]]] = {}
+_CAP_HELD_UNTIL: Dict[str, int] = {}  # Log path -> when the oldest entry the cap held back leaves the summary window
+
+
+def _file_signature(path: str) -> Tuple[int, int, int]:
+    """Returns the (mtime_ns, size, inode) triple used to detect changes to a file."""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+_CHANGE_STATE: Dict[str, List[int]] = {}  # Change log path -> [last seq, last clock]
+_VERSIONS: Dict[str, Tuple[Optional[Tuple[int, int, int]], int, Dict]] = {}  # Version index path -> (signature, seq saved, folded index)
+_MAIN_THREAD_HOLDS = [0]  # Log locks held by the main thread, counting reentry (see _exit_on_signal)
+
+
+class _LogLock:
+    """A reentrant lock for one log file that counts how deeply the main thread holds it,
+    so an exit requested by a signal can wait until the main thread is done writing."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+    def __enter__(self) -> "_LogLock":
+        if threading.current_thread() is threading.main_thread():
+            _MAIN_THREAD_HOLDS[0] += 1 # Before acquiring, so no signal can exit in between
+            try:
+                self._lock.acquire()
+            except BaseException: # e.g. Ctrl+C while waiting
+                _MAIN_THREAD_HOLDS[0] -= 1
+                raise
+        else:
+            self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._lock.release()
+        if threading.current_thread() is threading.main_thread():
+            _MAIN_THREAD_HOLDS[0] -= 1
+            if not _MAIN_THREAD_HOLDS[0] and _DEFERRED_SIGNALS:
+                _exit_for_signal(_DEFERRED_SIGNALS.pop(0))
+
+
+_PATH_LOCKS: Dict[str, _LogLock] = {}
+_PATH_LOCKS_GUARD = threading.Lock()
+
+
+def _path_lock(path: str) -> _LogLock:
+    """Returns the process-wide lock serializing reads and writes of one log file."""
+    path = os.path.abspath(path)
+    with _PATH_LOCKS_GUARD:
+        if path not in _PATH_LOCKS:
+            _PATH_LOCKS[path] = _LogLock()
+        return _PATH_LOCKS[path]
+
+
+def _read_last_line(path: str) -> Optional[Dict]:
+    """Parses the last complete JSON line of a file without reading all of it."""
+    try:
+        with open(path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            chunk = 4096
+            while True:
+                start = max(0, size - chunk)
+                f.seek(start)
+                lines = f.read(size - start).splitlines()
+                complete = lines if start == 0 else lines[1:]
+                for line in reversed(complete):
+                    try:
+                        return json.loads(line)
+                    except ValueError:
+                        continue # Torn tail from an interrupted append
+                if start == 0:
+                    return None
+                chunk *= 4
+    except OSError:
+        return None
+
+
+def _iter_changes(path: str, since_seq: int) -> Iterator[Dict]:
+    """Yields records of a change log with seq > since_seq, binary-searching the start offset."""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        def first_seq_at(offset: int) -> Optional[int]:
+            f.seek(offset - 1 if offset else 0)
+            if offset:
+                f.readline() # Move to the first line starting at or after `offset`
+            line = f.readline()
+            try:
+                return json.loads(line)["seq"] if line else None
+            except ValueError:
+                return None
+
+        lo, hi = 0, f.seek(0, os.SEEK_END)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            seq = first_seq_at(mid)
+            if seq is None or seq > since_seq:
+                hi = mid
+            else:
+                lo = mid + 1
+
+        f.seek(lo - 1 if lo else 0)
+        if lo:
+            f.readline()
+        for line in f:
+            try:
+                change = json.loads(line)
+            except ValueError:
+                break # Torn tail from an interrupted append
+            if change["seq"] > since_seq:
+                yield change
+
+
+def _at_least_pattern(value: int) -> bytes:
+    """Regex alternation matching the decimal integers >= value (value >= 0)."""
+    digits = str(value)
+    options = [rb"[1-9]\d{%d,}" % len(digits)] # Any longer number
+    for i, digit in enumerate(digits):
+        if digit != "9":
+            options.append(re.escape(digits[:i]).encode() + b"[%d-9]" % (int(digit) + 1) + rb"\d{%d}" % (len(digits) - i - 1))
+    options.append(digits.encode())
+    return b"(?:" + b"|".join(options) + b")"
+
+
+_JSON_DECODE = json.JSONDecoder().decode  # Skips json.loads' per-call encoding sniffing
+
+
+def scan_records(path: str, since: Optional[int] = None, until: Optional[int] = None,
+                 moods: Optional[List[str]] = None, start: int = 0, end: Optional[int] = None,
+                 where: Optional[Callable[[Dict], bool]] = None, precheck: Optional[Callable[[bytes], bool]] = None,
+                 reverse: bool = False) -> Iterator[Dict]:
+    """Yields the records of a line-oriented log whose "ts" is in [since, until) and whose
+    mood is in `moods`, locating candidates on the raw bytes of a memory map.
+
+    Works on MoodLogger's one-record-per-line array and on plain JSON-lines files; lines
+    that are not objects (the array brackets) are skipped. The most selective filter is
+    compiled into a byte regex that runs over the whole map, so only candidate lines are
+    ever decoded and memory stays proportional to the matches. Filtered scans skip
+    records without a "ts" field (MoodLogger always writes one).
+
+    `precheck(line)` rejects more lines before decoding; `where(record)`, when given,
+    replaces the check of decoded records and must cover since/until/moods itself (as
+    `compile_filter`'s predicate does). `reverse` yields the newest records first. Records are produced
+    lazily, so a caller that stops early leaves the rest of the file unread.
+    `start`/`end` limit the scan to a byte range whose bounds fall on line starts.
+
+    Edits and deletes still held in the log's history overlay are applied to the records
+    they touch, which are decoded whatever they held before the edit; the rest of the scan
+    is unchanged.
+    """
+    if since is not None and since >= 0:
+        pattern = re.compile(rb'"ts": ' + _at_least_pattern(since) + rb'[,}]')
+    elif moods is not None:
+        # As json.dumps stores them: non-ASCII moods are \uXXXX-escaped
+        pattern = re.compile(rb'"mood": (?:' + b"|".join(re.escape(json.dumps(mood).encode()) for mood in moods) + rb')[,}]')
+    else:
+        pattern = None
+
+    def wanted(record: Dict) -> bool:
+        if since is not None or until is not None:
+            if "ts" not in record:
+                return False
+            if (since is not None and record["ts"] < since) or (until is not None and record["ts"] >= until):
+                return False
+        return moods is None or record.get("mood") in moods
+
+    if where is None and (pattern is not None or since is not None or until is not None):
+        where = wanted
+    by_id = _overlay_by_id(_history_overlay(path))
+    if not by_id:
+        yield from _scan_lines(path, pattern, where, precheck, start, end, reverse)
+        return
+    if _restores_unstored(by_id):
+        if start or end is not None:
+            raise ValueError(f"'{path}' has edits that are not stored in it yet; scan it whole")
+        logs = list(_scan_lines(path))
+        for delta in _history_overlay(path):
+            _apply_delta(logs, delta)
+        for entry in reversed(logs) if reverse else logs:
+            if (precheck is None or precheck(json.dumps(entry).encode())) and (where is None or where(entry)):
+                yield entry
+        return
+
+    # The byte filters see stored records, so the ones the overlay touches always get through
+    touched = {json.dumps(entry_id)[1:-1].encode() for entry_id in by_id}
+    if pattern is not None:
+        pattern = re.compile(pattern.pattern + rb'|\{"id": "(?:' + b"|".join(map(re.escape, touched)) + rb')"')
+    if precheck is not None:
+        check = precheck
+        precheck = lambda line: _record_id(line) in touched or check(line)
+    for record in _scan_lines(path, pattern, None, precheck, start, end, reverse):
+        deltas = by_id.get(record.get("id"))
+        if deltas is not None:
+            record = _patched(record, deltas)
+            if record is None:
+                continue
+        if where is None or where(record):
+            yield record
+
+
+def _record_id(line: bytes) -> Optional[bytes]:
+    """The raw id of a stored record line, which MoodLogger always writes first."""
+    if not line.startswith(b'{"id": "'):
+        return None
+    return line[8:line.find(b'"', 8)]
+
+
+def _find_records(path: str, entry_ids: List[str]) -> Dict[str, Tuple[int, Dict]]:
+    """The byte offset and stored record of each of `entry_ids` in a line-oriented log,
+    located on the raw bytes so only their lines are decoded."""
+    found: Dict[str, Tuple[int, Dict]] = {}
+    if not entry_ids:
+        return found
+    pattern = re.compile(rb'\{"id": "(?:' + b"|".join(re.escape(json.dumps(entry_id)[1:-1].encode())
+                                                       for entry_id in entry_ids) + rb')"')
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for match in pattern.finditer(mm):
+            line_end = mm.find(b"\n", match.start())
+            entry = _decode_record(mm[match.start():len(mm) if line_end == -1 else line_end])
+            if entry is not None:
+                found[entry["id"]] = (match.start(), entry)
+    return found
+
+
+def _scan_lines(path: str, pattern=None, where: Optional[Callable[[Dict], bool]] = None,
+                precheck: Optional[Callable[[bytes], bool]] = None, start: int = 0, end: Optional[int] = None,
+                reverse: bool = False) -> Iterator[Dict]:
+    """The stored records behind `scan_records`: lines matching `pattern` (a compiled byte
+    regex) that pass `precheck` and then `where`, without the history overlay."""
+    def candidates(mm, start: int, limit: int) -> Iterator[Tuple[int, int]]:
+        """(start, end) of every line that may hold a match, in the requested order."""
+        if reverse:
+            line_end = limit
+            while line_end > start:
+                newline = mm.rfind(b"\n", start, line_end)
+                line_start = newline + 1 if newline != -1 else start
+                if pattern is None or pattern.search(mm, line_start, line_end):
+                    yield line_start, line_end
+                if newline == -1:
+                    return
+                line_end = newline
+        elif pattern is None:
+            pos = start
+            while pos < limit:
+                line_end = mm.find(b"\n", pos, limit)
+                line_end = limit if line_end == -1 else line_end
+                yield pos, line_end
+                pos = line_end + 1
+        else:
+            last_start = -1
+            for match in pattern.finditer(mm, start, limit):
+                line_start = mm.rfind(b"\n", start, match.start()) + 1 or start
+                if line_start == last_start:
+                    continue
+                last_start = line_start
+                line_end = mm.find(b"\n", match.end(), limit)
+                yield line_start, limit if line_end == -1 else line_end
+
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        limit = size if end is None else min(end, size)
+        if start >= limit:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if start == 0 and mm[:len(_HEADER_PREFIX)] == _HEADER_PREFIX:
+                start = mm.find(b"\n", 2) + 1 # Skip the header record
+            decoded = scanned = 0
+            try:
+                for line_start, line_end in candidates(mm, start, limit):
+                    scanned = (limit - line_start) if reverse else (line_end - start)
+                    if mm[line_start:line_start + 1] != b"{":
+                        continue
+                    line = mm[line_start:line_end].rstrip(b", \r")
+                    if precheck is not None and not precheck(line):
+                        continue
+                    if not _checksum_ok(line):
+                        raise ValueError(f"The record at byte {line_start} of '{path}' fails its checksum")
+                    record = _strip_checksum(_JSON_DECODE(line.decode()))
+                    decoded += 1
+                    if where is None or where(record):
+                        yield record
+            finally:
+                if METRICS.enabled:
+                    METRICS.record_io(bytes_read=scanned, entries=decoded)
+
+
+def _read_header(path: str) -> Tuple[Optional[Dict], int]:
+    """Returns a line-oriented log's header (None if it has none) and the byte offset where it ends."""
+    with open(path, 'rb') as f:
+        head = f.read(len(_HEADER_PREFIX))
+        if head != _HEADER_PREFIX:
+            return None, 1
+        f.seek(2)
+        line = f.readline().rstrip(b", \r\n")
+    return json.loads(line), 2 + len(line)
+
+
+def _is_line_layout(path: str) -> bool:
+    """True if a log file uses the one-record-per-line layout that `scan_records` needs."""
+    with open(path, 'rb') as f:
+        head = f.read(3)
+    return head[:2] == b"[\n" and head[2:3] in (b"{", b"]")
+
+
+# ======================
+# 🔎 Queries
+# ======================
+# A query's filters are compiled once into a predicate over decoded entries plus cheap
+# checks on a record's raw bytes. Stored records always use json.dumps' layout
+# ('"ts": 123', '"completed": true', '"note": null'), so most non-matching lines are
+# rejected before they are decoded. Results stream in storage order, which lets
+# `limit` end a scan as soon as enough entries matched.
+QUERY_SORTS = ("log", "-log", "ts", "-ts", "mood", "-mood", "task", "-task")  # "log": the order entries were stored in
+_RAW_TS = re.compile(rb'"ts": (-?\d+)[,}]')
+_RAW_NO_NOTE, _RAW_EMPTY_NOTE = b'"note": null', b'"note": ""'
+
+
+def _all_of(checks: List[Callable]) -> Optional[Callable]:
+    """One predicate that passes what every check (tried in order) passes; None without checks."""
+    if len(checks) < 2:
+        return checks[0] if checks else None
+    if len(checks) == 2: # The common case, without the loop
+        first, second = checks
+        return lambda value: first(value) and second(value)
+
+    def passes(value) -> bool:
+        for check in checks:
+            if not check(value):
+                return False
+        return True
+    return passes
+
+
+def compile_filter(moods: Optional[List[str]] = None, since: Optional[int] = None, until: Optional[int] = None,
+                   completed: Optional[bool] = None, has_note: Optional[bool] = None, text: Optional[str] = None,
+                   note_filter: Optional[Callable[[str], bool]] = None
+                   ) -> Tuple[Optional[Callable[[Dict], bool]], Optional[Callable[[bytes], bool]]]:
+    """Compiles query filters into (predicate on entries, precheck on raw record lines).
+
+    Each part runs a list of small checks, cheapest first; the precheck starts with byte
+    strings a matching line must (or must not) contain. It only rejects lines that cannot
+    match; whatever it lets through is decoded and must still pass the predicate. `text`
+    matches the task or note, ignoring case, and `note_filter(note)` covers what bytes
+    cannot tell (note tags, sentiment). Either part is None when there is nothing to check.
+    """
+    checks: List[Callable[[Dict], bool]] = []
+    raw: List[Callable[[bytes], bool]] = []
+    present: List[bytes] = []  # Bytes every matching line contains...
+    absent: List[bytes] = []  # ...and bytes none does
+    if since is not None or until is not None:
+        def line_in_range(line: bytes) -> bool:
+            match = _RAW_TS.search(line)
+            return match is not None and (since is None or int(match.group(1)) >= since) \
+                and (until is None or int(match.group(1)) < until)
+        if until is None:
+            checks.append(lambda entry: entry["ts"] >= since)
+        elif since is None:
+            checks.append(lambda entry: entry["ts"] < until)
+        else:
+            checks.append(lambda entry: since <= entry["ts"] < until)
+    if moods is not None:
+        wanted = frozenset(moods)
+        checks.append(lambda entry: entry["mood"] in wanted)
+        if moods: # As json.dumps stores them, so non-ASCII moods are escaped too
+            mood_in_line = re.compile(rb'"mood": (?:' + b"|".join(re.escape(json.dumps(mood).encode()) for mood in moods)
+                                      + rb')[,}]').search
+            raw.append(lambda line: mood_in_line(line) is not None)
+        else:
+            raw.append(lambda line: False)
+    if completed is not None:
+        checks.append((lambda entry: bool(entry["completed"])) if completed else (lambda entry: not entry["completed"]))
+        present.append(b'"completed": true' if completed else b'"completed": false')
+    if has_note is not None:
+        if has_note:
+            checks.append(lambda entry: bool(entry["note"]))
+            absent.extend((_RAW_NO_NOTE, _RAW_EMPTY_NOTE))
+        else:
+            checks.append(lambda entry: not entry["note"])
+            raw.insert(0, lambda line: _RAW_NO_NOTE in line or _RAW_EMPTY_NOTE in line)
+    if since is not None or until is not None:
+        raw.append(line_in_range)
+    if text:
+        needle = text.lower()
+        checks.append(lambda entry: needle in entry["task"].lower() or needle in (entry["note"] or "").lower())
+        if json.dumps(needle)[1:-1] == needle: # Stored as-is, so it must appear in the raw line too
+            raw_needle = needle.encode()
+            raw.append(lambda line: raw_needle in line.lower())
+    if note_filter is not None:
+        checks.append(lambda entry: bool(entry["note"]) and note_filter(entry["note"]))
+        absent.append(_RAW_NO_NOTE)
+    if present or absent:
+        present_bytes, absent_bytes = tuple(present), tuple(dict.fromkeys(absent))
+
+        def has_bytes(line: bytes) -> bool:
+            for part in present_bytes:
+                if part not in line:
+                    return False
+            for part in absent_bytes:
+                if part in line:
+                    return False
+            return True
+        raw.insert(0, has_bytes)
+    return _all_of(checks), _all_of(raw)
+
+
+# ======================
+# 🧮 Parallel Analytics
+# ======================
+# Stats and summaries are folded into a "partial" aggregate that can be merged with
+# the partial of the entries that follow it. Folding the whole log at once (serial)
+# or folding line-aligned byte chunks in worker processes and merging them in file
+# order therefore gives exactly the same result.
+RECENT_NOTES_KEPT = 3  # Notes quoted by summaries
+
+
+def _empty_partial() -> Dict:
+    """A partial aggregate over no entries."""
+    return {
+        "total": 0,
+        "completed": 0,
+        "notes_count": 0,
+        "by_mood": {},
+        "by_day": {},      # Day number -> entries
+        "transitions": {}, # (mood, next mood) -> times one followed the other
+        "first_mood": None,
+        "last_mood": None,
+        "recent_notes": [],
+    }
+
+
+def _fold_entries(entries, tz: Optional[int] = None) -> Dict:
+    """Folds entries (in log order) into a partial aggregate."""
+    partial = _empty_partial()
+    by_mood, by_day, transitions = partial["by_mood"], partial["by_day"], partial["transitions"]
+    total = completed = notes_count = 0
+    previous = None
+    notes = []
+    for entry in entries:
+        mood = entry["mood"]
+        total += 1
+        by_mood[mood] = by_mood.get(mood, 0) + 1
+        day = _local_day(entry, tz)
+        by_day[day] = by_day.get(day, 0) + 1
+        if previous is not None:
+            transitions[(previous, mood)] = transitions.get((previous, mood), 0) + 1
+        else:
+            partial["first_mood"] = mood
+        previous = mood
+        if entry["completed"]:
+            completed += 1
+        if entry["note"]:
+            notes_count += 1
+            notes.append(entry["note"])
+    partial.update(total=total, completed=completed, notes_count=notes_count,
+                   last_mood=previous, recent_notes=notes[-RECENT_NOTES_KEPT:])
+    return partial
+
+
+def _merge_partials(partials: List[Dict]) -> Dict:
+    """Combines partial aggregates of consecutive runs of entries, given in log order."""
+    merged = _empty_partial()
+    for partial in partials:
+        if not partial["total"]:
+            continue
+        for key in ("total", "completed", "notes_count"):
+            merged[key] += partial[key]
+        for key in ("by_mood", "by_day", "transitions"):
+            counts = merged[key]
+            for item, count in partial[key].items():
+                counts[item] = counts.get(item, 0) + count
+        if merged["last_mood"] is not None and partial["first_mood"] is not None:
+            pair = (merged["last_mood"], partial["first_mood"]) # The pair that straddles the chunk boundary
+            merged["transitions"][pair] = merged["transitions"].get(pair, 0) + 1
+        elif merged["first_mood"] is None:
+            merged["first_mood"] = partial["first_mood"]
+        merged["last_mood"] = partial["last_mood"] or merged["last_mood"]
+        merged["recent_notes"] = (merged["recent_notes"] + partial["recent_notes"])[-RECENT_NOTES_KEPT:]
+    return merged
+
+
+def _chunk_ranges(path: str, chunks: int) -> List[Tuple[int, int]]:
+    """Splits a file into up to `chunks` byte ranges that start and end on line boundaries."""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, chunks):
+            f.seek(max(size * i // chunks, bounds[-1]))
+            f.readline() # Finish the line the cut fell into
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def _chunk_partial(path: str, start: int, end: int, since: Optional[int],
+                   until: Optional[int], tz: Optional[int]) -> Dict:
+    """Worker: folds one byte range of a line-oriented log."""
+    return _fold_entries(scan_records(path, since, until, start=start, end=end), tz)
+
+
+def map_reduce_stats(path: str, since: Optional[int] = None, until: Optional[int] = None,
+                     tz: Optional[int] = None, workers: Optional[int] = None) -> Dict:
+    """Folds a line-oriented log in parallel worker processes and merges the partials."""
+    if _restores_unstored(_overlay_by_id(_history_overlay(path))): # Chunks cannot place such entries
+        return _fold_entries(scan_records(path, since, until), tz)
+    workers = max(1, workers or ANALYTICS_WORKERS)
+    ranges = _chunk_ranges(path, workers * 4) # A few chunks per worker evens out stragglers
+    if workers == 1 or len(ranges) < 2:
+        return _merge_partials([_chunk_partial(path, a, b, since, until, tz) for a, b in ranges])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_chunk_partial, path, a, b, since, until, tz) for a, b in ranges]
+        return _merge_partials([future.result() for future in futures])
+
+
+# ======================
+# 💾 Binary Logs
+# ======================
+# A compact binary form of a log for archives, backups and exports:
+#   BINARY_LOG_MAGIC, then _BINARY_HEADER (format version, record size, meta size,
+#   record count, string-table size), then the meta JSON ({"schema", "moods", "tasks"}),
+#   then one fixed-width _BINARY_RECORD per entry in log order, then the string table.
+# A record holds the id (16 raw bytes), "ts", "tz", the microseconds of the ISO
+# timestamp, a mood id (index into "moods"), a catalog task id (index into "tasks") or
+# the string-table offset of a custom task, the offset of the note and a flags byte.
+# Notes and custom tasks are stored once each in the string table, as a length-prefixed
+# UTF-8 string. Anything that does not fit the compact fields (a non-hex id, an ISO
+# timestamp that "ts"/"tz" cannot reproduce) goes to the string table too, with a flag.
+# Opening a binary log only maps the file; entries are decoded when they are read.
+BINARY_LOG_MAGIC = b"MMLOGB\n"
+BINARY_LOG_VERSION = 1
+BINARY_LOG_EXTENSION = ".mmlog"
+_BINARY_HEADER = struct.Struct("<HHIQQ")
+_BINARY_RECORD = struct.Struct("<16sqiIIIHBx")  # id, ts, tz, microseconds, task, note, mood, flags
+_BIN_COMPLETED, _BIN_NOTE, _BIN_CUSTOM_TASK, _BIN_RAW_TIMESTAMP, _BIN_TEXT_ID = 1, 2, 4, 8, 16
+_BINARY_READ_BATCH = 4096  # Records unpacked at a time while iterating
+
+
+def _iso_timestamp(ts: int, tz: int, microseconds: int) -> str:
+    return (EPOCH + timedelta(seconds=ts + tz, microseconds=microseconds)).isoformat()
+
+
+def is_binary_log(path: str) -> bool:
+    """True if `path` starts like a binary log (as opposed to a JSON one)."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(BINARY_LOG_MAGIC)) == BINARY_LOG_MAGIC
+    except OSError:
+        return False
+
+
+class BinaryLogWriter:
+    """Packs entries, in log order, into a binary log written by `save`."""
+
+    def __init__(self):
+        self.records = bytearray()
+        self.strings = bytearray()
+        self.count = 0
+        self._offsets: Dict[str, int] = {}
+        self._moods: Dict[str, int] = {}
+        self._tasks: Dict[str, int] = {}
+        self._catalog: Dict[str, Set[str]] = {}
+
+    def _string(self, text: str) -> int:
+        offset = self._offsets.get(text)
+        if offset is None:
+            data = text.encode('utf-8')
+            offset = self._offsets[text] = len(self.strings)
+            self.strings += struct.pack("<I", len(data)) + data
+        return offset
+
+    def add(self, entry: Dict) -> None:
+        """Packs one entry of the current schema; raises ValueError for anything else."""
+        if entry.keys() != ENTRY_KEYS:
+            raise ValueError(f"Entry {entry.get('id')} does not have exactly the fields {sorted(ENTRY_KEYS)}")
+        flags = _BIN_COMPLETED if entry["completed"] else 0
+        entry_id = entry["id"]
+        try:
+            raw_id = bytes.fromhex(entry_id)
+        except ValueError:
+            raw_id = b""
+        if len(raw_id) != 16 or raw_id.hex() != entry_id:
+            raw_id = struct.pack("<I", self._string(entry_id)).ljust(16, b"\0")
+            flags |= _BIN_TEXT_ID
+
+        stamp = entry["timestamp"]
+        try:
+            microseconds = datetime.fromisoformat(stamp).microsecond
+        except ValueError:
+            microseconds = -1
+        if microseconds < 0 or _iso_timestamp(entry["ts"], entry["tz"], microseconds) != stamp:
+            microseconds = self._string(stamp)
+            flags |= _BIN_RAW_TIMESTAMP
+
+        mood = entry["mood"]
+        mood_id = self._moods.setdefault(mood, len(self._moods))
+        if mood not in self._catalog:
+            self._catalog[mood] = set(tasks_for_mood(mood)) if mood in MOOD_TASKS else set()
+        task = entry["task"]
+        if task in self._catalog[mood]:
+            task_ref = self._tasks.setdefault(task, len(self._tasks))
+        else:
+            task_ref = self._string(task)
+            flags |= _BIN_CUSTOM_TASK
+        note_ref = 0
+        if entry["note"] is not None:
+            note_ref = self._string(entry["note"])
+            flags |= _BIN_NOTE
+
+        self.records += _BINARY_RECORD.pack(raw_id, entry["ts"], entry["tz"], microseconds,
+                                            task_ref, note_ref, mood_id, flags)
+        self.count += 1
+
+    def save(self, path: str) -> None:
+        """Writes the binary log atomically."""
+        meta = json.dumps({"schema": SCHEMA_VERSION, "moods": list(self._moods), "tasks": list(self._tasks)},
+                          ensure_ascii=False).encode('utf-8')
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(BINARY_LOG_MAGIC)
+            f.write(_BINARY_HEADER.pack(BINARY_LOG_VERSION, _BINARY_RECORD.size, len(meta), self.count, len(self.strings)))
+            f.write(meta)
+            f.write(self.records)
+            f.write(self.strings)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        if METRICS.enabled:
+            METRICS.record_io(bytes_written=len(BINARY_LOG_MAGIC) + _BINARY_HEADER.size + len(meta)
+                              + len(self.records) + len(self.strings), entries=self.count)
+
+
+def write_binary_log(entries, path: str) -> int:
+    """Writes entries (in log order) as a binary log; returns how many were written."""
+    writer = BinaryLogWriter()
+    for entry in entries:
+        writer.add(entry)
+    writer.save(path)
+    return writer.count
+
+
+class BinaryLog(Sequence):
+    """A binary log opened for reading, as a sequence of entries.
+
+    Opening maps the file and reads only the header; an entry is decoded when it is
+    accessed, and every distinct string is decoded once and then shared.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            prefix = f.read(len(BINARY_LOG_MAGIC) + _BINARY_HEADER.size)
+            if prefix[:len(BINARY_LOG_MAGIC)] != BINARY_LOG_MAGIC or len(prefix) < len(BINARY_LOG_MAGIC) + _BINARY_HEADER.size:
+                raise ValueError(f"'{path}' is not a MoodMate binary log")
+            version, record_size, meta_size, count, strings_size = _BINARY_HEADER.unpack_from(prefix, len(BINARY_LOG_MAGIC))
+            if version > BINARY_LOG_VERSION or record_size != _BINARY_RECORD.size:
+                raise ValueError(f"'{path}' uses binary log format v{version}; please update MoodMate to read it.")
+            self.meta = json.loads(f.read(meta_size))
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._records = len(prefix) + meta_size
+        self._strings = self._records + count * record_size
+        self._count = count
+        if self._strings + strings_size != len(self._data):
+            raise ValueError(f"'{path}' is truncated or damaged")
+        _schema_of({"format": LOG_FORMAT, "schema": self.meta["schema"]}) # Refuses entries newer than this MoodMate
+        self._moods, self._tasks = self.meta["moods"], self.meta["tasks"]
+        self._text: Dict[int, str] = {}
+        self._days: Dict[int, str] = {}  # Day number -> "YYYY-MM-DDT"
+        self._clock: Dict[int, str] = {}  # Second of the day -> "HH:MM:SS"
+        if METRICS.enabled:
+            METRICS.record_io(bytes_read=self._records)
+
+    def _string(self, offset: int) -> str:
+        text = self._text.get(offset)
+        if text is None:
+            start = self._strings + offset
+            size, = struct.unpack_from("<I", self._data, start)
+            text = self._text[offset] = self._data[start + 4:start + 4 + size].decode('utf-8')
+        return text
+
+    def _timestamp(self, ts: int, tz: int, microseconds: int) -> str:
+        """Same as _iso_timestamp, built from cached date and time-of-day strings."""
+        day, second = divmod(ts + tz, SECONDS_PER_DAY)
+        date = self._days.get(day)
+        if date is None:
+            date = self._days[day] = (EPOCH + timedelta(days=day)).date().isoformat() + "T"
+        clock = self._clock.get(second)
+        if clock is None:
+            clock = self._clock[second] = f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+        return f"{date}{clock}.{microseconds:06d}" if microseconds else date + clock
+
+    def _entry(self, raw_id: bytes, ts: int, tz: int, microseconds: int, task: int, note: int,
+               mood: int, flags: int) -> Dict:
+        return {
+            "id": self._string(int.from_bytes(raw_id[:4], 'little')) if flags & _BIN_TEXT_ID else raw_id.hex(),
+            "timestamp": self._string(microseconds) if flags & _BIN_RAW_TIMESTAMP else self._timestamp(ts, tz, microseconds),
+            "ts": ts,
+            "tz": tz,
+            "mood": self._moods[mood],
+            "task": self._string(task) if flags & _BIN_CUSTOM_TASK else self._tasks[task],
+            "note": self._string(note) if flags & _BIN_NOTE else None,
+            "completed": bool(flags & _BIN_COMPLETED),
+        }
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("binary log index out of range")
+        return self._entry(*_BINARY_RECORD.unpack_from(self._data, self._records + index * _BINARY_RECORD.size))
+
+    def __iter__(self) -> Iterator[Dict]:
+        size = _BINARY_RECORD.size
+        for start in range(self._records, self._strings, _BINARY_READ_BATCH * size):
+            chunk = self._data[start:min(start + _BINARY_READ_BATCH * size, self._strings)]
+            for values in _BINARY_RECORD.iter_unpack(chunk):
+                yield self._entry(*values)
+
+    def close(self) -> None:
+        self._data.close()
+
+    def __enter__(self) -> "BinaryLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def convert_log(source: str, output: str) -> int:
+    """Converts a JSON log into a binary one or back, depending on what `source` is.
+
+    JSON logs of any schema are streamed and upgraded on the way, with the edits in their
+    history overlay applied; binary logs become a JSON log in the stored format (header
+    and record checksums). Returns the entry count.
+    """
+    if is_binary_log(source):
+        temp_path = output + ".converting"
+        with BinaryLog(source) as log, open(temp_path, 'w', encoding='utf-8', newline='\n') as out:
+            out.write("[\n" + json.dumps(_log_header()))
+            for entry in log:
+                out.write(",\n" + _encode_record(entry))
+            out.write("\n]\n")
+            out.flush()
+            os.fsync(out.fileno())
+            count = len(log)
+        _install_log(temp_path, output)
+        return count
+
+    writer = BinaryLogWriter()
+    if _history_overlay(source): # Only logs a MoodLogger has opened, so already in the current schema
+        for entry in scan_records(source):
+            writer.add(entry)
+        writer.save(output)
+        return writer.count
+    with open(source, 'rb') as src:
+        version = None
+        for item, _ in _iter_array_items(src):
+            if version is None: # The header, or the first entry of an unversioned log
+                version = _schema_of(item if _is_header(item) else None)
+                if _is_header(item):
+                    continue
+            writer.add(migrate_entry(_strip_checksum(item), version))
+    writer.save(output)
+    return writer.count
+
+
+# ======================
+# 🗜️ Retention & Rollups
+# ======================
+# Compaction replaces old entries with one rollup per day (and, further back, per week)
+# holding the same counts a partial aggregate has, minus the per-entry detail. Rollups
+# live in <log>.rollups.json and are merged into stats like any other partial.
+NOTE_EXCERPT_CHARS = 70
+
+
+def _week_of(day: int) -> int:
+    """Day number of the Monday starting the week that contains `day`."""
+    return day - (day + 3) % 7 # Day 0 (1970-01-01) was a Thursday
+
+
+def _as_rollup(partial: Dict, keep_notes: bool = ROLLUP_KEEP_NOTES) -> Dict:
+    """Keeps the parts of a partial aggregate that a rollup stores."""
+    return {
+        "total": partial["total"],
+        "completed": partial["completed"],
+        "notes_count": partial["notes_count"],
+        "by_mood": partial["by_mood"],
+        "notes": [note[:NOTE_EXCERPT_CHARS] for note in partial["recent_notes"]] if keep_notes else [],
     }
+
+
+def _rollup_partial(day: int, rollup: Dict) -> Dict:
+    """Turns a stored rollup back into a partial aggregate dated to its first day."""
+    partial = _empty_partial()
+    partial.update(
+        total=rollup["total"], completed=rollup["completed"], notes_count=rollup["notes_count"],
+        by_mood=dict(rollup["by_mood"]), by_day={day: rollup["total"]}, recent_notes=list(rollup["notes"]),
+    )
+    return partial
+
+
+# ======================
+# 📉 Trend Detection
+# ======================
+# Every mood has a (valence, arousal) score in the catalog. A TrendDetector folds entries
+# one at a time into exponentially weighted baselines of both, runs a CUSUM change-point
+# test on each (valence drifting down, arousal drifting up) and tracks the usual gap
+# between entries. A shift toward stressed/overwhelmed/anxious moods, or logging that
+# suddenly stops, is flagged in O(1) per entry without rereading the history.
+TREND_ALPHA = 0.1  # Weight of the newest entry in the baselines
+TREND_CUSUM_SLACK = 0.5  # Drift (in baseline standard deviations) tolerated per entry...
+TREND_CUSUM_LIMIT = 5.0  # ...and accumulated drift that raises an alert
+TREND_WARMUP = 10  # Entries needed before anything is flagged
+TREND_MIN_SD = 0.2  # Floor for the baseline spread, so a very steady history is not hair-trigger
+TREND_GAP_FACTOR = 4.0  # A gap this many times longer than usual is flagged...
+TREND_MIN_GAP = 2 * SECONDS_PER_DAY  # ...if it is also at least this long
+TREND_ANOMALIES_KEPT = 50
+TREND_MESSAGES = {
+    "distress_shift": "Moods have been shifting toward stressed, anxious or overwhelmed.",
+    "negative_shift": "Moods have been lower than usual lately.",
+    "tension_shift": "Moods have been more tense and restless than usual.",
 }
 
 
+def mood_score(mood: str) -> Tuple[float, float]:
+    """(valence, arousal) of a mood from the catalog; unknown moods count as neutral."""
+    score = MOOD_SCORES.get(mood)
+    return (float(score[0]), float(score[1])) if score else (0.0, 0.0)
+
+
+class TrendDetector:
+    """Streaming valence/arousal baselines and change-point alerts for one log."""
+
+    def __init__(self, state: Optional[Dict] = None):
+        self.state = state or {
+            "seq": 0, "count": 0, "last_ts": None, "gap": None,
+            "valence": [0.0, 0.0], "arousal": [0.0, 0.0], # Exponentially weighted mean and variance
+            "cusum": {"valence": 0.0, "arousal": 0.0}, "anomalies": [],
+        }
+
+    @staticmethod
+    def _observe(stats: List[float], x: float, first: bool) -> float:
+        """Returns the z-score of `x` against the baseline, then moves the baseline toward it."""
+        mean, var = stats
+        if first:
+            stats[:] = [x, 0.0]
+            return 0.0
+        diff = x - mean
+        stats[:] = [mean + TREND_ALPHA * diff, (1 - TREND_ALPHA) * (var + TREND_ALPHA * diff * diff)]
+        return diff / max(var ** 0.5, TREND_MIN_SD)
+
+    def _flag(self, kind: str, entry: Dict, message: str) -> Dict:
+        anomaly = {"kind": kind, "ts": entry["ts"], "id": entry.get("id"), "message": message}
+        self.state["anomalies"] = (self.state["anomalies"] + [anomaly])[-TREND_ANOMALIES_KEPT:]
+        return anomaly
+
+    def update(self, entry: Dict) -> List[Dict]:
+        """Folds one entry (in time order) into the baselines; returns what it flagged."""
+        state, found = self.state, []
+        if state["last_ts"] is not None and entry["ts"] < state["last_ts"]:
+            return found # Backfilled history (a restore or a sync) is not a new signal
+        valence, arousal = mood_score(entry["mood"])
+        first = state["count"] == 0
+        z_valence = self._observe(state["valence"], valence, first)
+        z_arousal = self._observe(state["arousal"], arousal, first)
+        state["count"] += 1
+
+        cusum = state["cusum"]
+        cusum["valence"] = max(0.0, cusum["valence"] - z_valence - TREND_CUSUM_SLACK)
+        cusum["arousal"] = max(0.0, cusum["arousal"] + z_arousal - TREND_CUSUM_SLACK)
+        if state["count"] <= TREND_WARMUP:
+            cusum["valence"] = cusum["arousal"] = 0.0
+        shifts = [axis for axis in ("valence", "arousal") if cusum[axis] > TREND_CUSUM_LIMIT]
+        if shifts:
+            kind = {("valence",): "negative_shift", ("arousal",): "tension_shift"}.get(tuple(shifts), "distress_shift")
+            found.append(self._flag(kind, entry, TREND_MESSAGES[kind]))
+            for axis in shifts:
+                cusum[axis] = 0.0
+
+        if state["last_ts"] is not None:
+            gap = entry["ts"] - state["last_ts"]
+            if state["gap"] is not None and self._is_long_gap(gap):
+                found.append(self._flag("logging_gap", entry, f"Logging paused for {gap / SECONDS_PER_DAY:.1f} days before this entry."))
+            state["gap"] = gap if state["gap"] is None else state["gap"] + TREND_ALPHA * (gap - state["gap"])
+        state["last_ts"] = entry["ts"]
+        return found
+
+    def _is_long_gap(self, gap: float) -> bool:
+        return self.state["gap"] is not None and gap > max(TREND_MIN_GAP, TREND_GAP_FACTOR * self.state["gap"])
+
+    def silence(self, now: Optional[int] = None) -> Optional[Dict]:
+        """An alert if nothing has been logged for unusually long, else None."""
+        now = int(time.time()) if now is None else now
+        last = self.state["last_ts"]
+        if last is None or self.state["count"] <= TREND_WARMUP or not self._is_long_gap(now - last):
+            return None
+        return {"kind": "silence", "ts": now, "id": None,
+                "message": f"Nothing logged for {(now - last) / SECONDS_PER_DAY:.1f} days."}
+
+
+# ======================
+# 🏷️ Note Tagging
+# ======================
+# Notes are tagged offline with a small lexicon (moodmate_catalog/<locale>.lexicon.json):
+# topic tags ("work", "sleep", ...), the first few content words as keywords, and a
+# sentiment score in [-1, 1] from word scores with negation and intensifiers. Results
+# are cached per log in <log>.notetags.jsonl by a hash of the note text, so every
+# distinct note is analyzed once; the first line names the lexicon version they came from.
+NOTE_TAG_BATCH = 2000  # Distinct notes per task sent to a worker process
+NOTE_KEYWORDS_KEPT = 5
+_NOTE_WORD = re.compile(r"[a-z][a-z']*")
+_LEXICONS: Dict[str, Dict] = {}
+_NOTE_TAGS: Dict[str, Tuple[str, Dict[str, Dict]]] = {}  # Cache path -> (lexicon digest, hash -> result)
+
+
+def lexicon_path(locale: Optional[str] = None) -> str:
+    """Lexicon file for a locale (default: the catalog's), falling back to the bundled DEFAULT_LOCALE one."""
+    for directory, name in ((MOOD_TASKS.directory, locale or MOOD_TASKS.locale), (MOOD_TASKS.directory, DEFAULT_LOCALE)):
+        path = os.path.join(directory, f"{name}.lexicon.json")
+        if os.path.exists(path):
+            return path
+    return os.path.join(CATALOG_DIR, f"{DEFAULT_LOCALE}.lexicon.json")
+
+
+def load_lexicon(path: str) -> Dict:
+    """Loads a lexicon file once per process, with lookup tables and a digest of its contents."""
+    if path not in _LEXICONS:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        lexicon = json.loads(raw)
+        lexicon["digest"] = hashlib.sha256(raw).hexdigest()[:16]
+        lexicon["stopwords"] = set(lexicon["stopwords"])
+        lexicon["negations"] = set(lexicon["negations"])
+        lexicon["tag_of"] = {word: tag for tag, words in lexicon["tags"].items() for word in words}
+        _LEXICONS[path] = lexicon
+    return _LEXICONS[path]
+
+
+def note_hash(note: str) -> str:
+    return hashlib.blake2b(note.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def analyze_note(note: str, lexicon: Dict) -> Dict:
+    """Returns {"tags", "keywords", "sentiment"} for one note."""
+    words = _NOTE_WORD.findall(note.lower().replace("’", "'"))
+    tags, keywords = [], []
+    score, negated, boost = 0.0, 0, 1.0
+    for word in words:
+        tag = lexicon["tag_of"].get(word) or (word.endswith("s") and lexicon["tag_of"].get(word[:-1]))
+        if tag and tag not in tags:
+            tags.append(tag)
+        if word in lexicon["negations"]:
+            negated = 3 # Flips the next few words: "not very happy"
+            continue
+        if word in lexicon["intensifiers"]:
+            boost = lexicon["intensifiers"][word]
+            continue
+        value = lexicon["sentiment"].get(word)
+        if value:
+            score += value * boost * (-0.75 if negated else 1)
+        if word not in lexicon["stopwords"] and len(word) > 2 and word not in keywords \
+                and len(keywords) < NOTE_KEYWORDS_KEPT:
+            keywords.append(word)
+        boost, negated = 1.0, max(0, negated - 1)
+    return {"tags": tags, "keywords": keywords, "sentiment": round(score / (score * score + 15) ** 0.5, 3)}
+
+
+def _analyze_batch(path: str, notes: List[str]) -> List[Dict]:
+    """Worker-side: analyzes a batch of notes with the lexicon at `path`."""
+    lexicon = load_lexicon(path)
+    return [analyze_note(note, lexicon) for note in notes]
+
+
+def tag_notes(notes, path: str, workers: Optional[int] = None,
+              known: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+    """Analyzes every distinct note not in `known`; returns {note hash: result} for them.
+
+    With `workers` > 1 the notes are analyzed in batches of NOTE_TAG_BATCH in worker processes.
+    """
+    known = known or {}
+    todo: Dict[str, str] = {}
+    for note in notes:
+        key = note_hash(note)
+        if key not in known and key not in todo:
+            todo[key] = note
+    texts = list(todo.values())
+    batches = [texts[i:i + NOTE_TAG_BATCH] for i in range(0, len(texts), NOTE_TAG_BATCH)]
+    if workers and workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [result for batch in pool.map(functools.partial(_analyze_batch, path), batches) for result in batch]
+    else:
+        results = [result for batch in batches for result in _analyze_batch(path, batch)]
+    return dict(zip(todo, results))
+
+
+# ======================
+# ✍️ Write-Behind
+# ======================
+# In write-behind mode new entries are queued in memory and a background thread stores
+# them in batches, so logging never waits for the file rewrite. Queues are shared per
+# log file like the parse cache; readers on the same file overlay the queued entries and
+# anything that edits stored entries flushes the queue first.
+_WRITE_BEHIND: Dict[str, "WriteBehindQueue"] = {}
+
+
+class WriteBehindQueue:
+    """Buffers new entries for one log file and flushes them from a background thread."""
+
+    def __init__(self, logger: "MoodLogger", batch_size: int = WRITE_BEHIND_BATCH,
+                 delay: float = WRITE_BEHIND_DELAY):
+        self.logger = logger
+        self.batch_size = batch_size
+        self.delay = delay
+        self._entries: List[Dict] = []
+        self._oldest = 0.0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=f"moodmate-write-behind:{logger.log_file}", daemon=True)
+        self._thread.start()
+
+    def put(self, entry: Dict) -> None:
+        """Queues an entry; returns without touching the disk."""
+        with self._cond:
+            if not self._entries:
+                self._oldest = time.monotonic()
+            self._entries.append(entry)
+            if len(self._entries) in (1, self.batch_size): # Start the delay, or flush a full batch now
+                self._cond.notify()
+
+    def snapshot(self) -> List[Dict]:
+        """Returns the entries still waiting to be stored, oldest first."""
+        with self._cond:
+            return list(self._entries)
+
+    def flush(self) -> int:
+        """Stores every queued entry with one write; returns how many were stored."""
+        with self.logger._lock: # Readers never see an entry both queued and stored
+            with self._cond:
+                batch, self._entries = self._entries, []
+            if not batch:
+                return 0
+            try:
+                self.logger.append_entries(batch)
+            except Exception:
+                with self._cond:
+                    self._entries[:0] = batch # Keep them for the next attempt
+                raise
+            return len(batch)
+
+    def close(self) -> None:
+        """Stops the background thread and stores whatever is left."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._entries and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                while len(self._entries) < self.batch_size and not self._closed:
+                    remaining = self._oldest + self.delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"{COLORS['warning']}⚠️ Could not save queued entries, will retry: {e}{COLORS['reset']}")
+                time.sleep(self.delay)
+
+
+def _queued_entries(path: str) -> List[Dict]:
+    """Entries queued in write-behind mode for a log file (absolute path), if any."""
+    queue = _WRITE_BEHIND.get(path)
+    return queue.snapshot() if queue is not None else []
+
+
+def flush_write_behind() -> None:
+    """Stores the queued entries of every log file and stops the background threads."""
+    for path in list(_WRITE_BEHIND):
+        _WRITE_BEHIND.pop(path).close()
+
+
+def _exit_on_signal(signum, frame) -> None:
+    """Turns SIGTERM/SIGHUP into a normal exit, so the atexit hook stores queued entries.
+
+    Nothing is written from here. The handler runs on the main thread between two
+    bytecodes; if that thread holds a log lock (say, halfway through append_entries),
+    the exit is only recorded and happens once it lets go of the last one.
+    """
+    if _MAIN_THREAD_HOLDS[0]:
+        _DEFERRED_SIGNALS.append(signum)
+    else:
+        _exit_for_signal(signum, frame)
+
+
+def _exit_for_signal(signum: int, frame=None) -> None:
+    previous = _PREVIOUS_SIGNAL_HANDLERS.get(signum)
+    if callable(previous):
+        previous(signum, frame)
+    else:
+        sys.exit(128 + signum)
+
+
+_DEFERRED_SIGNALS: List[int] = []
+_PREVIOUS_SIGNAL_HANDLERS: Dict[int, object] = {}
+
+
+def _install_flush_handlers() -> None:
+    """Flushes write-behind queues at exit, including exits on SIGTERM/SIGHUP (main thread only)."""
+    if _PREVIOUS_SIGNAL_HANDLERS or threading.current_thread() is not threading.main_thread():
+        return
+    atexit.register(flush_write_behind)
+    for name in ("SIGTERM", "SIGHUP"):
+        if hasattr(signal, name):
+            signum = getattr(signal, name)
+            _PREVIOUS_SIGNAL_HANDLERS[signum] = signal.signal(signum, _exit_on_signal)
+
+
+def invalidate_log_cache(path: Optional[str] = None) -> None:
+    """Drops the cached parse of one log file, or of all of them."""
+    if path is None:
+        _LOG_CACHE.clear()
+        _HISTORY.clear()
+        _VIEWS.clear()
+    else:
+        _LOG_CACHE.pop(os.path.abspath(path), None)
+        _VIEWS.pop(os.path.abspath(path), None)
+
+
+# ======================
+# 🕘 Edit History
+# ======================
+# Edits and deletes are appended to <log>.history.jsonl as numbered deltas instead of
+# rewriting the log, e.g. {"v": 7, "op": "edit", "id": ..., "pos": 12, "before":
+# {"note": null}, "after": {"note": "..."}, "at": ..., "kind": "do", "group": 7}. A
+# delete keeps the whole entry in "before"; undoing it appends a "restore". Deltas newer
+# than the last {"materialized": v} line are an overlay on top of the stored log, folded
+# into it by a rewrite only once HISTORY_OVERLAY_MAX of them have piled up. Changes made
+# together share a "group" and are undone together; undo and redo append the inverse
+# (or the original) deltas of a group, so every step is one small append.
+_HISTORY: Dict[str, Tuple[Tuple[int, int, int], Dict]] = {}  # History path -> (signature, replayed state)
+_VIEWS: Dict[str, Tuple[List[Dict], int, List[Dict]]] = {}  # Log path -> (stored list, version, log with overlay)
+
+
+def _empty_history() -> Dict:
+    return {"version": 0, "materialized": 0, "overlay": [], "undo": [], "redo": [], "size": 0}
+
+
+def _replay_history(state: Dict, record: Dict) -> None:
+    """Folds one history line into the replayed state: overlay plus undo and redo stacks.
+    Changes merged from other replicas ("sync") only join the overlay."""
+    if "materialized" in record:
+        state["materialized"] = max(state["materialized"], record["materialized"])
+        state["version"] = max(state["version"], record["materialized"])
+        state["overlay"] = [delta for delta in state["overlay"] if delta["v"] > state["materialized"]]
+        if "undo" in record: # Written by pruning: the stacks as they were, minus what fell off
+            state["undo"], state["redo"] = record["undo"], record["redo"]
+        return
+    state["version"] = max(state["version"], record["v"])
+    if record["v"] > state["materialized"]:
+        state["overlay"].append(record)
+    undo, redo = state["undo"], state["redo"]
+    if record["kind"] == "do":
+        if not undo or undo[-1][0]["group"] != record["group"]:
+            undo.append([])
+            redo.clear()
+        undo[-1].append(record)
+    elif record["kind"] == "undo" and undo and undo[-1][0]["group"] == record["target"]:
+        redo.append(undo.pop())
+    elif record["kind"] == "redo" and redo and redo[-1][0]["group"] == record["target"]:
+        undo.append(redo.pop())
+
+
+def _apply_delta(logs: List[Dict], delta: Dict) -> None:
+    """Applies one delta to a list of entries in place; applying it twice changes nothing."""
+    position = delta["pos"]
+    if not (0 <= position < len(logs) and logs[position]["id"] == delta["id"]):
+        position = next((i for i, entry in enumerate(logs) if entry["id"] == delta["id"]), None)
+    if delta["op"] == "restore":
+        if position is None:
+            logs.insert(min(delta["pos"], len(logs)), dict(delta["after"]))
+    elif position is not None:
+        if delta["op"] == "edit":
+            logs[position] = {**logs[position], **delta["after"]} # Copy, the stored entry may be shared
+        else:
+            del logs[position]
+
+
+def _inverse_delta(delta: Dict) -> Dict:
+    """The delta that takes an entry back to how it was before `delta`."""
+    op = {"edit": "edit", "delete": "restore", "restore": "delete"}[delta["op"]]
+    return {"op": op, "id": delta["id"], "pos": delta["pos"], "before": delta["after"], "after": delta["before"]}
+
+
+def _history_file(log_path: str) -> str:
+    return os.path.splitext(log_path)[0] + ".history.jsonl"
+
+
+def _history_overlay(log_path: str) -> List[Dict]:
+    """The deltas recorded for a log file that are not stored in it yet.
+
+    For code working on the file directly (scans, conversion, migration) rather than
+    through a MoodLogger, which keeps the replayed history cached.
+    """
+    path = os.path.abspath(_history_file(log_path))
+    try:
+        signature = _file_signature(path)
+    except FileNotFoundError:
+        return []
+    cached = _HISTORY.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]["overlay"]
+    state = _empty_history()
+    with open(path, 'rb') as f:
+        data = f.read()
+    complete = data.rfind(b"\n") + 1 # Skip a torn last line
+    for line in data[:complete].splitlines():
+        _replay_history(state, json.loads(line))
+    state["size"] = complete
+    _HISTORY[path] = (signature, state) # Replayed just as MoodLogger._history would, so it can be shared
+    return state["overlay"]
+
+
+def _overlay_by_id(overlay: List[Dict]) -> Dict[str, List[Dict]]:
+    """The overlay's deltas grouped by the entry they touch, in the order they apply.
+
+    Readers that work on stored records (scans, the pending index) only need to patch the
+    records of these ids instead of replaying the overlay over the whole log.
+    """
+    by_id: Dict[str, List[Dict]] = {}
+    for delta in overlay:
+        by_id.setdefault(delta["id"], []).append(delta)
+    return by_id
+
+
+def _restores_unstored(by_id: Dict[str, List[Dict]]) -> bool:
+    """True if the overlay brings back an entry the stored log no longer holds (one deleted
+    before the log was last rewritten); only a full replay knows where that entry goes."""
+    return any(deltas[0]["op"] == "restore" for deltas in by_id.values())
+
+
+def _patched(entry: Optional[Dict], deltas: List[Dict]) -> Optional[Dict]:
+    """An entry as its deltas leave it (None once deleted), starting from its stored version."""
+    for delta in deltas:
+        if delta["op"] == "restore":
+            if entry is None:
+                entry = dict(delta["after"])
+        elif entry is not None:
+            entry = {**entry, **delta["after"]} if delta["op"] == "edit" else None
+    return entry
+
+
+# ======================
+# 📡 Change Feed
+# ======================
+# Live consumers follow the change log (see "Change log & replication") instead of
+# re-reading the whole mood log: every new, edited, deleted or rolled-up entry is one
+# event carrying its sequence number, so a consumer that remembers the last seq it saw
+# only ever reads what changed since.
+FEED_SEND_TIMEOUT = 2.0  # Seconds a broadcast subscriber may lag before it is dropped
+FEED_CLIENT_BACKLOG = 1024  # Events queued for one broadcast subscriber before it counts as too slow
+_IN_MODIFY, _IN_CLOSE_WRITE, _IN_MOVED_TO, _IN_CREATE = 0x2, 0x8, 0x80, 0x100
+
+
+def _change_event(change: Dict) -> Dict:
+    """Turns a change record into a feed event: {"seq", "type", "id", "fields", ...}."""
+    if change["op"] in ("delete", "retire"):
+        kind = change["op"]
+    else:
+        kind = "new" if {"timestamp", "mood", "task"} <= change["fields"].keys() else "edit"
+    return {**change, "type": kind}
+
+
+def _inotify_watch(directory: str) -> Optional[int]:
+    """Returns a non-blocking inotify descriptor watching `directory`, or None if unavailable."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+    if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+class ChangeWatcher:
+    """Waits for a file to change, with inotify where the platform has it and polling elsewhere."""
+
+    def __init__(self, path: str, poll_interval: float = FEED_POLL_INTERVAL):
+        self.path = os.path.abspath(path)
+        self.poll_interval = poll_interval
+        self._fd = _inotify_watch(os.path.dirname(self.path))
+        self.mark()
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._fd is not None else "polling"
+
+    def _signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            return _file_signature(self.path)
+        except OSError:
+            return None
+
+    def mark(self) -> None:
+        """Remembers the file as it is now; `wait` returns once it differs."""
+        self._seen = self._signature()
+
+    def _drain(self) -> None:
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except OSError:
+            pass # Nothing left to read
+
+    def _changed(self) -> bool:
+        signature = self._signature()
+        if signature == self._seen:
+            return False # Another file in the directory, or nothing at all
+        self._seen = signature
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the file changes or `timeout` seconds pass; returns whether it changed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if self._fd is not None:
+                if select.select([self._fd], [], [], remaining)[0]:
+                    self._drain()
+            else:
+                time.sleep(self.poll_interval if remaining is None else min(self.poll_interval, remaining))
+            if self._changed():
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    async def wait_async(self, timeout: float) -> bool:
+        """Like `wait`, without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        if self._fd is not None:
+            ready = loop.create_future()
+            loop.add_reader(self._fd, lambda: ready.done() or ready.set_result(None))
+            try:
+                await asyncio.wait_for(ready, timeout)
+                self._drain()
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                loop.remove_reader(self._fd)
+        else:
+            await asyncio.sleep(min(self.poll_interval, timeout))
+        return self._changed()
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class _FeedClient:
+    """One broadcast subscriber: its socket and the lines still to be sent to it."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.lines: "queue.Queue[Optional[bytes]]" = queue.Queue(FEED_CLIENT_BACKLOG)
+        self.thread: Optional[threading.Thread] = None
+
+
+class FeedBroadcaster:
+    """Pushes a logger's change feed to every client of a local Unix socket.
+
+    Each client first receives {"seq": N}, the point where its live stream starts (read
+    anything older with `MoodLogger.feed(since, N)`), then one JSON line per event.
+    Every client has its own queue and sending thread, so a slow reader only holds up
+    itself. Clients that stop reading for FEED_SEND_TIMEOUT seconds, or fall
+    FEED_CLIENT_BACKLOG events behind, are dropped.
+    """
+
+    def __init__(self, logger: "MoodLogger", socket_path: str, poll_interval: float = FEED_POLL_INTERVAL):
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix sockets are not available on this platform")
+        self.logger = logger
+        self.socket_path = socket_path
+        self.poll_interval = poll_interval
+        self._clients: List[_FeedClient] = []
+        self._clients_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._server: Optional[socket.socket] = None
+        self.seq = logger.feed_head()
+
+    def start(self) -> "FeedBroadcaster":
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path) # Left over from a broadcaster that did not shut down
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.socket_path)
+        self._server.listen()
+        self._server.settimeout(self.poll_interval) # So accept() notices stop()
+        for target in (self._accept, self._pump):
+            thread = threading.Thread(target=target, name=f"moodmate-feed-{target.__name__[1:]}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _accept(self) -> None:
+        while not self._stop.is_set():
+            try:
+                client, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            client.settimeout(FEED_SEND_TIMEOUT)
+            subscriber = _FeedClient(client)
+            with self._clients_lock: # The greeting and the events queued after it agree on the seq
+                subscriber.lines.put_nowait((json.dumps({"seq": self.seq}) + "\n").encode())
+                self._clients.append(subscriber)
+            subscriber.thread = threading.Thread(target=self._send, args=(subscriber,), name="moodmate-feed-send", daemon=True)
+            subscriber.thread.start()
+
+    def _pump(self) -> None:
+        for event in self.logger.follow(self.seq, stop=self._stop, poll_interval=self.poll_interval):
+            line = (json.dumps(event) + "\n").encode()
+            with self._clients_lock:
+                clients = list(self._clients)
+                self.seq = event["seq"] # Clients accepted from now on start after this event
+            for client in clients:
+                try:
+                    client.lines.put_nowait(line)
+                except queue.Full: # Too far behind to catch up
+                    self._drop(client)
+
+    def _send(self, client: _FeedClient) -> None:
+        """Writes one client's queued lines, each whole or not at all until the client is dropped."""
+        while True:
+            line = client.lines.get()
+            if line is None:
+                break
+            try:
+                client.sock.sendall(line)
+            except OSError: # Gone, too slow to keep up, or dropped
+                break
+        self._drop(client)
+        client.sock.close()
+
+    def _drop(self, client: _FeedClient) -> None:
+        with self._clients_lock:
+            if client in self._clients:
+                self._clients.remove(client)
+        with contextlib.suppress(OSError): # Wakes a blocked send; the stream ends on a line boundary unless it was midway
+            client.sock.shutdown(socket.SHUT_RDWR)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._clients)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._server is not None:
+            self._server.close()
+        for thread in self._threads:
+            thread.join()
+        with self._clients_lock:
+            clients = list(self._clients)
+        for client in clients:
+            self._drop(client)
+            with contextlib.suppress(queue.Full):
+                client.lines.put_nowait(None)
+        for client in clients:
+            client.thread.join()
+        with contextlib.suppress(OSError):
+            os.unlink(self.socket_path)
+
+    def __enter__(self) -> "FeedBroadcaster":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def subscribe(socket_path: str) -> Iterator[Dict]:
+    """Yields the events a FeedBroadcaster pushes, starting with its {"seq": N} greeting.
+
+    Ends when the broadcaster closes the connection; a last line it could not finish
+    before dropping this client is left out.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        with client.makefile('r', encoding='utf-8') as stream:
+            for line in stream:
+                if not line.endswith("\n"):
+                    break
+                yield json.loads(line)
+
+
+# ======================
+# 📰 Reports
+# ======================
+# A report is a fixed list of sections. Each section is cached per period with the
+# change-feed position it was built at; a change only invalidates the sections that
+# read the fields it touched, and only if the entry lies in (or moves into) the period.
+REPORT_FORMATS = ("txt", "md", "html", "json")
+REPORT_SECTIONS = ("overview", "moods", "activity", "notes", "themes", "alerts")
+REPORT_CACHE_PERIODS = 120  # Periods remembered per log; the least recently used are dropped
+_REPORT_SECTION_DATA = {
+    "overview": lambda data: {key: data[key] for key in ("total", "completed", "completion_rate", "notes_count")},
+    "moods": lambda data: data["moods"],
+    "activity": lambda data: data["by_day"],
+    "notes": lambda data: data["recent_notes"],
+    "themes": lambda data: data["themes"],
+    "alerts": lambda data: data["alerts"],
+}
+_REPORT_ENTRY_SECTIONS = {"overview", "moods", "activity", "notes", "themes"}  # Rebuilt when entries come or go
+_REPORT_SECTIONS_BY_FIELD = {  # Sections an edit of each field can change ("task" appears in none)
+    "completed": {"overview"},
+    "mood": {"moods"},
+    "note": {"overview", "notes", "themes"},
+}
+
 
 # ======================
 # 🛠️ Core Classes
@@ -391,40 +2342,523 @@ MOOD_TASKS = {
 class MoodLogger:
     """Handles all mood logging operations, ensuring file integrity and data management."""
 
-    def __init__(self, log_file: str = LOG_FILE):
-        self.log_file = log_file
-        self._ensure_files()
+    def __init__(self, log_file: str = LOG_FILE, backup_file: Optional[str] = None,
+                 export_folder: Optional[str] = None, write_behind: bool = False):
+        self.log_file = log_file
+        self.backup_file = backup_file or BACKUP_FILE
+        self.export_folder = export_folder or EXPORT_FOLDER
+        self.aggregates_file = os.path.splitext(log_file)[0] + ".aggregates.json"
+        self.changes_file = os.path.splitext(log_file)[0] + ".changes.jsonl"
+        self.replica_file = os.path.splitext(log_file)[0] + ".replica.json"
+        self.versions_file = os.path.splitext(log_file)[0] + ".versions.json"
+        self.pending_index_file = os.path.splitext(log_file)[0] + ".pending.json"
+        self.rollups_file = os.path.splitext(log_file)[0] + ".rollups.json"
+        self.trends_file = os.path.splitext(log_file)[0] + ".trends.json"
+        self.note_tags_file = os.path.splitext(log_file)[0] + ".notetags.jsonl"
+        self.history_file = _history_file(log_file)
+        self.anomaly_hooks: List[Callable[[Dict], None]] = []
+        self._lock = _path_lock(log_file) # Shared by every logger on this file in the process
+        self._ensure_files()
+        if write_behind:
+            self.enable_write_behind()
+
+    def _ensure_files(self) -> None:
+        """Ensures the log file and export folder exist, repairing a log left torn by a crash."""
+        if not os.path.exists(self.log_file):
+            self._save([])
+        
+        if not os.path.exists(self.export_folder):
+            os.makedirs(self.export_folder)
+
+        if not os.path.exists(self.changes_file):
+            # Seed the change log with what is already stored so replicas receive the full history
+            with self._lock:
+                self._record_changes([
+                    {"id": entry["id"], "op": "put", "fields": _entry_fields(entry)} for entry in self._load()
+                ])
+                open(self.changes_file, 'a').close()
+        else:
+            self._repair_change_log()
+
+        if not self._is_closed():
+            self.recover() # Only reads the tail after the last checkpoint
+
+    def _read_logs(self, f, damaged: Optional[List[bytes]] = None) -> Tuple[List[Dict], int]:
+        """Parses log entries from a file opened in binary mode, upgrading them to the current schema.
+
+        Returns the entries and the schema version the file was stored in. A record that
+        fails its checksum raises ValueError, or with `damaged` is left out and its line
+        added to that list.
+        """
+        data = f.read()
+        logs = json.loads(data)
+        failures = _checksum_failures(data) if data[:2] == b"[\n" else []
+        if failures and damaged is None:
+            raise ValueError(f"Record {failures[0][0]} of '{f.name}' fails its checksum")
+        header = logs[0] if logs and _is_header(logs[0]) else None
+        version = _schema_of(header)
+        if failures:
+            skip = {position for position, _ in failures}
+            logs = [entry for position, entry in enumerate(logs) if position not in skip]
+            damaged.extend(line for _, line in failures)
+        if header is not None:
+            logs.pop(0)
+        for entry in logs:
+            entry.pop(CHECKSUM_FIELD, None)
+        if version < SCHEMA_VERSION:
+            logs = [migrate_entry(entry, version) for entry in logs]
+        if METRICS.enabled:
+            METRICS.record_io(bytes_read=f.tell(), entries=len(logs))
+        return logs, version
+
+    def _write_logs(self, f, logs: List[Dict], storage: bool = True) -> List[int]:
+        """Writes log entries as a JSON array with one record per line.
+
+        The stored format (`storage`) adds the schema header and record checksums; exports
+        are plain entries. Returns the byte offset of each record's line (relative to where
+        writing started), which is what lets single records be patched in place later on.
+        """
+        encode = _encode_record if storage else json.dumps
+        offsets = []
+        chunks = ["[\n"]
+        if storage:
+            chunks.append(json.dumps(_log_header()) + (",\n" if logs else "\n"))
+        position = sum(len(chunk) for chunk in chunks)
+        for i, entry in enumerate(logs):
+            line = encode(entry) + (",\n" if i < len(logs) - 1 else "\n") # ASCII, so len() is bytes
+            offsets.append(position)
+            chunks.append(line)
+            position += len(line)
+        chunks.append("]\n")
+        f.write("".join(chunks))
+        if METRICS.enabled:
+            METRICS.record_io(bytes_written=position + 2)
+        return offsets
+
+    def _load(self) -> List[Dict]:
+        """Returns the parsed log, re-reading the file only if it changed since the last parse.
+
+        Records appended by another process since the last parse are read from the tail
+        alone. The returned list is shared with the process-wide cache and must not be mutated.
+        """
+        with self._lock:
+            path = os.path.abspath(self.log_file)
+            signature = _file_signature(path)  # Taken before reading, so a racing write forces a re-parse
+            cached = _LOG_CACHE.get(path)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+            if cached is not None:
+                index = self._read_checkpoint()
+                if index is not None and tuple(index["signature"]) == cached[0] and self._catch_up(index):
+                    cached = _LOG_CACHE.get(path)
+                    if cached is not None and cached[0] == _file_signature(path):
+                        return cached[1]
+
+            damaged: List[bytes] = []
+            try:
+                with open(path, 'rb') as f:
+                    logs, version = self._read_logs(f, damaged)
+            except ValueError:
+                if not self.recover():
+                    raise
+                signature = _file_signature(path)
+                damaged.clear()
+                with open(path, 'rb') as f:
+                    logs, version = self._read_logs(f, damaged)
+            if damaged:
+                self._set_aside(b"\n".join(damaged) + b"\n", "damaged")
+            if version < SCHEMA_VERSION or damaged:
+                # Store the upgrade (or the log without its damaged records) once so nothing else has to cope with them
+                self._save(logs)
+            else:
+                _LOG_CACHE[path] = (signature, logs)
+            return logs
+
+    def _view(self) -> List[Dict]:
+        """Returns the log with its edit history applied plus any entries still queued in write-behind mode."""
+        with self._lock:
+            logs = self._current()
+            queued = _queued_entries(os.path.abspath(self.log_file))
+            return (logs + queued)[-MAX_LOG_ENTRIES:] if queued else logs
+
+    def _save(self, logs: List[Dict]) -> None:
+        """Atomically rewrites the log file, primes the cache and writes a fresh checkpoint."""
+        with self._lock:
+            path = os.path.abspath(self.log_file)
+            temp_path = path + ".tmp"
+            with open(temp_path, 'w', newline='\n') as f:
+                offsets = self._write_logs(f, logs)
+                size = f.tell()
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path) # A crash leaves either the old or the new log, never half of one
+            signature = _file_signature(path)
+            _LOG_CACHE[path] = (signature, logs)
+            self._write_checkpoint(signature, [
+                [entry["id"], position, offsets[position]]
+                for position, entry in enumerate(logs) if not entry["completed"]
+            ], len(logs), size - 3, [logs[-1]["id"], offsets[-1]] if logs else None)
+
+    # ----- Checkpoint & pending-task index -----
+    # Sidecar listing [id, position, byte offset] for every pending entry, tagged with the
+    # signature of the log file it describes. Completion workflows read it instead of
+    # scanning the log, and patch just the affected lines. It doubles as a checkpoint of
+    # the log's layout: how many records it held, where the last one ended ("end") and
+    # that record's [id, offset], plus the change-log seq at the time. Anything after
+    # "end" was appended later, so catching up or recovering reads only that tail.
+
+    def _write_checkpoint(self, signature: Tuple[int, int, int], pending: List[List],
+                          records: int, end: int, last: Optional[List]) -> None:
+        temp_path = self.pending_index_file + ".tmp"
+        with open(temp_path, 'w') as f:
+            f.write(json.dumps({"signature": list(signature), "pending": pending, "records": records,
+                                "end": end, "last": last, "seq": self._change_state()[0]})) # dumps() uses the C encoder
+        os.replace(temp_path, self.pending_index_file) # Never leaves a half-written checkpoint behind
+
+    def _read_checkpoint(self) -> Optional[Dict]:
+        """Returns the checkpoint as stored (possibly stale), or None if it is unusable."""
+        try:
+            with open(self.pending_index_file, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        required = ("signature", "pending", "records", "end", "last", "seq")
+        return index if isinstance(index, dict) and all(key in index for key in required) else None
+
+    def _checkpoint(self) -> Dict:
+        """Returns the checkpoint for the log as it is now, catching up or rebuilding a stale one."""
+        with self._lock:
+            index = self._read_checkpoint()
+            if index is not None and tuple(index["signature"]) == _file_signature(self.log_file):
+                return index
+            if not self._catch_up(index):
+                # The log was rewritten behind our back (or there is no checkpoint): rewrite both in our layout
+                self._save(list(self._load()))
+            return self._read_checkpoint()
+
+    def _pending_index(self) -> List[List]:
+        """Returns the pending [id, position, offset] triples, rebuilding a stale index."""
+        return self._checkpoint()["pending"]
+
+    # ----- Crash recovery -----
+
+    def _is_closed(self) -> bool:
+        """True if the log ends with its closing bracket, i.e. no write was cut short."""
+        with open(self.log_file, 'rb') as f:
+            f.seek(max(0, f.seek(0, os.SEEK_END) - 16))
+            return f.read().rstrip().endswith(b"]")
+
+    def _checkpoint_matches(self, index: Dict) -> bool:
+        """True if the log still starts with what the checkpoint describes (O(1) check)."""
+        with open(self.log_file, 'rb') as f:
+            if index["last"] is None: # No entries yet
+                if index["end"] == 1:
+                    return f.read(1) == b"[" # Logs from before schema headers
+                last_id, offset = None, 2 # The header is the last record
+            else:
+                last_id, offset = index["last"]
+            f.seek(offset)
+            line = f.read(index["end"] - offset + 1)
+        entry = _decode_record(line[:-1])
+        if entry is None or line[-1:] not in (b"\n", b","):
+            return False
+        return _is_header(entry) if last_id is None else entry.get("id") == last_id
+
+    def _catch_up(self, index: Optional[Dict], repair: bool = False) -> bool:
+        """Brings a stale checkpoint up to date by reading only the log's tail after it.
+
+        Records appended since the checkpoint are indexed (and recorded in the change
+        log if a crash kept them out of it). With `repair`, a torn tail is cut off and
+        saved next to the log instead of failing. Returns False if the checkpoint does not
+        describe a prefix of the log, e.g. after a full rewrite by another process.
+        """
+        path = os.path.abspath(self.log_file)
+        if index is None or not _is_line_layout(path) or not self._checkpoint_matches(index):
+            return False
+        end, records = index["end"], index["records"]
+        with open(path, 'r+b') as f:
+            f.seek(end)
+            tail = f.read()
+            appended, good, closed = _parse_tail(tail)
+            if any(not ENTRY_KEYS <= entry.keys() for _, entry in appended):
+                return False # Appended by an older MoodMate; let a full load upgrade them
+            if not closed:
+                if not repair:
+                    return False
+                self._set_aside(tail[good:])
+                f.seek(end + good)
+                f.write(b"\n]\n")
+                f.truncate()
+        if METRICS.enabled:
+            METRICS.record_io(bytes_read=len(tail), entries=len(appended))
+
+        entries = [entry for _, entry in appended]
+        pending = index["pending"] + [
+            [entry["id"], records + i, end + offset]
+            for i, (offset, entry) in enumerate(appended) if not entry["completed"]
+        ]
+        last = [entries[-1]["id"], end + appended[-1][0]] if appended else index["last"]
+        if entries:
+            logged = {change["id"] for change in _iter_changes(self.changes_file, index["seq"])}
+            self._record_changes([
+                {"id": entry["id"], "op": "put", "fields": _entry_fields(entry)}
+                for entry in entries if entry["id"] not in logged
+            ])
+        signature = _file_signature(path)
+        cached = _LOG_CACHE.get(path)
+        if cached is not None and cached[0] == tuple(index["signature"]):
+            _LOG_CACHE[path] = (signature, cached[1] + entries)
+        else:
+            invalidate_log_cache(path)
+        self._write_checkpoint(signature, pending, records + len(entries), end + good if appended else end, last)
+        return True
+
+    def _set_aside(self, torn: bytes, kind: str = "torn") -> None:
+        """Saves the bytes cut from a torn log (or its records that failed their checksum,
+        `kind` "damaged") next to it, so nothing is dropped silently."""
+        if not torn.strip(b" ,\r\n]"):
+            return
+        aside = f"{os.path.splitext(self.log_file)[0]}.{kind}-{datetime.now():%Y%m%d_%H%M%S}.txt"
+        with open(aside, 'ab') as f:
+            f.write(torn)
+        if kind == "damaged": # One record per line
+            records = torn.count(b"\n")
+            print(f"{COLORS['warning']}⚠️ {records} record(s) in '{self.log_file}' failed their checksum "
+                  f"and were left out. They were saved to '{aside}'.{COLORS['reset']}")
+        else:
+            print(f"{COLORS['warning']}⚠️ The last write to '{self.log_file}' was interrupted. "
+                  f"Its unreadable tail ({len(torn)} bytes) was saved to '{aside}'.{COLORS['reset']}")
+
+    def recover(self) -> bool:
+        """Repairs the log after an interrupted write, reading only what follows the last
+        checkpoint (or the whole log if there is none). Returns True if the log is intact.
+        """
+        with self._lock:
+            if not _is_line_layout(os.path.abspath(self.log_file)):
+                return False
+            if self._catch_up(self._read_checkpoint(), repair=True):
+                return True
+            _, header_end = _read_header(os.path.abspath(self.log_file))
+            start = {"signature": [], "pending": [], "records": 0, "end": header_end, "last": None, "seq": 0}
+            return self._catch_up(start, repair=True)
+
+    def _repair_change_log(self) -> None:
+        """Cuts a torn last line (from an interrupted append) off the change log."""
+        with self._lock, open(self.changes_file, 'r+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            chunk = 4096
+            while True:
+                start = max(0, size - chunk)
+                f.seek(start)
+                data = f.read(size - start)
+                newline = data.rfind(b"\n")
+                if newline != -1 or start == 0:
+                    break
+                chunk *= 4
+            cut = start + newline + 1
+            f.seek(cut)
+            self._set_aside(f.read())
+            f.truncate(cut)
+            _CHANGE_STATE.pop(os.path.abspath(self.changes_file), None)
+
+    def get_pending_tasks(self) -> List[Dict]:
+        """Retrieves entries whose task is not completed yet, oldest first, in O(pending)."""
+        with self._lock:
+            queued = [entry for entry in _queued_entries(os.path.abspath(self.log_file)) if not entry["completed"]]
+            return [entry for _, entry in self._pending_entries()] + queued
+
+    def _pending_entries(self) -> List[Tuple[int, Dict]]:
+        """(position, entry) of the stored pending entries as the edit history leaves them, oldest first."""
+        path = os.path.abspath(self.log_file)
+        by_id = _overlay_by_id(self._history()["overlay"])
+        if _restores_unstored(by_id):
+            self._materialize() # Once; only a full replay knows where such an entry goes
+            by_id = {}
+        pending = self._pending_index()
+        cached = _LOG_CACHE.get(path)
+        if cached is not None and cached[0] == _file_signature(path):
+            found = [(position, offset, cached[1][position]) for _, position, offset in pending]
+        else:
+            found = []
+            with open(path, 'rb') as f:
+                for entry_id, position, offset in pending:
+                    f.seek(offset)
+                    entry = _decode_record(f.readline())
+                    if entry is None or entry["id"] != entry_id:
+                        raise ValueError(f"Pending index is out of date for entry {entry_id}")
+                    found.append((position, offset, entry))
+        if not by_id:
+            return [(position, entry) for position, _, entry in found]
+
+        # The index describes the stored log: patch the entries the overlay touches, and look
+        # up the few stored as completed that it may have reopened
+        indexed = {entry["id"] for _, _, entry in found}
+        reopened = [entry_id for entry_id, deltas in by_id.items() if entry_id not in indexed
+                    and any((delta["after"] or {}).get("completed") is False for delta in deltas)]
+        if reopened:
+            found += [(by_id[entry_id][-1]["pos"], offset, entry)
+                      for entry_id, (offset, entry) in _find_records(path, reopened).items()]
+            found.sort(key=lambda item: item[1])
+        entries = []
+        for position, _, entry in found:
+            deltas = by_id.get(entry["id"])
+            if deltas is not None:
+                entry = _patched(entry, deltas)
+                if entry is None or entry["completed"]:
+                    continue
+            entries.append((position, entry))
+        return entries
+
+    def complete_tasks(self, entry_ids: List[str]) -> int:
+        """Marks the given pending entries as completed by rewriting only their lines.
+
+        The completions are recorded in the edit history as one change, so they can be undone.
+        """
+        with self._lock:
+            self.flush()
+            wanted = set(entry_ids)
+            if wanted & _overlay_by_id(self._history()["overlay"]).keys():
+                # The overlay has the last word on these entries, so their completion goes on top of it
+                deltas = [
+                    {"op": "edit", "id": entry["id"], "pos": position, "before": {"completed": False}, "after": {"completed": True}}
+                    for position, entry in self._pending_entries() if entry["id"] in wanted
+                ]
+                self._apply_history(deltas)
+                return len(deltas)
+            index = self._checkpoint()
+            path = os.path.abspath(self.log_file)
+            cached = _LOG_CACHE.get(path)
+            logs = cached[1] if cached is not None and cached[0] == _file_signature(path) else None
 
-    def _ensure_files(self) -> None:
-        """Ensures the log file and export folder exist."""
-        if not os.path.exists(self.log_file):
-            with open(self.log_file, 'w') as f:
-                json.dump([], f)
-        
-        if not os.path.exists(EXPORT_FOLDER):
-            os.makedirs(EXPORT_FOLDER)
+            patched, remaining = [], []
+            bytes_written = 0
+            with open(path, 'r+b') as f:
+                for item in index["pending"]:
+                    entry_id, position, offset = item
+                    if entry_id not in wanted:
+                        remaining.append(item)
+                        continue
+                    f.seek(offset)
+                    old_line = f.readline()
+                    body = old_line.rstrip(b",\r\n")
+                    entry = _decode_record(body)
+                    if entry is None or entry.get("id") != entry_id:
+                        raise ValueError(f"Pending index is out of date for entry {entry_id}")
+                    entry["completed"] = True
+                    new_body = _encode_record(entry).encode()
+                    if len(new_body) > len(body):
+                        raise ValueError(f"Entry {entry_id} cannot be patched in place")
+                    f.seek(offset)
+                    f.write(new_body.ljust(len(body))) # "true" is shorter than "false"; pad with whitespace
+                    bytes_written += len(body)
+                    patched.append((position, entry))
 
-    def log_mood(self, mood: str, task: str, note: Optional[str] = None) -> None:
-        """Records a new mood entry with a timestamp, mood, task, and optional note."""
-        entry = {
-            "timestamp": datetime.now().isoformat(),
+            if not patched:
+                return 0
+            self._record_changes([
+                {"id": entry["id"], "op": "put", "fields": {"completed": True}} for _, entry in patched
+            ])
+            signature = _file_signature(path)
+            if logs is not None:
+                for position, entry in patched:
+                    logs[position] = entry
+                _LOG_CACHE[path] = (signature, logs)
+            else:
+                invalidate_log_cache(path)
+            self._write_checkpoint(signature, remaining, index["records"], index["end"], index["last"])
+            if METRICS.enabled:
+                METRICS.record_io(bytes_written=bytes_written)
+            # Already in the stored log, so the deltas are marked materialized straight away
+            records = self._history_records([
+                {"op": "edit", "id": entry["id"], "pos": position, "before": {"completed": False}, "after": {"completed": True}}
+                for position, entry in patched
+            ])
+            self._append_history(records + [{"materialized": records[-1]["v"]}])
+            return len(patched)
+
+    def complete_task(self, entry_id: str) -> bool:
+        """Marks a single pending entry as completed."""
+        return self.complete_tasks([entry_id]) == 1
+
+    @staticmethod
+    def build_entry(mood: str, task: str, note: Optional[str] = None) -> Dict:
+        """Creates a new, not yet stored, log entry timestamped now."""
+        return {
+            "id": uuid.uuid4().hex,
+            **_now_fields(),
             "mood": mood,
             "task": task,
             "note": note,
             "completed": False # New field to track if the task was completed
         }
-        
-        with open(self.log_file, 'r+') as f:
-            logs = json.load(f)
-            logs.append(entry)
-            
-            # Keep log file from growing indefinitely
-            if len(logs) > MAX_LOG_ENTRIES:
-                logs = logs[-MAX_LOG_ENTRIES:]
-            
-            f.seek(0) # Rewind to the beginning of the file
-            json.dump(logs, f, indent=2)
-            f.truncate() # Remove remaining part
+
+    def append_entries(self, entries: List[Dict]) -> None:
+        """Stores several prepared entries with a single write.
+
+        Entries are appended after the last record, so the cost does not grow with the
+        history. Going past MAX_LOG_ENTRIES rolls the oldest entries up (a rewrite) until the
+        log is back at LOG_LOW_WATER of it, so that happens once per batch of appends.
+        """
+        entries = list(entries)
+        self._append_stored(entries, [
+            {"id": entry["id"], "op": "put", "fields": _entry_fields(entry)} for entry in entries
+        ])
+
+    def _append_stored(self, entries: List[Dict], changes: List[Dict]) -> None:
+        """Appends entries to the log, recording `changes` for them in the change log."""
+        with self._lock:
+            index = self._checkpoint()
+            if not entries:
+                return
+
+            path = os.path.abspath(self.log_file)
+            previous = _file_signature(path)
+            records, end = index["records"], index["end"]
+            separator = b"\n" if end == 1 else b",\n" # Only logs from before headers can be empty
+            position = end + len(separator)
+            chunks = [separator]
+            pending = list(index["pending"])
+            for i, entry in enumerate(entries):
+                line = _encode_record(entry).encode()
+                if not entry["completed"]:
+                    pending.append([entry["id"], records + i, position])
+                last, last_end = [entry["id"], position], position + len(line)
+                chunks.append(line)
+                chunks.append(b",\n" if i < len(entries) - 1 else b"\n]\n")
+                position += len(line) + len(chunks[-1])
+            with open(path, 'r+b') as f:
+                f.seek(end) # Over the "\n]\n" that closed the array
+                f.write(b"".join(chunks))
+            if METRICS.enabled:
+                METRICS.record_io(bytes_written=position - end)
+
+            # Change log before checkpoint: a crash in between is caught up from the tail
+            self._record_changes(changes)
+            signature = _file_signature(path)
+            cached = _LOG_CACHE.get(path)
+            if cached is not None and cached[0] == previous:
+                _LOG_CACHE[path] = (signature, cached[1] + entries)
+            self._write_checkpoint(signature, pending, records + len(entries), last_end, last)
+
+            if self.anomaly_hooks:
+                self.update_trends() # O(1) per new entry
+            if records + len(entries) > MAX_LOG_ENTRIES and time.time() >= _CAP_HELD_UNTIL.get(path, 0):
+                # Roll the oldest entries up instead of dropping them
+                self.compact(raw_days=None, max_entries=int(MAX_LOG_ENTRIES * LOG_LOW_WATER), scheduled=False)
+
+    def log_mood(self, mood: str, task: str, note: Optional[str] = None) -> None:
+        """Records a new mood entry with a timestamp, mood, task, and optional note."""
+        entry = self.build_entry(mood, task, note)
+        queue = _WRITE_BEHIND.get(os.path.abspath(self.log_file))
+        if queue is not None:
+            queue.put(entry)
+        else:
+            self.append_entries([entry])
         
         print(f"\n{COLORS['success']}✅ Awesome! Your mood and task have been recorded.{COLORS['reset']}")
 
@@ -434,9 +2868,7 @@ class MoodLogger:
             print(f"{COLORS['warning']}⚠️ Hmm, I don't recognize that mood. Please try again.{COLORS['reset']}")
             return
         
-        all_tasks = []
-        for category in MOOD_TASKS[mood].values():
-            all_tasks.extend(category)
+        all_tasks = tasks_for_mood(mood)
         
         if not all_tasks:
             print(f"{COLORS['warning']}⚠️ No tasks found for '{mood}'. Let's pick something else.{COLORS['reset']}")
@@ -446,133 +2878,1112 @@ class MoodLogger:
         self.log_mood(mood, random_task)
         print(f"\n✨ Mood captured! {mood.capitalize()} {EMOJI_MAP.get(mood, '')} | 🌟 Task: {random_task}")
 
+    def enable_write_behind(self, batch_size: int = WRITE_BEHIND_BATCH, delay: float = WRITE_BEHIND_DELAY) -> None:
+        """Queues new entries in memory and stores them from a background thread."""
+        path = os.path.abspath(self.log_file)
+        with self._lock:
+            if path not in _WRITE_BEHIND:
+                _install_flush_handlers()
+                _WRITE_BEHIND[path] = WriteBehindQueue(self, batch_size, delay)
+
+    def flush(self) -> int:
+        """Stores any entries queued in write-behind mode; returns how many were stored."""
+        queue = _WRITE_BEHIND.get(os.path.abspath(self.log_file))
+        return queue.flush() if queue is not None else 0
+
+    def query(self, moods: Optional[List[str]] = None, since: Optional[int] = None, until: Optional[int] = None,
+              completed: Optional[bool] = None, has_note: Optional[bool] = None, text: Optional[str] = None,
+              tags: Optional[List[str]] = None, min_sentiment: Optional[float] = None,
+              max_sentiment: Optional[float] = None, sort: str = "log", limit: Optional[int] = None) -> List[Dict]:
+        """Returns the entries that pass every given filter, ordered by `sort`, at most `limit`.
+
+        `moods` is a set of moods, [since, until) a range of epoch seconds, `text` a
+        case-insensitive match on the task or note, and `tags`/the sentiment bounds keep
+        entries whose note has one of the tags / a score in range. `sort` is one of
+        QUERY_SORTS; a leading "-" reverses it. The filters are compiled once and pushed
+        into the scan, and in "log"/"-log" order the scan stops after `limit` matches.
+        """
+        if sort not in QUERY_SORTS:
+            raise ValueError(f"Unknown sort '{sort}'; choose one of {', '.join(QUERY_SORTS)}")
+        if limit is not None and limit <= 0:
+            return []
+        fresh: Dict[str, Dict] = {}
+        note_filter = None
+        if tags is not None or min_sentiment is not None or max_sentiment is not None:
+            note_filter = self._note_filter(tags, min_sentiment, max_sentiment, fresh)
+        where, precheck = compile_filter(moods, since, until, completed, has_note, text, note_filter)
+        with self._lock:
+            try:
+                found = self._collect(self._matches(since, until, moods, where, precheck, sort == "-log"), sort, limit)
+            except ValueError:
+                self._load() # A stored record failed its checksum: the full load sets it aside, then ask the parsed log
+                found = self._collect(self._matches(since, until, moods, where, precheck, sort == "-log"), sort, limit)
+            if fresh:
+                self._remember_note_tags(fresh)
+        return found
+
+    @staticmethod
+    def _collect(matches: Iterator[Dict], sort: str, limit: Optional[int]) -> List[Dict]:
+        """Orders a stream of matches by `sort` and keeps at most `limit`, closing the stream."""
+        with contextlib.closing(matches):
+            if sort in ("log", "-log"):
+                return list(islice(matches, limit))
+            key = sort.lstrip("-")
+            by = lambda entry: (entry.get(key) is not None, entry.get(key))
+            if limit is None:
+                return sorted(matches, key=by, reverse=sort.startswith("-"))
+            return (heapq.nlargest if sort.startswith("-") else heapq.nsmallest)(limit, matches, key=by)
+
+    def _matches(self, since: Optional[int], until: Optional[int], moods: Optional[List[str]],
+                 where: Optional[Callable[[Dict], bool]], precheck: Optional[Callable[[bytes], bool]],
+                 reverse: bool) -> Iterator[Dict]:
+        """Streams matching entries: from the parsed-log cache when it is current, otherwise
+        from the memory-mapped file, where only candidate records are decoded."""
+        path = os.path.abspath(self.log_file)
+        queued = _queued_entries(path)
+        cached = _LOG_CACHE.get(path)
+        if queued:
+            logs = self._view()
+        elif cached is None or cached[0] != _file_signature(path):
+            if _is_line_layout(path):
+                if _schema_of(_read_header(path)[0]) >= SCHEMA_VERSION:
+                    # scan_records patches in the edit history for the records it touches
+                    yield from scan_records(path, since, until, moods, where=where, precheck=precheck, reverse=reverse)
+                    return
+            logs = self._current()
+        else:
+            logs = self._current() # The parsed log, plus the edit history if there is any
+        logs = reversed(logs) if reverse else logs
+        yield from filter(where, logs) if where is not None else logs
+
+    def scan(self, since: Optional[int] = None, until: Optional[int] = None,
+             moods: Optional[List[str]] = None, tags: Optional[List[str]] = None,
+             min_sentiment: Optional[float] = None, max_sentiment: Optional[float] = None) -> List[Dict]:
+        """Returns entries logged in [since, until) epoch seconds with a mood in `moods` (see `query`)."""
+        return self.query(moods, since, until, tags=tags, min_sentiment=min_sentiment, max_sentiment=max_sentiment)
+
     def get_recent_moods(self, days: int = 7) -> List[Dict]:
         """Retrieves mood entries from the last N days."""
-        cutoff = datetime.now() - timedelta(days=days)
-        with open(self.log_file, 'r') as f:
-            logs = json.load(f)
-        
-        return [
-            entry for entry in logs
-            if datetime.fromisoformat(entry["timestamp"]) >= cutoff
-        ]
+        return self.query(since=int(time.time()) - days * SECONDS_PER_DAY)
     
     def get_all_logs(self) -> List[Dict]:
         """Retrieves all mood log entries."""
-        with open(self.log_file, 'r') as f:
-            return json.load(f)
+        return list(self._view())
+
+    def aggregate(self, since: Optional[int] = None, until: Optional[int] = None,
+                  tz: Optional[int] = None, workers: Optional[int] = None) -> Dict:
+        """Returns the partial aggregate of entries logged in [since, until), rollups included.
+
+        With `workers` > 1 the log file is split into chunks that are folded in worker
+        processes; the result is identical to the serial fold. Rollups count toward a range
+        by the first day they cover and keep the day of the time zone they were logged in.
+        """
+        rollups = self._load_rollups()
+        retired = set(rollups["purge"]) # Rolled up, but a crash kept them in the log
+        parts = [
+            _rollup_partial(int(day), rollups[kind][day])
+            for kind in ("weekly", "daily") for day in sorted(rollups[kind], key=int)
+            if (since is None or int(day) * SECONDS_PER_DAY >= since)
+            and (until is None or int(day) * SECONDS_PER_DAY < until)
+        ]
+        if workers and workers > 1 and not retired:
+            with self._lock:
+                self.flush() # The workers only see what is on disk
+                path = os.path.abspath(self.log_file)
+                if _is_line_layout(path):
+                    if _schema_of(_read_header(path)[0]) < SCHEMA_VERSION:
+                        self._load() # Migrates the log on disk before the workers read it
+                    try:
+                        return _merge_partials(parts + [map_reduce_stats(path, since, until, tz, workers)])
+                    except ValueError:
+                        self._load() # A stored record failed its checksum: the full load sets it aside
+        entries = self._view() if since is None and until is None else self.scan(since, until)
+        if retired:
+            entries = [entry for entry in entries if entry["id"] not in retired]
+        return _merge_partials(parts + [_fold_entries(entries, tz)])
 
-    def get_mood_stats(self) -> Dict:
-        """Calculates and returns statistics about logged moods."""
-        logs = self.get_all_logs()
+    def get_mood_stats(self, tz: Optional[int] = None, workers: Optional[int] = None) -> Dict:
+        """Calculates and returns statistics about logged moods.
+
+        `by_day` buckets entries by the local day they were logged on, or by the day in a
+        fixed UTC offset of `tz` seconds when given. `workers` > 1 computes them in parallel.
+        """
+        partial = self.aggregate(tz=tz, workers=workers)
         
         stats = {
-            "total": len(logs),
-            "by_mood": defaultdict(int),
+            "total": partial["total"],
+            "by_mood": defaultdict(int, partial["by_mood"]),
             "by_day": defaultdict(int),
             "completion_rate": 0,
-            "notes_count": 0
+            "completed": partial["completed"],
+            "notes_count": partial["notes_count"],
+            "transitions": partial["transitions"],
         }
         
-        completed = 0
-        for entry in logs:
-            stats["by_mood"][entry["mood"]] += 1
-            date = datetime.fromisoformat(entry["timestamp"]).date()
-            stats["by_day"][date] += 1
-            if entry.get("completed", False):
-                completed += 1
-            if entry.get("note"):
-                stats["notes_count"] += 1
+        for day, count in partial["by_day"].items():
+            stats["by_day"][_day_to_date(day)] = count
         
-        if logs:
-            stats["completion_rate"] = (completed / len(logs)) * 100
+        if partial["total"]:
+            stats["completion_rate"] = (partial["completed"] / partial["total"]) * 100
         
         return stats
+
+    def get_aggregates(self) -> Dict:
+        """Returns JSON-friendly totals for this log, cached in a sidecar until the log changes."""
+        with self._lock:
+            signature = list(_file_signature(self.log_file)) + [self._history()["version"]]
+            try:
+                with open(self.aggregates_file, 'r') as f:
+                    cached = json.load(f)
+                if cached.get("signature") == signature:
+                    return cached
+            except (OSError, ValueError):
+                pass
+
+            stats = self.get_mood_stats()
+            aggregates = {
+                "signature": signature,
+                "total": stats["total"],
+                "completed": stats["completed"],
+                "notes_count": stats["notes_count"],
+                "by_mood": dict(stats["by_mood"]),
+                "by_day": {day.isoformat(): count for day, count in stats["by_day"].items()},
+            }
+            with open(self.aggregates_file, 'w') as f:
+                json.dump(aggregates, f)
+            return aggregates
     
     def edit_entry(self, index: int, **changes) -> bool:
-        """Edits a specific log entry by its index."""
-        try:
-            with open(self.log_file, 'r+') as f:
-                logs = json.load(f)
+        """Edits a specific log entry by its index, as one undoable step in the edit history."""
+        with self._lock:
+            try:
+                self.flush()
+                logs = self._current()
                 if 0 <= index < len(logs):
-                    logs[index].update(changes)
-                    f.seek(0)
-                    json.dump(logs, f, indent=2)
-                    f.truncate()
+                    entry = logs[index]
+                    after = {field: value for field, value in changes.items() if entry.get(field) != value}
+                    if after:
+                        self._apply_history([{"op": "edit", "id": entry["id"], "pos": index,
+                                              "before": {field: entry.get(field) for field in after}, "after": after}])
                     return True
                 return False # Index out of bounds
-        except Exception as e:
-            print(f"{COLORS['warning']}⚠️ Error updating entry: {e}{COLORS['reset']}")
-            return False
+            except Exception as e:
+                print(f"{COLORS['warning']}⚠️ Error updating entry: {e}{COLORS['reset']}")
+                return False
 
     def delete_entry(self, index: int) -> bool:
-        """Deletes a specific log entry by its index."""
-        try:
-            with open(self.log_file, 'r+') as f:
-                logs = json.load(f)
+        """Deletes a specific log entry by its index; `undo` brings it back."""
+        with self._lock:
+            try:
+                self.flush()
+                logs = self._current()
                 if 0 <= index < len(logs):
-                    deleted_entry = logs.pop(index)
-                    f.seek(0)
-                    json.dump(logs, f, indent=2)
-                    f.truncate()
-                    print(f"{COLORS['success']}🗑️ Deleted: {deleted_entry['mood'].title()} on {datetime.fromisoformat(deleted_entry['timestamp']).strftime('%Y-%m-%d %H:%M')}{COLORS['reset']}")
+                    deleted_entry = logs[index]
+                    self._apply_history([{"op": "delete", "id": deleted_entry["id"], "pos": index,
+                                          "before": deleted_entry, "after": None}])
+                    print(f"{COLORS['success']}🗑️ Deleted: {deleted_entry['mood'].title()} on {_format_entry_time(deleted_entry)}{COLORS['reset']}")
                     return True
                 return False # Index out of bounds
-        except Exception as e:
-            print(f"{COLORS['warning']}⚠️ Error deleting entry: {e}{COLORS['reset']}")
-            return False
+            except Exception as e:
+                print(f"{COLORS['warning']}⚠️ Error deleting entry: {e}{COLORS['reset']}")
+                return False
 
     def mark_all_pending_as_completed(self) -> int:
         """Marks all currently pending tasks as completed."""
-        updated_count = 0
         try:
-            with open(self.log_file, 'r+') as f:
-                logs = json.load(f)
-                for entry in logs:
-                    if not entry.get("completed", False):
-                        entry["completed"] = True
-                        updated_count += 1
-                f.seek(0)
-                json.dump(logs, f, indent=2)
-                f.truncate()
-            return updated_count
+            self.flush()
+            return self.complete_tasks([entry["id"] for entry in self.get_pending_tasks()])
         except Exception as e:
             print(f"{COLORS['warning']}⚠️ Error marking all tasks completed: {e}{COLORS['reset']}")
             return 0
 
 
-    def export_data(self, format: str = "json") -> str:
-        """Exports all logged data to a JSON or CSV file."""
-        logs = self.get_all_logs()
+    def export_data(self, format: str = "json", **filters) -> str:
+        """Exports logged data to a JSON, CSV or binary ("mmlog") file: everything, or the entries matching `query(**filters)`."""
+        logs = self.query(**filters) if filters else self.get_all_logs()
         
         if not logs:
             raise Exception("No data to export!")
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(EXPORT_FOLDER, f"moodmate_export_{timestamp}.{format}")
+        filename = os.path.join(self.export_folder, f"moodmate_export_{timestamp}.{format}")
         
         if format == "csv":
             with open(filename, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=logs[0].keys())
+                fieldnames = list(dict.fromkeys(key for entry in logs for key in entry)) # Older entries may lack fields
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
                 writer.writeheader()
                 writer.writerows(logs)
+        elif format == "mmlog":
+            write_binary_log(logs, filename)
         else: # default to json
             with open(filename, 'w') as f:
-                json.dump(logs, f, indent=2)
+                self._write_logs(f, logs, storage=False)
         
         return filename
 
+    def backup(self, backup_file: Optional[str] = None) -> str:
+        """Copies the current log into the backup file."""
+        backup_file = backup_file or self.backup_file
+        self.flush()
+        logs = self._current()
+        with open(backup_file, 'w') as dest:
+            self._write_logs(dest, logs)
+        return backup_file
+
+    def restore(self, backup_file: Optional[str] = None) -> None:
+        """Overwrites the current log with the contents of the backup file (JSON or binary)."""
+        backup_file = backup_file or self.backup_file
+        with self._lock:
+            self.flush()
+            if is_binary_log(backup_file):
+                with BinaryLog(backup_file) as backup:
+                    logs = list(backup)
+            else:
+                with open(backup_file, 'rb') as src:
+                    logs, _ = self._read_logs(src)
+            current = {entry["id"]: entry for entry in self._current()}
+            self._save(logs)
+            # Edits made before the restore no longer apply, nor can they be undone
+            self._append_history([{"materialized": self._history()["version"], "undo": [], "redo": []}])
+
+            # Express the restore as ordinary changes so replicas converge on it too
+            restored_ids = {entry["id"] for entry in logs}
+            self._record_changes(
+                [{"id": entry["id"], "op": "put", "fields": _entry_fields(entry)}
+                 for entry in logs if current.get(entry["id"]) != entry]
+                + [{"id": entry_id, "op": "delete", "fields": {}} for entry_id in current if entry_id not in restored_ids]
+            )
+
+    # ----- Edit history -----
+    # See "Edit History" above: the log as the user sees it is the stored log plus the
+    # overlay of deltas appended since it was last rewritten.
+
+    def _history(self) -> Dict:
+        """Returns the replayed edit history, reading only the lines appended since the last call."""
+        with self._lock:
+            path = os.path.abspath(self.history_file)
+            signature = _file_signature(path) if os.path.exists(path) else None
+            cached = _HISTORY.get(path)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+            state = _empty_history()
+            if cached is not None and signature is not None and cached[0] is not None \
+                    and cached[0][2] == signature[2] and signature[1] >= cached[1]["size"]:
+                state = cached[1] # Same file, appended to by another process
+            if signature is not None:
+                with open(path, 'rb') as f:
+                    f.seek(state["size"])
+                    data = f.read()
+                complete = data.rfind(b"\n") + 1 # A torn last line is left for the next append to cut off
+                for line in data[:complete].splitlines():
+                    _replay_history(state, json.loads(line))
+                state["size"] += complete
+                if METRICS.enabled:
+                    METRICS.record_io(bytes_read=len(data))
+            _HISTORY[path] = (signature, state)
+            return state
+
+    def _append_history(self, records: List[Dict]) -> None:
+        """Appends records to the history file and folds them into the replayed state."""
+        with self._lock:
+            state = self._history()
+            path = os.path.abspath(self.history_file)
+            data = "".join(json.dumps(record) + "\n" for record in records).encode()
+            with open(path, 'ab') as f:
+                if f.tell() > state["size"]:
+                    f.truncate(state["size"]) # Cut off a line torn by an interrupted append
+                f.write(data)
+            for record in records:
+                _replay_history(state, record)
+            state["size"] += len(data)
+            _HISTORY[path] = (_file_signature(path), state)
+            if METRICS.enabled:
+                METRICS.record_io(bytes_written=len(data))
+
+    def _history_records(self, deltas: List[Dict], kind: str = "do", target: Optional[int] = None) -> List[Dict]:
+        """Numbers deltas as one group of history records."""
+        group, now = self._history()["version"] + 1, int(time.time())
+        extra = {"target": target} if target is not None else {}
+        return [{"v": group + i, **delta, "at": now, "kind": kind, "group": group, **extra} for i, delta in enumerate(deltas)]
+
+    def _current(self) -> List[Dict]:
+        """Returns the stored log with the history overlay applied; shared, so not to be mutated."""
+        with self._lock:
+            logs = self._load()
+            state = self._history()
+            if not state["overlay"]:
+                return logs
+            path = os.path.abspath(self.log_file)
+            view = _VIEWS.get(path)
+            if view is None or view[0] is not logs or view[1] != state["version"]:
+                current = list(logs)
+                for delta in state["overlay"]:
+                    _apply_delta(current, delta)
+                view = _VIEWS[path] = (logs, state["version"], current)
+            return view[2]
+
+    def _apply_history(self, deltas: List[Dict], kind: str = "do", target: Optional[int] = None,
+                       changes: Optional[List[Dict]] = None) -> List[Dict]:
+        """Records deltas as one group and applies them: appends to the history and the
+        change log, never a rewrite of the log until the overlay reaches HISTORY_OVERLAY_MAX.
+
+        The change log gets a put or delete per delta, or `changes` if given (merged ones,
+        which keep their original versions).
+        """
+        if not deltas:
+            return []
+        with self._lock:
+            state = self._history()
+            path = os.path.abspath(self.log_file)
+            cached, view = _LOG_CACHE.get(path), _VIEWS.get(path)
+            current = None # The view is only kept up to date when it is at hand; readers rebuild it on demand
+            if cached is not None and cached[0] == _file_signature(path):
+                if not state["overlay"]:
+                    current = list(cached[1]) # The stored list is shared with the parse cache
+                elif view is not None and view[0] is cached[1] and view[1] == state["version"]:
+                    current = view[2]
+            records = self._history_records(deltas, kind, target)
+            self._append_history(records)
+            if current is not None:
+                for record in records:
+                    _apply_delta(current, record)
+                _VIEWS[path] = (cached[1], state["version"], current)
+            else:
+                _VIEWS.pop(path, None)
+            self._record_changes(changes if changes is not None else [
+                {"id": record["id"], "op": "delete", "fields": {}} if record["op"] == "delete"
+                else {"id": record["id"], "op": "put", "fields": _entry_fields(record["after"])}
+                for record in records
+            ])
+            if len(state["overlay"]) >= HISTORY_OVERLAY_MAX or _restores_unstored(_overlay_by_id(state["overlay"])):
+                self._materialize()
+            return records
+
+    def _materialize(self) -> None:
+        """Rewrites the log with the history overlay folded in, putting readers back on the fast paths."""
+        with self._lock:
+            state = self._history()
+            if state["overlay"]:
+                self._save(list(self._current()))
+                self._append_history([{"materialized": state["version"]}])
+                _VIEWS.pop(os.path.abspath(self.log_file), None)
+
+    def undo(self) -> List[Dict]:
+        """Reverts the latest change still on the undo stack; returns the history records it added."""
+        with self._lock:
+            self.flush()
+            undo = self._history()["undo"]
+            if not undo:
+                return []
+            group = undo[-1]
+            return self._apply_history([_inverse_delta(delta) for delta in reversed(group)], "undo", group[0]["group"])
+
+    def redo(self) -> List[Dict]:
+        """Repeats the latest undone change; returns the history records it added."""
+        with self._lock:
+            self.flush()
+            redo = self._history()["redo"]
+            if not redo:
+                return []
+            group = redo[-1]
+            fields = ("op", "id", "pos", "before", "after")
+            return self._apply_history([{field: delta[field] for field in fields} for delta in group], "redo", group[0]["group"])
+
+    def entry_history(self, entry_id: str) -> List[Dict]:
+        """Returns the recorded edits, deletes and restores of one entry, oldest first."""
+        with self._lock:
+            records = []
+            try:
+                with open(self.history_file, 'r') as f:
+                    for line in f:
+                        if entry_id in line and line.endswith("\n"): # Skip a torn last line
+                            record = json.loads(line)
+                            if record.get("id") == entry_id:
+                                records.append(record)
+            except OSError:
+                pass
+            return records
+
+    def prune_history(self, depth: int = HISTORY_DEPTH) -> int:
+        """Drops history beyond the last `depth` undoable changes; returns how many lines went.
+
+        The log is rewritten with the overlay first, so nothing but old undo steps is lost.
+        """
+        with self._lock:
+            self._materialize()
+            state = self._history()
+            path = os.path.abspath(self.history_file)
+            if not state["size"]:
+                return 0
+            undo = state["undo"][max(0, len(state["undo"]) - depth):]
+            redo = state["redo"][max(0, len(state["redo"]) - depth):]
+            oldest = min((group[0]["group"] for group in undo + redo), default=state["version"] + 1)
+            kept, dropped = [], 0
+            with open(path, 'r') as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        continue
+                    record = json.loads(line)
+                    if record.get("v", 0) >= oldest:
+                        kept.append(line)
+                    elif "v" in record:
+                        dropped += 1
+            # Kept records replay first; the header after them restores the trimmed stacks
+            kept.append(json.dumps({"materialized": state["version"], "undo": undo, "redo": redo}) + "\n")
+            with open(path + ".tmp", 'w', newline='\n') as f:
+                f.write("".join(kept))
+            os.replace(path + ".tmp", path)
+            _HISTORY.pop(path, None)
+            return dropped
+
+    # ----- Note tags -----
+
+    def _note_cache(self) -> Dict[str, Dict]:
+        """The note-tag cache of this log, loaded once per process; reset if the lexicon changed."""
+        path = os.path.abspath(self.note_tags_file)
+        digest = load_lexicon(lexicon_path())["digest"]
+        if path not in _NOTE_TAGS or _NOTE_TAGS[path][0] != digest:
+            cache: Dict[str, Dict] = {}
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    if json.loads(f.readline() or "{}").get("lexicon") == digest:
+                        for line in f:
+                            try:
+                                record = json.loads(line)
+                            except ValueError:
+                                continue # Torn last line
+                            cache[record.pop("hash")] = record
+            except OSError:
+                pass
+            if not cache: # Start over with this lexicon's header
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(json.dumps({"lexicon": digest}) + "\n")
+            _NOTE_TAGS[path] = (digest, cache)
+        return _NOTE_TAGS[path][1]
+
+    def note_tags(self, notes: List[str], workers: Optional[int] = None) -> Dict[str, Dict]:
+        """Returns {note hash: {"tags", "keywords", "sentiment"}}, analyzing only notes never seen."""
+        with self._lock:
+            cache = self._note_cache()
+            fresh = tag_notes(notes, lexicon_path(), workers, known=cache)
+            if fresh:
+                self._remember_note_tags(fresh)
+            return cache
+
+    def _remember_note_tags(self, fresh: Dict[str, Dict]) -> None:
+        """Adds newly analyzed notes to the cache and its file."""
+        with self._lock:
+            with open(self.note_tags_file, 'a', encoding='utf-8') as f:
+                f.write("".join(json.dumps({"hash": key, **result}) + "\n" for key, result in fresh.items()))
+            self._note_cache().update(fresh)
+
+    def _note_filter(self, tags: Optional[List[str]], min_sentiment: Optional[float],
+                     max_sentiment: Optional[float], fresh: Dict[str, Dict]) -> Callable[[str], bool]:
+        """A note check for `compile_filter`; notes never seen are analyzed inline and collected in `fresh`."""
+        cache, lexicon = self._note_cache(), load_lexicon(lexicon_path())
+        wanted = frozenset(tags) if tags is not None else None
+
+        def note_matches(note: str) -> bool:
+            key = note_hash(note)
+            result = cache.get(key) or fresh.get(key)
+            if result is None:
+                result = fresh[key] = analyze_note(note, lexicon)
+            return (wanted is None or not wanted.isdisjoint(result["tags"])) \
+                and (min_sentiment is None or result["sentiment"] >= min_sentiment) \
+                and (max_sentiment is None or result["sentiment"] <= max_sentiment)
+        return note_matches
+
+    def tag_all_notes(self, workers: Optional[int] = None) -> int:
+        """Backfills tags for every note in the log; returns how many distinct notes were new."""
+        with self._lock:
+            before = len(self._note_cache())
+            self.note_tags([entry["note"] for entry in self._view() if entry["note"]], workers)
+            return len(self._note_cache()) - before
+
+    def note_insights(self, since: Optional[int] = None, until: Optional[int] = None) -> Dict:
+        """Tag counts, top keywords and average note sentiment of the entries in [since, until)."""
+        notes = [entry["note"] for entry in self.scan(since, until) if entry["note"]]
+        results = self.note_tags(notes)
+        tags, keywords, sentiment = defaultdict(int), defaultdict(int), 0.0
+        for note in notes:
+            result = results[note_hash(note)]
+            sentiment += result["sentiment"]
+            for tag in result["tags"]:
+                tags[tag] += 1
+            for keyword in result["keywords"]:
+                keywords[keyword] += 1
+        return {
+            "tagged": len(notes),
+            "sentiment": sentiment / len(notes) if notes else None,
+            "tags": dict(sorted(tags.items(), key=lambda item: -item[1])),
+            "keywords": [word for word, _ in sorted(keywords.items(), key=lambda item: -item[1])[:10]],
+        }
+
+    # ----- Trends -----
+
+    def add_anomaly_hook(self, callback: Callable[[Dict], None]) -> None:
+        """Calls `callback(anomaly)` as soon as a stored entry raises a trend alert."""
+        self.anomaly_hooks.append(callback)
+
+    def update_trends(self) -> List[Dict]:
+        """Folds entries logged since the last update into the trend baselines; returns new alerts."""
+        with self._lock:
+            try:
+                with open(self.trends_file, 'r') as f:
+                    detector = TrendDetector(json.load(f))
+            except (OSError, ValueError):
+                detector = TrendDetector()
+            found, seq = [], detector.state["seq"]
+            for event in self.feed(seq):
+                seq = event["seq"]
+                if event["type"] == "new":
+                    found += detector.update({"id": event["id"], **event["fields"]})
+            if seq != detector.state["seq"]:
+                detector.state["seq"] = seq
+                with open(self.trends_file + ".tmp", 'w') as f:
+                    json.dump(detector.state, f)
+                os.replace(self.trends_file + ".tmp", self.trends_file)
+            self._detector = detector
+        for anomaly in found:
+            for hook in self.anomaly_hooks:
+                hook(anomaly)
+        return found
+
+    def anomalies(self, since: Optional[int] = None, now: Optional[int] = None) -> List[Dict]:
+        """Trend alerts raised since `since`, oldest first, plus a silence alert if one applies."""
+        self.update_trends()
+        flagged = [anomaly for anomaly in self._detector.state["anomalies"] if since is None or anomaly["ts"] >= since]
+        silence = self._detector.silence(now)
+        return flagged + ([silence] if silence else [])
+
+    def trends(self) -> Dict:
+        """Current baselines: average valence and arousal, their spread, and the usual gap in hours."""
+        self.update_trends()
+        state = self._detector.state
+        return {
+            "entries": state["count"],
+            "valence": state["valence"][0], "valence_sd": state["valence"][1] ** 0.5,
+            "arousal": state["arousal"][0], "arousal_sd": state["arousal"][1] ** 0.5,
+            "usual_gap_hours": state["gap"] / 3600 if state["gap"] is not None else None,
+            "anomalies": self.anomalies(),
+        }
+
+    # ----- Retention & rollups -----
+
+    def _load_rollups(self) -> Dict:
+        try:
+            with open(self.rollups_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"daily": {}, "weekly": {}, "purge": [], "compacted_at": 0}
+
+    def _save_rollups(self, rollups: Dict) -> None:
+        with open(self.rollups_file + ".tmp", 'w') as f:
+            json.dump(rollups, f)
+        os.replace(self.rollups_file + ".tmp", self.rollups_file)
+
+    def compact(self, raw_days: Optional[int] = RETENTION_RAW_DAYS, daily_days: Optional[int] = RETENTION_DAILY_DAYS,
+                max_entries: Optional[int] = MAX_LOG_ENTRIES, keep_notes: bool = ROLLUP_KEEP_NOTES,
+                now: Optional[int] = None, scheduled: bool = True) -> Dict:
+        """Applies the retention policy and returns what it did.
+
+        Entries from days more than `raw_days` ago, and the oldest ones beyond `max_entries`,
+        are rolled up into daily rollups and removed from the log. Entries from the last
+        SUMMARY_DAYS days stay, even beyond `max_entries` ("held_back"). Daily rollups older
+        than `daily_days` are merged into weekly ones. None disables a limit. Edit history
+        beyond the last HISTORY_DEPTH undoable changes is pruned. Runs the entry cap
+        triggers pass `scheduled=False`, so they do not put off `compact_if_due`.
+        """
+        now = int(time.time()) if now is None else now
+        today = _local_day({"ts": now, "tz": time.localtime(now).tm_gmtoff})
+        window_start = now - SUMMARY_DAYS * SECONDS_PER_DAY
+        with self._lock:
+            self.flush()
+            self._materialize() # Roll up entries as the user sees them
+            rollups = self._load_rollups()
+            retired = set(rollups["purge"])
+            live = [entry for entry in self._load() if entry["id"] not in retired]
+            overflow = max(0, len(live) - max_entries) if max_entries is not None else 0
+            old, keep = [], []
+            for entry in live:
+                expired = raw_days is not None and _local_day(entry) < today - raw_days
+                capped = len(old) < overflow and entry["ts"] < window_start # Summaries still read newer ones
+                (old if expired or capped else keep).append(entry)
+            held_back = max(0, overflow - len(old))
+            path = os.path.abspath(self.log_file)
+            if held_back: # The cap can do more once the oldest recent entry leaves the window
+                _CAP_HELD_UNTIL[path] = min(entry["ts"] for entry in keep if entry["ts"] >= window_start) \
+                    + SUMMARY_DAYS * SECONDS_PER_DAY
+            else:
+                _CAP_HELD_UNTIL.pop(path, None)
+
+            by_day = defaultdict(list)
+            for entry in old:
+                by_day[_local_day(entry)].append(entry)
+            for day, entries in by_day.items():
+                stored = rollups["daily"].get(str(day))
+                parts = [_rollup_partial(day, stored)] if stored else []
+                rollups["daily"][str(day)] = _as_rollup(_merge_partials(parts + [_fold_entries(entries)]), keep_notes)
+
+            downsampled = 0
+            if daily_days is not None:
+                for key in [key for key in rollups["daily"] if int(key) < today - daily_days]:
+                    week = _week_of(int(key))
+                    stored = rollups["weekly"].get(str(week))
+                    parts = ([_rollup_partial(week, stored)] if stored else []) + [_rollup_partial(week, rollups["daily"].pop(key))]
+                    rollups["weekly"][str(week)] = _as_rollup(_merge_partials(parts), keep_notes)
+                    downsampled += 1
+
+            # Rollups first: if we crash before the log is rewritten, stats skip the "purge" ids
+            rollups["purge"] = sorted(retired | {entry["id"] for entry in old})
+            if scheduled:
+                rollups["compacted_at"] = now
+            self._save_rollups(rollups)
+            if rollups["purge"]:
+                self._save(keep)
+                # A local tombstone: sync will not bring these back, and replicas keep their own copies
+                self._record_changes([{"id": entry_id, "op": "retire", "fields": {}} for entry_id in rollups["purge"]])
+                rollups["purge"] = []
+                self._save_rollups(rollups)
+            history_pruned = self.prune_history()
+            return {
+                "rolled_up": len(old),
+                "kept": len(keep),
+                "held_back": held_back,
+                "downsampled": downsampled,
+                "daily_rollups": len(rollups["daily"]),
+                "weekly_rollups": len(rollups["weekly"]),
+                "history_pruned": history_pruned,
+            }
+
+    def compact_if_due(self, interval_hours: float = COMPACT_INTERVAL_HOURS) -> Optional[Dict]:
+        """Runs `compact` if it has not run for `interval_hours`; for scheduled use."""
+        if time.time() - self._load_rollups()["compacted_at"] < interval_hours * 3600:
+            return None
+        return self.compact()
+
+    # ----- Change log & replication -----
+    # Every local change is appended to <log>.changes.jsonl as
+    # {"seq", "origin", "clock", "id", "op", "fields"}: `seq` numbers this replica's log,
+    # while (`clock`, `origin`) version the change itself and travel with it between
+    # replicas. Merging keeps, per field, the change with the highest (clock, origin);
+    # a delete leaves a tombstone that only a later put of the whole entry (an undone
+    # delete) lifts. "retire" marks entries that compaction rolled up: a permanent
+    # tombstone here, but not applied by other replicas. Those versions are folded into
+    # <log>.versions.json, so changes every known replica has pulled can be dropped from
+    # the change log; a replica that is further behind gets a snapshot instead.
+
+    def _change_state(self) -> List[int]:
+        """Returns the mutable [last seq, last clock] of this replica's change log."""
+        path = os.path.abspath(self.changes_file)
+        if path not in _CHANGE_STATE:
+            last = _read_last_line(path)
+            _CHANGE_STATE[path] = [last["seq"], last["clock"]] if last else [0, 0]
+        return _CHANGE_STATE[path]
+
+    def _record_changes(self, changes: List[Dict]) -> None:
+        """Appends changes to the change log, stamping local ones with a fresh clock."""
+        if not changes:
+            return
+        with self._lock:
+            state = self._change_state()
+            replica_id = self.replica_id
+            lines = []
+            for change in changes:
+                state[0] += 1
+                if "clock" not in change: # Local change; relayed ones keep their original version
+                    state[1] = max(time.time_ns() // 1000, state[1] + 1)
+                    change = {**change, "origin": replica_id, "clock": state[1]}
+                else:
+                    state[1] = max(state[1], change["clock"])
+                lines.append(json.dumps({
+                    "seq": state[0], "origin": change["origin"], "clock": change["clock"],
+                    "id": change["id"], "op": change["op"], "fields": change["fields"],
+                }) + "\n")
+            with open(self.changes_file, 'a', newline='\n') as f:
+                f.write("".join(lines))
+            if METRICS.enabled:
+                METRICS.record_io(bytes_written=sum(len(line) for line in lines))
+
+    def _replica_state(self) -> Dict:
+        """Loads (creating on first use) this replica's id, the seq it has pulled up to from
+        each peer ("watermarks") and the seq each peer has pulled up to from it ("readers")."""
+        try:
+            with open(self.replica_file, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {"replica_id": uuid.uuid4().hex, "watermarks": {}}
+            self._save_replica_state(state)
+        state.setdefault("readers", {})
+        return state
+
+    def _save_replica_state(self, state: Dict) -> None:
+        with open(self.replica_file + ".tmp", 'w') as f:
+            json.dump(state, f)
+        os.replace(self.replica_file + ".tmp", self.replica_file)
+
+    @property
+    def replica_id(self) -> str:
+        """Stable identifier of this copy of the log, used to order concurrent changes."""
+        if not hasattr(self, "_replica_id"):
+            self._replica_id = self._replica_state()["replica_id"]
+        return self._replica_id
+
+    def changes_since(self, seq: int = 0) -> Iterator[Dict]:
+        """Yields change records with a sequence number above `seq`, oldest first."""
+        self.flush() # Queued entries are only recorded once they are stored
+        return _iter_changes(self.changes_file, seq)
+
+    def feed_head(self) -> int:
+        """Sequence number of the latest change, read from disk so other processes count."""
+        last = _read_last_line(self.changes_file)
+        return last["seq"] if last else 0
+
+    def feed(self, since_seq: int = 0, until_seq: Optional[int] = None) -> Iterator[Dict]:
+        """Yields new/edit/delete/retire events with since_seq < seq <= until_seq, oldest first.
+
+        Changes every known replica has pulled may already be dropped from the change log
+        (see `pull_changes`); the feed then starts at the oldest one kept.
+        """
+        for change in self.changes_since(since_seq):
+            if until_seq is not None and change["seq"] > until_seq:
+                return
+            yield _change_event(change)
+
+    def follow(self, since_seq: Optional[int] = None, timeout: Optional[float] = None,
+               stop: Optional[threading.Event] = None, poll_interval: float = FEED_POLL_INTERVAL) -> Iterator[Dict]:
+        """Yields events as they happen, blocking in between.
+
+        Starts after `since_seq` (default: now) and wakes up through inotify where available,
+        otherwise by polling. Ends after `timeout` seconds without events or once `stop` is set.
+        """
+        seq = self.feed_head() if since_seq is None else since_seq
+        watcher = ChangeWatcher(self.changes_file, poll_interval)
+        try:
+            idle_since = time.monotonic()
+            while True:
+                watcher.mark()
+                for change in _iter_changes(self.changes_file, seq):
+                    seq = change["seq"]
+                    yield _change_event(change)
+                    idle_since = time.monotonic()
+                while not watcher.wait(poll_interval):
+                    if (stop is not None and stop.is_set()) or \
+                            (timeout is not None and time.monotonic() - idle_since >= timeout):
+                        return
+        finally:
+            watcher.close()
+
+    async def afollow(self, since_seq: Optional[int] = None,
+                      poll_interval: float = FEED_POLL_INTERVAL):
+        """Async iterator version of `follow`, for asyncio consumers."""
+        seq = self.feed_head() if since_seq is None else since_seq
+        watcher = ChangeWatcher(self.changes_file, poll_interval)
+        try:
+            while True:
+                watcher.mark()
+                for change in _iter_changes(self.changes_file, seq):
+                    seq = change["seq"]
+                    yield _change_event(change)
+                while not await watcher.wait_async(poll_interval):
+                    pass
+        finally:
+            watcher.close()
+
+    def _version_index(self) -> Dict:
+        """Returns the per-field versions of every entry and the tombstones of deleted ids
+        (the version of the delete, or None for a retired id that stays deleted), with the
+        whole change log folded in.
+
+        Starts from <log>.versions.json and folds in only the changes recorded after it;
+        the file is rewritten once CHANGE_LOG_TRUNCATE_MIN changes are not in it.
+        """
+        with self._lock:
+            path = os.path.abspath(self.versions_file)
+            signature = _file_signature(path) if os.path.exists(path) else None
+            cached = _VERSIONS.get(path)
+            if cached is None or cached[0] != signature:
+                index = {"seq": 0, "dropped": 0, "versions": {}, "deleted": {}}
+                try:
+                    with open(path, 'r') as f:
+                        stored = json.load(f)
+                    index = {
+                        "seq": stored["seq"], "dropped": stored["dropped"],
+                        "versions": {entry_id: {field: tuple(version) for field, version in fields.items()}
+                                     for entry_id, fields in stored["versions"].items()},
+                        "deleted": {entry_id: tuple(version) if version else None
+                                    for entry_id, version in stored["deleted"].items()},
+                    }
+                except (OSError, ValueError, KeyError):
+                    pass # Rebuilt from the change log
+                cached = _VERSIONS[path] = (signature, index["seq"], index)
+            _, saved, index = cached
+            for change in _iter_changes(self.changes_file, index["seq"]):
+                _fold_change(index, change)
+                index["seq"] = change["seq"]
+            if index["seq"] - saved >= CHANGE_LOG_TRUNCATE_MIN:
+                self._save_version_index(index)
+            return index
+
+    def _save_version_index(self, index: Dict) -> None:
+        path = os.path.abspath(self.versions_file)
+        with open(path + ".tmp", 'w') as f:
+            json.dump(index, f) # Tuples are written as lists
+        os.replace(path + ".tmp", path)
+        _VERSIONS[path] = (_file_signature(path), index["seq"], index)
+
+    def _changes_for(self, seq: int) -> List[Dict]:
+        """The changes a replica that has pulled up to `seq` still needs: the change log after
+        it, or a snapshot of every entry and tombstone if those changes were dropped."""
+        self.flush()
+        with self._lock:
+            index = self._version_index()
+            if seq >= index["dropped"]:
+                return list(_iter_changes(self.changes_file, seq))
+            snapshot = []
+            for entry in self._current():
+                groups: Dict[Tuple[int, str], Dict] = {}
+                for field, value in _entry_fields(entry).items():
+                    version = index["versions"].get(entry["id"], {}).get(field)
+                    if version is not None:
+                        groups.setdefault(version, {})[field] = value
+                for (clock, origin), fields in sorted(groups.items()):
+                    snapshot.append({"seq": index["seq"], "origin": origin, "clock": clock,
+                                     "id": entry["id"], "op": "put", "fields": fields})
+            for entry_id, version in index["deleted"].items():
+                if version is not None: # Retired ids are ours alone
+                    snapshot.append({"seq": index["seq"], "origin": version[1], "clock": version[0],
+                                     "id": entry_id, "op": "delete", "fields": {}})
+            return snapshot
+
+    def _note_reader(self, replica_id: str, seq: int) -> None:
+        """Remembers that another replica has pulled this one's changes up to `seq`, and
+        drops the changes every known replica has pulled once CHANGE_LOG_TRUNCATE_MIN of
+        them pile up. The version index is saved first, so merging does not need them."""
+        with self._lock:
+            state = self._replica_state()
+            state["readers"][replica_id] = seq
+            self._save_replica_state(state)
+            index = self._version_index()
+            checkpoint = self._read_checkpoint() # Catching up reads the changes after its seq
+            keep_from = min([*state["readers"].values(), index["seq"], checkpoint["seq"] if checkpoint else 0])
+            if keep_from - 1 - index["dropped"] < CHANGE_LOG_TRUNCATE_MIN:
+                return
+            index["dropped"] = keep_from - 1 # The change at `keep_from` stays: the log never ends up empty
+            self._save_version_index(index)
+            with open(self.changes_file, 'rb') as f:
+                while True:
+                    start, line = f.tell(), f.readline()
+                    if not line or json.loads(line)["seq"] >= keep_from:
+                        break
+                f.seek(start)
+                kept = f.read()
+            with open(self.changes_file + ".tmp", 'wb') as f:
+                f.write(kept)
+            os.replace(self.changes_file + ".tmp", self.changes_file)
+
+    def pull_changes(self, remote: "MoodLogger") -> int:
+        """Merges the remote replica's changes since the last sync; returns how many applied.
+
+        Only the merged entries are written: new ones are appended to the log (after the
+        ones already stored), changes to stored ones go into the edit history as "sync"
+        records, which undo passes over.
+        """
+        with self._lock:
+            self.flush()
+            state = self._replica_state()
+            watermark = state["watermarks"].get(remote.replica_id, 0)
+            incoming = remote._changes_for(watermark)
+            if not incoming:
+                return 0
+
+            index = self._version_index()
+            versions: Dict[str, Dict[str, Tuple[int, str]]] = {} # Copies of the index's, as merging leaves them
+            deleted = dict(index["deleted"])
+            logs = self._current()
+            wanted = {change["id"] for change in incoming}
+            positions = {entry["id"]: i for i, entry in enumerate(logs) if entry["id"] in wanted}
+            merged: Dict[str, Dict] = {} # Stored entries with the winning fields
+            fresh: Dict[str, Dict] = {} # Winning fields of entries not stored here
+            accepted = []
+            for change in incoming:
+                entry_id, version = change["id"], (change["clock"], change["origin"])
+                if change["op"] == "retire": # Their retention is not ours
+                    continue
+                if entry_id in deleted:
+                    if not _resurrects(change, deleted):
+                        continue
+                    del deleted[entry_id]
+                if entry_id not in versions:
+                    versions[entry_id] = dict(index["versions"].get(entry_id, {}))
+                known = versions[entry_id]
+                if change["op"] == "delete":
+                    created = known.get("timestamp")
+                    if created is not None and version < created:
+                        continue # Older than the undo that brought the entry back
+                    deleted[entry_id] = version
+                    fresh.pop(entry_id, None)
+                    accepted.append(change)
+                    continue
+
+                winners = {
+                    field: value for field, value in change["fields"].items()
+                    if field not in known or version > known[field]
+                }
+                if not winners:
+                    continue
+                for field in winners:
+                    known[field] = version
+                if entry_id in positions:
+                    merged[entry_id] = {**merged.get(entry_id, logs[positions[entry_id]]), **winners}
+                else:
+                    fresh[entry_id] = {**fresh.get(entry_id, {}), **winners}
+                accepted.append({**change, "fields": winners})
+
+            if accepted:
+                deltas = []
+                for entry_id, position in sorted(positions.items(), key=lambda item: -item[1]): # Deletes shift nothing before them
+                    entry = logs[position]
+                    if entry_id in deleted:
+                        deltas.append({"op": "delete", "id": entry_id, "pos": position, "before": entry, "after": None})
+                    elif entry_id in merged:
+                        after = {field: value for field, value in merged[entry_id].items() if entry.get(field) != value}
+                        if after:
+                            deltas.append({"op": "edit", "id": entry_id, "pos": position,
+                                           "before": {field: entry.get(field) for field in after}, "after": after})
+                added = sorted((
+                    _upgrade_timestamp({"id": entry_id, "completed": False, "note": None, **fields})
+                    for entry_id, fields in fresh.items() if {"timestamp", "mood"} <= fields.keys()
+                ), key=lambda entry: entry["ts"])
+                self._apply_history(deltas, "sync", changes=[])
+                self._append_stored(added, [])
+                self._record_changes(accepted)
+            state["watermarks"][remote.replica_id] = incoming[-1]["seq"]
+            self._save_replica_state(state)
+            remote._note_reader(self.replica_id, incoming[-1]["seq"])
+            return len(accepted)
+
+def _fold_change(index: Dict, change: Dict) -> None:
+    """Folds one change record into a version index (see `MoodLogger._version_index`)."""
+    version, deleted = (change["clock"], change["origin"]), index["deleted"]
+    if change["op"] in ("delete", "retire"):
+        deleted[change["id"]] = version if change["op"] == "delete" else None
+        return
+    if _resurrects(change, deleted):
+        del deleted[change["id"]]
+    fields = index["versions"].setdefault(change["id"], {})
+    for field in change["fields"]:
+        if field not in fields or version > fields[field]:
+            fields[field] = version
+
+
+def _resurrects(change: Dict, deleted: Dict[str, Optional[Tuple[int, str]]]) -> bool:
+    """True if `change` re-creates a deleted entry (an undone delete) after it was deleted."""
+    tombstone = deleted.get(change["id"])
+    return tombstone is not None and change["op"] == "put" and {"timestamp", "mood"} <= change["fields"].keys() \
+        and (change["clock"], change["origin"]) > tombstone
+
+
+def sync_replicas(local: MoodLogger, remote: MoodLogger) -> Tuple[int, int]:
+    """Exchanges changes both ways; returns (applied locally, applied remotely)."""
+    pulled = local.pull_changes(remote)
+    pushed = remote.pull_changes(local)
+    return pulled, pushed
+
+class ShardRouter:
+    """Gives every user their own shard directory (log, indexes, aggregates, backups, exports)
+    and answers organisation-wide questions by combining per-shard aggregates."""
+
+    def __init__(self, root: str = SHARD_ROOT):
+        self.root = root
+        self._loggers: Dict[str, MoodLogger] = {}
+        self._guard = threading.Lock()
+
+    def shard_dir(self, user: str) -> str:
+        """Returns the directory holding a user's data, bucketed by hash to keep folders small."""
+        digest = hashlib.sha1(user.encode("utf-8")).hexdigest()
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", user)[:48]
+        if safe_name != user or not safe_name.strip("."): # Keep sanitized names from colliding, and "." / ".." from escaping
+            safe_name = f"{safe_name}-{digest[:8]}"
+        return os.path.join(self.root, digest[:2], safe_name)
+
+    def logger_for(self, user: str) -> MoodLogger:
+        """Returns the (cached) MoodLogger for a user, creating their shard on first use."""
+        user = user.strip()
+        if not user:
+            raise ValueError("A user name is required for sharded storage.")
+        with self._guard:
+            if user not in self._loggers:
+                shard = self.shard_dir(user)
+                os.makedirs(shard, exist_ok=True)
+                marker = os.path.join(shard, "shard.json")
+                if not os.path.exists(marker):
+                    with open(marker, 'w') as f:
+                        json.dump({"user": user}, f)
+                self._loggers[user] = MoodLogger(
+                    os.path.join(shard, os.path.basename(LOG_FILE)),
+                    backup_file=os.path.join(shard, os.path.basename(BACKUP_FILE)),
+                    export_folder=os.path.join(shard, os.path.basename(EXPORT_FOLDER)),
+                )
+            return self._loggers[user]
+
+    def users(self) -> List[str]:
+        """Lists every user that has a shard under the root directory."""
+        users = []
+        if not os.path.isdir(self.root):
+            return users
+        for bucket in sorted(os.listdir(self.root)):
+            bucket_dir = os.path.join(self.root, bucket)
+            if not os.path.isdir(bucket_dir):
+                continue
+            for name in sorted(os.listdir(bucket_dir)):
+                try:
+                    with open(os.path.join(bucket_dir, name, "shard.json"), 'r') as f:
+                        users.append(json.load(f)["user"])
+                except (OSError, ValueError, KeyError):
+                    continue
+        return users
+
+    def org_aggregates(self, workers: int = 8) -> Dict:
+        """Combines the cached aggregates of every shard into organisation-wide totals."""
+        users = self.users()
+        totals = {"users": len(users), "total": 0, "completed": 0, "notes_count": 0,
+                  "by_mood": defaultdict(int), "by_day": defaultdict(int)}
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for aggregates in pool.map(lambda user: self.logger_for(user).get_aggregates(), users):
+                for key in ("total", "completed", "notes_count"):
+                    totals[key] += aggregates[key]
+                for mood, count in aggregates["by_mood"].items():
+                    totals["by_mood"][mood] += count
+                for day, count in aggregates["by_day"].items():
+                    totals["by_day"][day] += count
+        totals["completion_rate"] = (totals["completed"] / totals["total"]) * 100 if totals["total"] else 0
+        return totals
+
+    def org_mood_distribution(self, totals: Optional[Dict] = None) -> Dict[str, float]:
+        """Returns each mood's share (percent) of all entries across the organisation."""
+        totals = totals or self.org_aggregates()
+        if not totals["total"]:
+            return {}
+        return {
+            mood: count / totals["total"] * 100
+            for mood, count in sorted(totals["by_mood"].items(), key=lambda item: item[1], reverse=True)
+        }
+
 class PomodoroTimer:
     """Manages Pomodoro timer sessions with visual feedback and notifications."""
     
     def __init__(self):
         self.work_sessions = 0 # To track completed sessions
+        self.schedule: Optional[Tuple[float, int, int, int]] = None # (started, work s, break s, cycles)
 
     def run(self, work_min: int, break_min: int, cycles: int = 1) -> None:
         """Runs the Pomodoro timer for the specified work, break, and cycles."""
         if work_min <= 0 or break_min <= 0 or cycles <= 0:
             print(f"{COLORS['warning']}⚠️ Timer values must be positive. Please try again.{COLORS['reset']}")
             return
+        self.start(work_min, break_min, cycles)
 
         try:
             for cycle in range(1, cycles + 1):
@@ -594,6 +4005,26 @@ class PomodoroTimer:
         except Exception as e:
             print(f"{COLORS['warning']}⚠️ An error occurred with the timer: {e}{COLORS['reset']}")
 
+    def start(self, work_min: int, break_min: int, cycles: int = 1) -> None:
+        """Starts the schedule that `status` follows, without blocking (used by the live dashboard)."""
+        self.schedule = (time.time(), work_min * 60, break_min * 60, cycles)
+
+    def status(self, now: Optional[float] = None) -> Optional[Dict]:
+        """Returns the current {"phase", "cycle", "cycles", "remaining"}, or None when no timer runs."""
+        if self.schedule is None:
+            return None
+        started, work, pause, cycles = self.schedule
+        elapsed = (time.time() if now is None else now) - started
+        for cycle in range(1, cycles + 1):
+            if elapsed < work:
+                return {"phase": "FOCUS", "cycle": cycle, "cycles": cycles, "remaining": work - elapsed}
+            elapsed -= work
+            if cycle < cycles:
+                if elapsed < pause:
+                    return {"phase": "BREAK", "cycle": cycle, "cycles": cycles, "remaining": pause - elapsed}
+                elapsed -= pause
+        return None
+
     def _run_phase(self, name: str, minutes: int, icon: str, color_key: str) -> None:
         """Helper to run a single work or break phase."""
         color_code = COLORS.get(color_key, COLORS['reset'])
@@ -625,54 +4056,395 @@ class PomodoroTimer:
 class MoodAnalyzer:
     """Provides tools for analyzing and visualizing mood data."""
     
-    def generate_weekly_summary(logs: List[Dict]) -> str:
+    @staticmethod
+    def generate_weekly_summary(logs: List[Dict], anomalies: Optional[List[Dict]] = None,
+                                insights: Optional[Dict] = None) -> str:
         """Generates a text summary of the week's mood and task activity."""
-        if not logs:
-            return f"{COLORS['warning']}No entries in the last 7 days to summarize.{COLORS['reset']}"
-        
-        mood_counts = defaultdict(int)
-        completed_tasks = 0
-        total_tasks = 0
-        notes_snippets = []
-        
-        for entry in logs:
-            mood_counts[entry["mood"]] += 1
-            total_tasks += 1
-            if entry.get("completed", False):
-                completed_tasks += 1
-            if entry.get("note"):
-                notes_snippets.append(entry["note"])
+        return MoodAnalyzer.render_summary(_fold_entries(logs), anomalies=anomalies, insights=insights)
+
+    @staticmethod
+    def summary_data(partial: Dict, anomalies: Optional[List[Dict]] = None,
+                     insights: Optional[Dict] = None) -> Dict:
+        """The facts a summary shows, as plain data (see `render_summary` and `ReportPipeline`)."""
+        total = partial["total"]
+        return {
+            "total": total,
+            "completed": partial["completed"],
+            "completion_rate": partial["completed"] / total * 100 if total else 0.0,
+            "notes_count": partial["notes_count"],
+            "moods": sorted(partial["by_mood"].items(), key=lambda item: item[1], reverse=True),
+            "by_day": {_day_to_date(day).isoformat(): count for day, count in sorted(partial["by_day"].items())},
+            "recent_notes": partial["recent_notes"][-RECENT_NOTES_KEPT:],
+            "themes": insights if insights and insights["tagged"] else None,
+            "alerts": anomalies or [],
+        }
+
+    @staticmethod
+    def render_summary(partial: Dict, title: str = "Weekly", period: str = "the last 7 days",
+                       anomalies: Optional[List[Dict]] = None, insights: Optional[Dict] = None,
+                       color: bool = True) -> str:
+        """Renders a summary from a partial aggregate (see `MoodLogger.aggregate`) and trend alerts."""
+        paint = COLORS if color else defaultdict(str)
+        data = MoodAnalyzer.summary_data(partial, anomalies, insights)
+        if not data["total"]:
+            return f"{paint['warning']}No entries in {period} to summarize.{paint['reset']}"
         
-        summary_lines = [f"{COLORS['header']}--- 📅 Your Weekly Mood & Activity Summary ---{COLORS['reset']}", ""]
-        summary_lines.append(f"🧮 Total entries: {len(logs)}") # Added emoji
+        summary_lines = [f"{paint['header']}--- 📅 Your {title} Mood & Activity Summary ---{paint['reset']}", ""]
+        summary_lines.append(f"🧮 Total entries: {data['total']}") # Added emoji
         
-        if mood_counts:
-            summary_lines.append(f"\n{COLORS['menu']}Your Most Frequent Moods:{COLORS['reset']}")
-            for mood, count in sorted(mood_counts.items(), key=lambda item: item[1], reverse=True):
+        if data["moods"]:
+            summary_lines.append(f"\n{paint['menu']}Your Most Frequent Moods:{paint['reset']}")
+            for mood, count in data["moods"]:
                 summary_lines.append(f"- {mood.title()} {EMOJI_MAP.get(mood, '')}: {count} times") # Added emoji
         
-        if total_tasks > 0:
-            completion_rate = (completed_tasks / total_tasks) * 100
-            summary_lines.append(f"\n{COLORS['menu']}✅ Task Completion:{COLORS['reset']}") # Added emoji
-            summary_lines.append(f"You completed {completed_tasks} out of {total_tasks} tasks ({completion_rate:.1f}%).")
+        summary_lines.append(f"\n{paint['menu']}✅ Task Completion:{paint['reset']}") # Added emoji
+        summary_lines.append(f"You completed {data['completed']} out of {data['total']} tasks ({data['completion_rate']:.1f}%).")
         
-        if notes_snippets:
-            summary_lines.append(f"\n{COLORS['menu']}💭 A Glimpse into Your Thoughts (Recent Notes):{COLORS['reset']}") # Added emoji
-            for i, note in enumerate(notes_snippets[-3:], 1): # Show up to 3 most recent notes
+        if data["recent_notes"]:
+            summary_lines.append(f"\n{paint['menu']}💭 A Glimpse into Your Thoughts (Recent Notes):{paint['reset']}") # Added emoji
+            for i, note in enumerate(data["recent_notes"], 1): # Show up to 3 most recent notes
                 summary_lines.append(f"{i}. {note[:70]}{'...' if len(note) > 70 else ''}")
         
-        summary_lines.append(f"\n{COLORS['success']}Keep up the great work understanding yourself!{COLORS['reset']}")
+        if data["themes"]:
+            summary_lines.append(f"\n{paint['menu']}🏷️ What Your Notes Were About:{paint['reset']}")
+            summary_lines.append(MoodAnalyzer.describe_insights(data["themes"]))
+        
+        if data["alerts"]:
+            summary_lines.append(f"\n{paint['warning']}🔔 Worth a Closer Look:{paint['reset']}")
+            for anomaly in data["alerts"]:
+                day = datetime.fromtimestamp(anomaly["ts"]).strftime('%b %d')
+                summary_lines.append(f"- {day}: {anomaly['message']}")
+        
+        summary_lines.append(f"\n{paint['success']}Keep up the great work understanding yourself!{paint['reset']}")
         
         return "\n".join(summary_lines)
 
+    @staticmethod
+    def describe_insights(insights: Dict) -> str:
+        """One-line description of note themes and tone (see `MoodLogger.note_insights`)."""
+        themes = ", ".join(f"{tag} ({count})" for tag, count in list(insights["tags"].items())[:5]) or "no common themes"
+        tone = insights["sentiment"]
+        feel = "mostly positive" if tone > 0.2 else "mostly negative" if tone < -0.2 else "mixed"
+        return f"Themes: {themes} | Tone of your notes: {feel} ({tone:+.2f})"
+
+
+class ReportPipeline:
+    """Writes summaries of any period as plain text, Markdown, HTML and JSON into the export folder.
+
+    Each section's data and rendered fragments are cached per period in
+    `reports/report_cache.json` together with the change-feed position they were built
+    at. The next run only reads the changes since then and rebuilds the sections those
+    changes touch, so a daily job over many users mostly reassembles cached fragments.
+    """
+
+    def __init__(self, logger: MoodLogger, folder: Optional[str] = None):
+        self.logger = logger
+        self.folder = folder or os.path.join(logger.export_folder, REPORT_FOLDER)
+        self.cache_file = os.path.join(self.folder, "report_cache.json")
+        self.last_run = {"built": [], "reused": []}
+        self._cache: Dict = {}
+
+    @staticmethod
+    def period(days: int = 7, end: Optional[datetime] = None) -> Tuple[int, int]:
+        """[since, until) covering `days` whole local days up to and including `end` (default today)."""
+        last = (end or datetime.now()).date()
+        since = datetime.combine(last - timedelta(days=days - 1), datetime.min.time())
+        until = datetime.combine(last + timedelta(days=1), datetime.min.time())
+        return int(since.timestamp()), int(until.timestamp())
+
+    def _load_cache(self) -> Dict:
+        try:
+            with open(self.cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self, cache: Dict) -> None:
+        os.makedirs(self.folder, exist_ok=True)
+        if len(cache) > REPORT_CACHE_PERIODS:
+            for key in sorted(cache, key=lambda key: cache[key]["used"])[:len(cache) - REPORT_CACHE_PERIODS]:
+                del cache[key]
+        with open(self.cache_file + ".tmp", 'w') as f:
+            json.dump(cache, f)
+        os.replace(self.cache_file + ".tmp", self.cache_file)
+
+    def _touched(self, cached: Dict, since: int, until: int) -> Set[str]:
+        """Sections of a cached period that changes after its feed position may have altered."""
+        touched, ids = set(), set(cached["ids"])
+        for event in self.logger.feed(cached["seq"]):
+            fields = event["fields"]
+            if event["id"] not in ids and not since <= fields.get("ts", since - 1) < until:
+                continue
+            if event["type"] != "edit" or fields.keys() & {"ts", "tz", "timestamp"}:
+                touched |= _REPORT_ENTRY_SECTIONS
+            else:
+                for field in fields:
+                    touched |= _REPORT_SECTIONS_BY_FIELD.get(field, set())
+        return touched
+
+    def build(self, since: int, until: int) -> Dict:
+        """Section data and fragments for [since, until), rebuilding only what changed."""
+        cache = self._cache = self._load_cache()
+        key = f"{since}-{until}"
+        head = self.logger.feed_head()
+        cached = cache.get(key)
+        if cached is None or cached["seq"] > head: # New period, or the change log was rewritten
+            cached, touched = {"seq": 0, "ids": [], "sections": {}}, set(REPORT_SECTIONS)
+        else:
+            touched = self._touched(cached, since, until)
+
+        # Sections that also depend on something besides the entries carry its fingerprint
+        alerts = [anomaly for anomaly in self.logger.anomalies(since) if anomaly["ts"] < until]
+        versions = {
+            "alerts": hashlib.blake2b(json.dumps(alerts).encode(), digest_size=8).hexdigest(),
+            "themes": load_lexicon(lexicon_path())["digest"],
+        }
+        stale = [name for name in REPORT_SECTIONS
+                 if name in touched or name not in cached["sections"]
+                 or cached["sections"][name]["version"] != versions.get(name)]
+
+        if stale:
+            partial, insights = _empty_partial(), None
+            if set(stale) & _REPORT_ENTRY_SECTIONS - {"themes"}:
+                partial = self.logger.aggregate(since, until)
+                cached["ids"] = [entry["id"] for entry in self.logger.scan(since, until)]
+            if "themes" in stale:
+                insights = self.logger.note_insights(since, until)
+            data = MoodAnalyzer.summary_data(partial, alerts, insights)
+            for name in stale:
+                cached["sections"][name] = {"version": versions.get(name), "data": _REPORT_SECTION_DATA[name](data),
+                                            "fragments": {}}
+        cached.update(seq=head, used=time.time())
+        cache[key] = cached
+        self.last_run = {"built": stale, "reused": [name for name in REPORT_SECTIONS if name not in stale]}
+        return cached
+
+    @staticmethod
+    def _blocks(name: str, data) -> Tuple[str, List[str]]:
+        """Heading and plain lines of one section; no lines means the section is left out."""
+        if name == "overview":
+            return "Overview", [f"Total entries: {data['total']}",
+                                f"Tasks completed: {data['completed']} of {data['total']} ({data['completion_rate']:.1f}%)",
+                                f"Entries with a note: {data['notes_count']}"] if data["total"] else []
+        if name == "moods":
+            total = sum(count for _, count in data) or 1
+            return "Most Frequent Moods", [f"{mood.title()} {EMOJI_MAP.get(mood, '')}".rstrip() + f": {count} times ({count / total:.0%})"
+                                           for mood, count in data]
+        if name == "activity":
+            return "Entries per Day", [f"{day}: {count}" for day, count in data.items()]
+        if name == "notes":
+            return "Recent Notes", [note[:NOTE_EXCERPT_CHARS] + ("..." if len(note) > NOTE_EXCERPT_CHARS else "")
+                                    for note in data]
+        if name == "themes":
+            return "What the Notes Were About", [MoodAnalyzer.describe_insights(data),
+                                                 "Keywords: " + (", ".join(data["keywords"]) or "none")] if data else []
+        return "Worth a Closer Look", [f"{datetime.fromtimestamp(anomaly['ts']).strftime('%b %d')}: {anomaly['message']}"
+                                       for anomaly in data]
+
+    @staticmethod
+    def render_fragment(name: str, data, fmt: str) -> str:
+        """One section in one format ("txt", "md" or "html")."""
+        heading, lines = ReportPipeline._blocks(name, data)
+        if not lines:
+            return ""
+        if fmt == "md":
+            return f"## {heading}\n\n" + "\n".join(f"- {line}" for line in lines) + "\n"
+        if fmt == "html":
+            items = "".join(f"<li>{html.escape(line)}</li>" for line in lines)
+            return f"<section><h2>{html.escape(heading)}</h2><ul>{items}</ul></section>\n"
+        return f"{heading}\n{'-' * len(heading)}\n" + "\n".join(f"- {line}" for line in lines) + "\n"
+
+    def render(self, built: Dict, fmt: str, title: str) -> str:
+        """A whole report in one format, reusing cached fragments."""
+        sections = built["sections"]
+        if fmt == "json":
+            return json.dumps({"title": title, "generated": datetime.now().isoformat(timespec="seconds"),
+                               "sections": {name: sections[name]["data"] for name in REPORT_SECTIONS}}, indent=2)
+        parts = []
+        for name in REPORT_SECTIONS:
+            fragments = sections[name]["fragments"]
+            if fmt not in fragments:
+                fragments[fmt] = self.render_fragment(name, sections[name]["data"], fmt)
+            if fragments[fmt]:
+                parts.append(fragments[fmt])
+        if not sections["overview"]["data"]["total"]:
+            parts.insert(0, "<p>No entries in this period.</p>\n" if fmt == "html" else "No entries in this period.\n")
+        if fmt == "md":
+            return f"# {title}\n\n" + "\n".join(parts)
+        if fmt == "html":
+            return (f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head>\n"
+                    f"<body><h1>{html.escape(title)}</h1>\n" + "".join(parts) + "</body></html>\n")
+        return f"{title}\n{'=' * len(title)}\n\n" + "\n".join(parts)
+
+    def generate(self, since: int, until: int, formats=REPORT_FORMATS, title: Optional[str] = None) -> List[str]:
+        """Writes the report for [since, until) in each format; returns the file paths."""
+        first = datetime.fromtimestamp(since).date()
+        last = datetime.fromtimestamp(until - 1).date()
+        title = title or f"MoodMate Report: {first:%b %d} – {last:%b %d, %Y}"
+        built = self.build(since, until)
+        paths = []
+        os.makedirs(self.folder, exist_ok=True)
+        for fmt in formats:
+            if fmt not in REPORT_FORMATS:
+                raise ValueError(f"Unknown report format: {fmt}")
+            path = os.path.join(self.folder, f"moodmate_report_{first.isoformat()}_{last.isoformat()}.{fmt}")
+            with open(path + ".tmp", 'w', encoding='utf-8') as f:
+                f.write(self.render(built, fmt, title))
+            os.replace(path + ".tmp", path)
+            paths.append(path)
+        self._save_cache(self._cache)
+        return paths
+
+
+class MoodDashboard:
+    """Live terminal view of today, the week, pending tasks and the Pomodoro timer.
+
+    Built once from the last DASHBOARD_DAYS days, then kept current from the change feed:
+    each redraw applies at most `max_events` new changes to running counters, so a frame
+    costs the same on day one and after weeks on a wall display.
+    """
+
+    def __init__(self, logger: MoodLogger, timer: Optional[PomodoroTimer] = None,
+                 refresh: float = DASHBOARD_REFRESH_SECONDS, max_events: int = DASHBOARD_MAX_EVENTS):
+        self.logger = logger
+        self.timer = timer or PomodoroTimer()
+        self.refresh = refresh
+        self.max_events = max_events
+        self.watcher = ChangeWatcher(logger.changes_file)
+        self.frame_ms = 0.0
+        self._phase = None
+        self._reload()
+
+    @staticmethod
+    def _today() -> int:
+        now = int(time.time())
+        return _local_day({"ts": now, "tz": time.localtime(now).tm_gmtoff})
+
+    def _reload(self) -> None:
+        """Takes a fresh snapshot; used at start and once a day when the window moves."""
+        self.seq = self.logger.feed_head() # Changes after this are applied as deltas
+        self.today = self._today()
+        self.window: Dict[str, Dict] = {
+            entry["id"]: entry for entry in self.logger.get_recent_moods(DASHBOARD_DAYS + 1) if self._in_window(entry)
+        }
+        self.pending = {entry["id"] for entry in self.logger.get_pending_tasks()}
+        self.week = {"total": 0, "completed": 0, "by_mood": defaultdict(int)}
+        self.day = {"total": 0, "completed": 0, "by_mood": defaultdict(int)}
+        for entry in self.window.values():
+            self._count(entry, 1)
+        self.backlog = False
+
+    def _in_window(self, entry: Dict) -> bool:
+        return self.today - DASHBOARD_DAYS < _local_day(entry) <= self.today
+
+    def _count(self, entry: Dict, sign: int) -> None:
+        for counters in (self.week, self.day) if _local_day(entry) == self.today else (self.week,):
+            counters["total"] += sign
+            counters["completed"] += sign if entry["completed"] else 0
+            counters["by_mood"][entry["mood"]] += sign
+
+    def apply(self, event: Dict) -> None:
+        """Applies one change-feed event to the counters."""
+        entry_id, old = event["id"], self.window.pop(event["id"], None)
+        if old is not None:
+            self._count(old, -1)
+        if event["type"] in ("delete", "retire"):
+            self.pending.discard(entry_id)
+            return
+        entry = {**old, **event["fields"]} if old is not None else {"id": entry_id, **event["fields"]}
+        if "completed" in event["fields"] or event["type"] == "new":
+            if entry["completed"]:
+                self.pending.discard(entry_id)
+            else:
+                self.pending.add(entry_id)
+        if {"ts", "tz", "mood", "completed"} <= entry.keys() and self._in_window(entry):
+            self.window[entry_id] = entry
+            self._count(entry, 1)
+
+    def tick(self) -> str:
+        """Applies the changes since the last tick (within budget) and renders a frame."""
+        started = time.perf_counter()
+        if self._today() != self.today:
+            self._reload()
+        elif self.backlog or self.watcher.wait(0):
+            applied = 0
+            for event in self.logger.feed(self.seq):
+                self.apply(event)
+                self.seq = event["seq"]
+                applied += 1
+                if applied >= self.max_events:
+                    break
+            self.backlog = applied >= self.max_events # Carry on next tick instead of stalling this one
+        frame = self.render()
+        self.frame_ms = (time.perf_counter() - started) * 1000
+        return frame
+
+    def _timer_line(self) -> str:
+        status = self.timer.status()
+        phase = status and (status["phase"], status["cycle"])
+        if phase != self._phase and self._phase is not None:
+            self.timer._notify(f"{self._phase[0]} time over!", f"MoodMate: {self._phase[0]} is done!")
+        self._phase = phase
+        if status is None:
+            return "🍅 No timer running."
+        mins, secs = divmod(int(status["remaining"]), 60)
+        icon, color = ("⏳", "success") if status["phase"] == "FOCUS" else ("☕", "menu")
+        return f"{COLORS[color]}{icon} {status['phase']} {mins:02d}:{secs:02d} left (cycle {status['cycle']}/{status['cycles']}){COLORS['reset']}"
+
+    def render(self) -> str:
+        day, week = self.day, self.week
+        lines = [
+            f"{COLORS['header']}--- 📺 MoodMate Live ---{COLORS['reset']}  {datetime.now().strftime('%a %b %d, %H:%M:%S')}",
+            "",
+            f"{COLORS['menu']}Today:{COLORS['reset']} {day['total']} entries | "
+            f"completed {day['completed']}/{day['total']} ({day['completed'] / day['total'] * 100 if day['total'] else 0:.0f}%)",
+            "   ".join(f"{mood.title()} {EMOJI_MAP.get(mood, '')} {count}"
+                       for mood, count in sorted(day["by_mood"].items(), key=lambda item: -item[1]) if count) or "Nothing logged yet today.",
+            "",
+            f"{COLORS['menu']}Pending tasks:{COLORS['reset']} {len(self.pending)}",
+            "",
+            f"{COLORS['menu']}Last {DASHBOARD_DAYS} days:{COLORS['reset']} {week['total']} entries | "
+            f"completion {week['completed'] / week['total'] * 100 if week['total'] else 0:.0f}%",
+        ]
+        moods = [(mood, count) for mood, count in sorted(week["by_mood"].items(), key=lambda item: -item[1]) if count]
+        for mood, count in moods:
+            bar = "█" * max(1, round(count / moods[0][1] * 20))
+            lines.append(f"- {mood.title():<12} {EMOJI_MAP.get(mood, ''):<2} {bar} {count} ({count / week['total'] * 100:.0f}%)")
+        lines += ["", self._timer_line(), "",
+                  f"{COLORS['input']}Refreshing every {self.refresh:g}s (last frame {self.frame_ms:.1f} ms). Press Ctrl+C to leave.{COLORS['reset']}"]
+        return "\n".join(lines)
+
+    def run(self, duration: Optional[float] = None) -> None:
+        """Redraws in place at a fixed pace until Ctrl+C (or for `duration` seconds)."""
+        ends = None if duration is None else time.monotonic() + duration
+        deadline = time.monotonic()
+        sys.stdout.write("\033[2J")
+        try:
+            while ends is None or time.monotonic() < ends:
+                frame = self.tick()
+                sys.stdout.write("\033[H" + frame.replace("\n", "\033[K\n") + "\033[K\033[J")
+                sys.stdout.flush()
+                deadline += self.refresh
+                delay = deadline - time.monotonic()
+                if delay < 0: # Fell behind: skip frames rather than trying to catch up
+                    deadline, delay = time.monotonic(), 0
+                time.sleep(delay)
+        finally:
+            self.watcher.close()
+
 
 class MoodMateApp:
     """The main application class for MoodMate, handling user interaction and integrating all features."""
     
-    def __init__(self):
-        self.logger = MoodLogger()
+    def __init__(self, logger: Optional[MoodLogger] = None):
+        self.logger = logger or MoodLogger()
         self.timer = PomodoroTimer()
         self.analyzer = MoodAnalyzer()
+        self.logger.add_anomaly_hook(self._on_anomaly)
+
+    def _on_anomaly(self, anomaly: Dict) -> None:
+        """Gently points out a trend alert right after the entry that raised it."""
+        print(f"\n{COLORS['warning']}🔔 {anomaly['message']} The weekly summary has more.{COLORS['reset']}")
     
     def _clear_screen(self) -> None:
         """Clears the terminal screen for a cleaner interface."""
@@ -688,14 +4460,13 @@ class MoodMateApp:
             return sample(MOOD_TASKS[mood][category], min(5, len(MOOD_TASKS[mood][category])))
         
         # If no specific category or category invalid, pull from all categories for the mood
-        all_tasks = []
-        for cat_tasks_list in MOOD_TASKS[mood].values():
-            all_tasks.extend(cat_tasks_list)
+        all_tasks = tasks_for_mood(mood)
         return sample(all_tasks, min(5, len(all_tasks))) # Return up to 5 random tasks
 
     def run(self) -> None:
         """Starts the MoodMate application and runs the main menu loop."""
         try:
+            self.logger.compact_if_due()
             while True:
                 self._clear_screen()
                 print(BANNER)
@@ -707,30 +4478,33 @@ class MoodMateApp:
                 print(f"[5] {COLORS['menu']}Manage My Entries (Edit/Delete/Complete){COLORS['reset']}")
                 print(f"[6] {COLORS['menu']}Data Tools (Backup/Export){COLORS['reset']}")
                 print(f"[7] {COLORS['menu']}Get My Weekly Summary{COLORS['reset']}")
+                print(f"[8] {COLORS['menu']}Live Dashboard{COLORS['reset']}")
                 print(f"[0] {COLORS['warning']}Exit MoodMate{COLORS['reset']}")
                 
-                choice = input(f"\n{COLORS['input']}👉 What would you like to do? (1-7): {COLORS['reset']}").strip()
+                choice = input(f"\n{COLORS['input']}👉 What would you like to do? (1-8): {COLORS['reset']}").strip()
                 
                 if choice == "1":
-                    self._log_mood_flow()
+                    self._run_flow(self._log_mood_flow)
                 elif choice == "2":
-                    self._quick_log_flow()
+                    self._run_flow(self._quick_log_flow)
                 elif choice == "3":
-                    self._view_stats()
+                    self._run_flow(self._view_stats)
                 elif choice == "4":
-                    self._run_pomodoro()
+                    self._run_flow(self._run_pomodoro)
                 elif choice == "5":
-                    self._manage_entries_flow()
+                    self._run_flow(self._manage_entries_flow)
                 elif choice == "6":
-                    self._data_management_flow()
+                    self._run_flow(self._data_management_flow)
                 elif choice == "7":
-                    self._weekly_summary_flow()
+                    self._run_flow(self._weekly_summary_flow)
+                elif choice == "8":
+                    self._run_flow(self._dashboard_flow)
                 elif choice == "0":
                     if self._confirm_exit():
                         print(f"\n{COLORS['success']}👋 Thanks for using MoodMate! Have a wonderful day!{COLORS['reset']}")
                         break
                 else:
-                    print(f"{COLORS['warning']}⚠️ Oops! That's not a valid option. Please choose a number from 1 to 7.{COLORS['reset']}")
+                    print(f"{COLORS['warning']}⚠️ Oops! That's not a valid option. Please choose a number from 1 to 8.{COLORS['reset']}")
                     time.sleep(1.5) # Give user time to read the message
         
         except KeyboardInterrupt:
@@ -739,6 +4513,11 @@ class MoodMateApp:
             print(f"\n{COLORS['warning']}⚠️ An unexpected error occurred: {e}. Please restart MoodMate or contact support.{COLORS['reset']}")
             time.sleep(3) # Keep error message on screen longer
 
+    def _run_flow(self, flow) -> None:
+        """Runs a menu flow, under cProfile/tracemalloc when MOODMATE_PROFILE is set."""
+        with profile_flow(flow.__name__):
+            flow()
+
     def _confirm_exit(self) -> bool:
         """Asks the user for confirmation before exiting the application."""
         print(f"\n{COLORS['warning']}--- Exiting MoodMate ---{COLORS['reset']}")
@@ -891,16 +4670,24 @@ class MoodMateApp:
         print(f"{COLORS['header']}--- 📊 Your Mood Statistics ---{COLORS['reset']}")
         
         stats = self.logger.get_mood_stats()
+        stats["notes"] = self.logger.note_insights()
         
         if stats["total"] == 0:
             print(f"{COLORS['warning']}⚠️ No entries yet! Log some moods to see your stats here.{COLORS['reset']}")
             input(f"\n{COLORS['input']}Press Enter to continue...{COLORS['reset']}")
             return
 
+        self._print_stats(stats)
+        input(f"\n{COLORS['input']}Press Enter to return to the main menu...{COLORS['reset']}")
+
+    def _print_stats(self, stats: Dict) -> None:
+        """Prints the overall summary, mood frequency and recent activity sections."""
         print(f"\n{COLORS['menu']}Overall Summary:{COLORS['reset']}")
         print(f"Total entries logged: {stats['total']}")
         print(f"Tasks marked as completed: {stats['completion_rate']:.1f}%")
         print(f"Entries with a personal note: {stats['notes_count']}")
+        if stats.get("notes") and stats["notes"]["tagged"]:
+            print(MoodAnalyzer.describe_insights(stats["notes"]))
         
         if stats['by_mood']:
             print(f"\n{COLORS['menu']}Your Mood Frequency:{COLORS['reset']}")
@@ -909,16 +4696,20 @@ class MoodMateApp:
         
         if stats['by_day']:
             print(f"\n{COLORS['menu']}Recent Logging Activity (Last 7 Days):{COLORS['reset']}")
-            # Sort by date descending and show top 7
-            recent_days = sorted([ (date, count) for date, count in stats['by_day'].items() if (datetime.now().date() - date).days <= 7 ], key=lambda x: x[0], reverse=True)
+            recent_days = self._recent_activity(7)
             if recent_days:
                 for date, count in recent_days:
                     print(f"- {date.strftime('%b %d, %Y')}: {count} entries")
             else:
                 print("No entries in the last 7 days.")
-        
-        input(f"\n{COLORS['input']}Press Enter to return to the main menu...{COLORS['reset']}")
 
+    def _recent_activity(self, days: int) -> List[Tuple]:
+        """(date, entries) for today and the `days` days before it, newest first."""
+        first = datetime.now().date() - timedelta(days=days)
+        counts: Dict = defaultdict(int)
+        for entry in self.logger.query(since=int(datetime.combine(first, datetime.min.time()).timestamp())):
+            counts[_day_to_date(_local_day(entry))] += 1
+        return sorted(counts.items(), reverse=True)
 
     def _run_pomodoro(self) -> None:
         """Handles the Pomodoro timer setup and execution."""
@@ -957,22 +4748,26 @@ class MoodMateApp:
         print(f"[2] {COLORS['menu']}Mark a task as Completed{COLORS['reset']}")
         print(f"[3] {COLORS['menu']}Delete an entry{COLORS['reset']}")
         print(f"[4] {COLORS['menu']}Mark ALL pending tasks as Completed{COLORS['reset']}") # New option
+        print(f"[5] {COLORS['menu']}Find entries (by mood, text, status or date){COLORS['reset']}")
+        print(f"[6] {COLORS['menu']}Show an entry's history{COLORS['reset']}")
+        print(f"[7] {COLORS['menu']}Undo last change{COLORS['reset']}")
+        print(f"[8] {COLORS['menu']}Redo{COLORS['reset']}")
         print(f"[0] {COLORS['warning']}Back to Main Menu{COLORS['reset']}")
         
         while True:
-            choice = input(f"{COLORS['input']}👉 Choose an option (1-4, or 0 to go back): {COLORS['reset']}").strip()
+            choice = input(f"{COLORS['input']}👉 Choose an option (1-8, or 0 to go back): {COLORS['reset']}").strip()
             if choice == "0":
                 print(f"{COLORS['warning']}✖ Returning to main menu.{COLORS['reset']}")
                 return
             
             try:
                 action_choice = int(choice)
-                if not (1 <= action_choice <= 4): # Updated range
-                    print(f"{COLORS['warning']}⚠️ Invalid option. Please choose a number from 1 to 4.{COLORS['reset']}")
+                if not (1 <= action_choice <= 8): # Updated range
+                    print(f"{COLORS['warning']}⚠️ Invalid option. Please choose a number from 1 to 8.{COLORS['reset']}")
                     continue
 
                 if action_choice == 2:  # Mark a single task as completed
-                    pending_tasks = [entry for entry in logs if not entry.get("completed", False)]
+                    pending_tasks = self.logger.get_pending_tasks()
                     if not pending_tasks:
                         print(f"{COLORS['success']}🎉 All your tasks are completed! Great job!{COLORS['reset']}")
                         input(f"\n{COLORS['input']}Press Enter to continue...{COLORS['reset']}")
@@ -988,11 +4783,9 @@ class MoodMateApp:
                     task_idx_in_pending = int(task_num_str) - 1
 
                     if 0 <= task_idx_in_pending < len(pending_tasks):
-                        # Find the actual index in the full logs list
                         selected_pending_entry = pending_tasks[task_idx_in_pending]
-                        actual_index = logs.index(selected_pending_entry) # Get original index
                         
-                        if self.logger.edit_entry(actual_index, completed=True):
+                        if self.logger.complete_task(selected_pending_entry["id"]):
                             print(f"{COLORS['success']}✅ Task '{selected_pending_entry['task']}' marked as completed!{COLORS['reset']}")
                         else:
                             print(f"{COLORS['warning']}⚠️ Could not mark task as completed.{COLORS['reset']}")
@@ -1015,6 +4808,22 @@ class MoodMateApp:
                     input(f"\n{COLORS['input']}Press Enter to continue...{COLORS['reset']}")
                     break # Exit loop after marking all tasks
                 
+                elif action_choice == 5: # Find entries, then carry on with Edit/Delete using their numbers
+                    self._find_entries(logs)
+                    continue
+
+                elif action_choice in (7, 8): # Undo / Redo
+                    records = self.logger.undo() if action_choice == 7 else self.logger.redo()
+                    if records:
+                        verb = "Undone" if action_choice == 7 else "Redone"
+                        print(f"{COLORS['success']}↩️ {verb}: {self._describe_change(records)}{COLORS['reset']}")
+                        logs = self.logger.get_all_logs()
+                        if logs:
+                            self._display_all_entries(logs)
+                    else:
+                        print(f"{COLORS['menu']}Nothing to {'undo' if action_choice == 7 else 'redo'}.{COLORS['reset']}")
+                    break
+                
                 else: # For Edit or Delete, prompt for index from full list
                     entry_num_str = input(f"{COLORS['input']}Enter the NUMBER of the entry you want to modify (from the full list above): {COLORS['reset']}").strip()
                     entry_index_from_bottom = int(entry_num_str) - 1 # User sees 1-indexed, newest first
@@ -1028,8 +4837,10 @@ class MoodMateApp:
 
                     if action_choice == 1: # Edit
                         self._edit_single_entry(actual_index, logs)
+                    elif action_choice == 6: # History
+                        self._show_entry_history(logs[actual_index])
                     elif action_choice == 3: # Delete
-                        confirm_delete = input(f"{COLORS['warning']}Are you sure you want to delete entry {entry_num_str}? This cannot be undone. (Y/N): {COLORS['reset']}").lower()
+                        confirm_delete = input(f"{COLORS['warning']}Are you sure you want to delete entry {entry_num_str}? You can undo this from this menu. (Y/N): {COLORS['reset']}").lower()
                         if confirm_delete == 'y':
                             if self.logger.delete_entry(actual_index):
                                 # After deletion, reload logs to reflect changes for display
@@ -1060,18 +4871,70 @@ class MoodMateApp:
         for i, entry in enumerate(reversed(display_logs)): # Display in reverse order (newest first)
             # original_index = len(logs) - 1 - i # Calculate original index from reversed list
             display_num = i + 1 # User sees 1-indexed count
-            date_time = datetime.fromisoformat(entry["timestamp"]).strftime("%Y-%m-%d %H:%M")
-            status = "✅ Done" if entry.get("completed", False) else "⏳ Pending"
+            date_time = _format_entry_time(entry)
+            status = "✅ Done" if entry["completed"] else "⏳ Pending"
             
             print(f"\n{COLORS['success']}[{display_num}]{COLORS['reset']} {date_time} | {entry['mood'].title()} Mood")
             print(f"   Task: {entry['task']}")
             print(f"   Status: {status}")
-            if entry.get("note"):
+            if entry["note"]:
                 print(f"   Note: {entry['note'][:70]}{'...' if len(entry['note']) > 70 else ''}")
         print(f"\n{COLORS['menu']}Showing the last {len(display_logs)} entries.{COLORS['reset']}")
         if len(logs) > len(display_logs):
              print(f"{COLORS['input']}   (Total entries: {len(logs)}. Scroll up for more past entries in history.)")
 
+    def _find_entries(self, logs: List[Dict], count: int = 20) -> None:
+        """Asks for search filters and lists the newest matching entries with their numbers in the full list."""
+        moods = input(f"{COLORS['input']}Mood(s), comma-separated (or press Enter for any): {COLORS['reset']}").strip().lower()
+        text = input(f"{COLORS['input']}Words in the task or note (or press Enter for any): {COLORS['reset']}").strip()
+        status = input(f"{COLORS['input']}[P]ending, [C]ompleted, or press Enter for both: {COLORS['reset']}").strip().lower()
+        days = input(f"{COLORS['input']}Only the last N days (or press Enter for all time): {COLORS['reset']}").strip()
+        matches = self.logger.query(
+            moods=[mood.strip() for mood in moods.split(",") if mood.strip()] or None,
+            text=text or None,
+            completed={"p": False, "c": True}.get(status[:1]),
+            since=int(time.time()) - int(days) * SECONDS_PER_DAY if days.isdigit() else None,
+            sort="-log", limit=count,
+        )
+        if not matches:
+            print(f"{COLORS['warning']}No entries match your search.{COLORS['reset']}")
+            return
+
+        numbers = {entry["id"]: len(logs) - position for position, entry in enumerate(logs)}
+        print(f"\n{COLORS['menu']}--- Matching Entries (newest first) ---{COLORS['reset']}")
+        for entry in matches:
+            status = "✅ Done" if entry["completed"] else "⏳ Pending"
+            print(f"\n{COLORS['success']}[{numbers.get(entry['id'], '?')}]{COLORS['reset']} {_format_entry_time(entry)} | {entry['mood'].title()} Mood")
+            print(f"   Task: {entry['task']}")
+            print(f"   Status: {status}")
+            if entry["note"]:
+                print(f"   Note: {entry['note'][:70]}{'...' if len(entry['note']) > 70 else ''}")
+        print(f"\n{COLORS['menu']}Showing {len(matches)} match(es). Use these numbers to edit or delete an entry.{COLORS['reset']}")
+
+    @staticmethod
+    def _describe_change(records: List[Dict]) -> str:
+        """One line summing up the change a group of history records made or undid, e.g. "edit of note"."""
+        ops = sorted({_inverse_delta(record)["op"] if record["kind"] == "undo" else record["op"] for record in records})
+        fields = sorted({field for record in records if record["op"] == "edit" for field in record["after"]})
+        what = ", ".join(f"edit of {', '.join(fields)}" if op == "edit" else op for op in ops)
+        return what + (f" ({len(records)} entries)" if len(records) > 1 else "")
+
+    def _show_entry_history(self, entry: Dict) -> None:
+        """Lists every recorded edit, delete and restore of an entry, oldest first."""
+        print(f"\n{COLORS['menu']}--- History of {entry['mood'].title()} on {_format_entry_time(entry)} ---{COLORS['reset']}")
+        records = self.logger.entry_history(entry["id"])
+        if not records:
+            print(f"{COLORS['menu']}This entry has not been changed since it was logged.{COLORS['reset']}")
+            return
+        labels = {"do": "", "undo": " (undo)", "redo": " (redo)"}
+        for record in records:
+            when = datetime.fromtimestamp(record["at"]).strftime("%Y-%m-%d %H:%M")
+            if record["op"] == "edit":
+                changes = "; ".join(f"{field}: {record['before'].get(field)!r} → {value!r}" for field, value in record["after"].items())
+                print(f"{COLORS['success']}[v{record['v']}]{COLORS['reset']} {when} Edited{labels[record['kind']]}: {changes}")
+            else:
+                print(f"{COLORS['success']}[v{record['v']}]{COLORS['reset']} {when} {record['op'].title()}d{labels[record['kind']]}")
+
     def _display_pending_tasks(self, pending_tasks: List[Dict]) -> None:
         """Displays only the tasks that are not yet marked as completed."""
         print(f"\n{COLORS['menu']}--- Your Unfinished Tasks ---{COLORS['reset']}")
@@ -1080,9 +4943,9 @@ class MoodMateApp:
             return
 
         for i, entry in enumerate(pending_tasks, 1):
-            date_time = datetime.fromisoformat(entry["timestamp"]).strftime("%Y-%m-%d %H:%M")
+            date_time = _format_entry_time(entry)
             print(f"{COLORS['warning']}[{i}]{COLORS['reset']} {date_time} | {entry['mood'].title()} Mood: {entry['task']}")
-            if entry.get("note"):
+            if entry["note"]:
                 print(f"   Note: {entry['note'][:70]}{'...' if len(entry['note']) > 70 else ''}")
         print("\n")
 
@@ -1093,8 +4956,8 @@ class MoodMateApp:
         print(f"\n{COLORS['menu']}--- Editing Entry #{len(logs) - actual_index} ---{COLORS['reset']}")
         print(f"Current Mood: {entry_to_edit['mood'].title()}")
         print(f"Current Task: {entry_to_edit['task']}")
-        print(f"Current Note: {entry_to_edit.get('note', 'No note')}")
-        print(f"Current Status: {'Completed' if entry_to_edit.get('completed', False) else 'Pending'}")
+        print(f"Current Note: {entry_to_edit['note'] or 'No note'}")
+        print(f"Current Status: {'Completed' if entry_to_edit['completed'] else 'Pending'}")
 
         changes = {}
         
@@ -1114,7 +4977,7 @@ class MoodMateApp:
         elif new_note_prompt:
             changes["note"] = new_note_prompt
         
-        status_change = input(f"{COLORS['input']}Mark as completed? (Y/N, current is {'Completed' if entry_to_edit.get('completed', False) else 'Pending'}): {COLORS['reset']}").lower()
+        status_change = input(f"{COLORS['input']}Mark as completed? (Y/N, current is {'Completed' if entry_to_edit['completed'] else 'Pending'}): {COLORS['reset']}").lower()
         if status_change == 'y':
             changes["completed"] = True
         elif status_change == 'n':
@@ -1137,63 +5000,86 @@ class MoodMateApp:
         print(f"\n{COLORS['menu']}What would you like to do with your data?{COLORS['reset']}")
         print(f"[1] {COLORS['menu']}Backup My Data{COLORS['reset']}")
         print(f"[2] {COLORS['menu']}Restore Data from Backup (Careful!){COLORS['reset']}")
-        print(f"[3] {COLORS['menu']}Export My Data (to JSON/CSV file){COLORS['reset']}")
+        print(f"[3] {COLORS['menu']}Export My Data (to JSON/CSV/binary file){COLORS['reset']}")
+        print(f"[4] {COLORS['menu']}Compact Old History (keep daily/weekly summaries){COLORS['reset']}")
+        print(f"[5] {COLORS['menu']}Create Reports (Text/Markdown/HTML/JSON){COLORS['reset']}")
         print(f"[0] {COLORS['warning']}Back to Main Menu{COLORS['reset']}")
         
-        choice = input(f"{COLORS['input']}👉 Choose an option (1-3): {COLORS['reset']}").strip()
+        choice = input(f"{COLORS['input']}👉 Choose an option (1-5): {COLORS['reset']}").strip()
         
         if choice == "1":
             try:
-                # Read from current log file and write to backup
-                with open(LOG_FILE, 'r') as src, open(BACKUP_FILE, 'w') as dest:
-                    json.dump(json.load(src), dest, indent=2)
-                print(f"{COLORS['success']}✅ Data backed up successfully to '{BACKUP_FILE}'!{COLORS['reset']}")
+                backup_path = self.logger.backup()
+                print(f"{COLORS['success']}✅ Data backed up successfully to '{backup_path}'!{COLORS['reset']}")
             except FileNotFoundError:
                 print(f"{COLORS['warning']}⚠️ No data to backup. Log some moods first!{COLORS['reset']}")
             except Exception as e:
                 print(f"{COLORS['warning']}⚠️ Backup failed: {e}.{COLORS['reset']}")
         
         elif choice == "2":
-            if os.path.exists(BACKUP_FILE):
+            if os.path.exists(self.logger.backup_file):
                 print(f"{COLORS['warning']}--- Restore Warning ---{COLORS['reset']}")
                 print(f"{COLORS['warning']}⚠️ Restoring will OVERWRITE your current MoodMate data with the backup!{COLORS['reset']}")
                 confirm = input(f"{COLORS['input']}Are you absolutely sure you want to restore? (Y/N): {COLORS['reset']}").lower()
                 if confirm == 'y':
                     try:
-                        # Read from backup and write to current log file
-                        with open(BACKUP_FILE, 'r') as src, open(LOG_FILE, 'w') as dest:
-                            json.dump(json.load(src), dest, indent=2)
+                        self.logger.restore()
                         print(f"{COLORS['success']}✅ Data restored successfully from backup!{COLORS['reset']}")
                     except Exception as e:
                         print(f"{COLORS['warning']}⚠️ Restore failed: {e}. The backup file might be corrupted.{COLORS['reset']}")
                 else:
                     print(f"{COLORS['menu']}Restore cancelled.{COLORS['reset']}")
             else:
-                print(f"{COLORS['warning']}⚠️ No backup file found at '{BACKUP_FILE}'. Please create a backup first.{COLORS['reset']}")
+                print(f"{COLORS['warning']}⚠️ No backup file found at '{self.logger.backup_file}'. Please create a backup first.{COLORS['reset']}")
         
         elif choice == "3":
             print(f"\n{COLORS['menu']}Choose your export format:{COLORS['reset']}")
             print(f"[1] {COLORS['menu']}JSON (recommended for data sharing/re-import){COLORS['reset']}")
             print(f"[2] {COLORS['menu']}CSV (great for spreadsheets like Excel){COLORS['reset']}")
+            print(f"[3] {COLORS['menu']}Binary .mmlog (compact archive, opens instantly; can be restored){COLORS['reset']}")
             
-            format_choice = input(f"{COLORS['input']}👉 Choose format (1-2): {COLORS['reset']}").strip()
+            format_choice = input(f"{COLORS['input']}👉 Choose format (1-3): {COLORS['reset']}").strip()
             format_type = "json" # Default
             if format_choice == "2":
                 format_type = "csv"
+            elif format_choice == "3":
+                format_type = "mmlog"
             elif format_choice != "1":
                 print(f"{COLORS['warning']}⚠️ Invalid choice. Exporting as JSON by default.{COLORS['reset']}")
 
+            days = input(f"{COLORS['input']}Export only the last N days? (Enter a number, or press Enter for everything): {COLORS['reset']}").strip()
+            filters = {"since": int(time.time()) - int(days) * SECONDS_PER_DAY} if days.isdigit() else {}
             try:
-                export_path = self.logger.export_data(format_type)
+                export_path = self.logger.export_data(format_type, **filters)
                 print(f"{COLORS['success']}✅ Data exported successfully to: '{export_path}'{COLORS['reset']}")
             except Exception as e:
                 print(f"{COLORS['warning']}⚠️ Export failed: {e}. Make sure you have entries logged.{COLORS['reset']}")
         
+        elif choice == "4":
+            print(f"{COLORS['menu']}Entries older than {RETENTION_RAW_DAYS} days become daily summaries; "
+                  f"summaries older than {RETENTION_DAILY_DAYS} days become weekly ones.{COLORS['reset']}")
+            try:
+                result = self.logger.compact()
+                print(f"{COLORS['success']}✅ Rolled up {result['rolled_up']} entries; {result['kept']} recent entries kept as they are.{COLORS['reset']}")
+            except Exception as e:
+                print(f"{COLORS['warning']}⚠️ Compaction failed: {e}.{COLORS['reset']}")
+        
+        elif choice == "5":
+            days = input(f"{COLORS['input']}How many days should the report cover? (Enter for 7): {COLORS['reset']}").strip()
+            try:
+                pipeline = ReportPipeline(self.logger)
+                paths = pipeline.generate(*ReportPipeline.period(int(days) if days.isdigit() and int(days) > 0 else 7))
+                print(f"{COLORS['success']}✅ Reports saved in '{pipeline.folder}':{COLORS['reset']}")
+                for path in paths:
+                    print(f"- {os.path.basename(path)}")
+            except Exception as e:
+                print(f"{COLORS['warning']}⚠️ Report failed: {e}.{COLORS['reset']}")
+        
         elif choice == "0":
             print(f"{COLORS['warning']}✖ Returning to main menu.{COLORS['reset']}")
             return
         else:
-            print(f"{COLORS['warning']}⚠️ Invalid option. Please choose 1, 2, or 3.{COLORS['reset']}")
+            print(f"{COLORS['warning']}⚠️ Invalid option. Please choose 1, 2, 3, 4, or 5.{COLORS['reset']}")
         
         input(f"\n{COLORS['input']}Press Enter to continue...{COLORS['reset']}")
 
@@ -1201,15 +5087,238 @@ class MoodMateApp:
         """Generates and displays a summary of the past 7 days."""
         self._clear_screen()
         print(f"{COLORS['header']}--- 📊 Your Past 7 Days at a Glance ---{COLORS['reset']}")
-        logs_last_7_days = self.logger.get_recent_moods(7)
-        summary = self.analyzer.generate_weekly_summary(logs_last_7_days)
+        logs_last_7_days = self.logger.get_recent_moods(SUMMARY_DAYS)
+        since = int(time.time()) - SUMMARY_DAYS * SECONDS_PER_DAY
+        summary = self.analyzer.generate_weekly_summary(logs_last_7_days, self.logger.anomalies(since=since),
+                                                        self.logger.note_insights(since=since))
         print(summary)
         
         input(f"\n{COLORS['input']}Press Enter to return to the main menu...{COLORS['reset']}")
 
+    def _dashboard_flow(self) -> None:
+        """Shows the live dashboard, optionally with a Pomodoro timer running on it."""
+        self._clear_screen()
+        print(f"{COLORS['header']}--- 📺 Live Dashboard ---{COLORS['reset']}")
+        focus = input(f"{COLORS['input']}Run a Pomodoro on the dashboard? Enter focus minutes, or press Enter to skip: {COLORS['reset']}").strip()
+        if focus.isdigit() and int(focus) > 0:
+            self.timer.start(int(focus), 5, 4)
+        try:
+            MoodDashboard(self.logger, self.timer).run()
+        except KeyboardInterrupt:
+            pass
+        self.timer.schedule = None
+
+    def show_stats(self, internal: bool = False, workers: Optional[int] = None) -> None:
+        """Prints mood statistics without the interactive menu, plus internal metrics if asked."""
+        if internal:
+            METRICS.enable()
+        with profile_flow("stats"):
+            stats = self.logger.get_mood_stats(workers=workers)
+            if stats["notes_count"]:
+                self.logger.tag_all_notes(workers) # In parallel too, when asked
+                stats["notes"] = self.logger.note_insights()
+            if stats["total"] == 0:
+                print(f"{COLORS['warning']}⚠️ No entries yet! Log some moods to see your stats here.{COLORS['reset']}")
+            else:
+                self._print_stats(stats)
+
+        if internal:
+            print(f"\n{COLORS['header']}--- 📐 Internal Metrics ---{COLORS['reset']}")
+            print(METRICS.format_report())
+            print(f"\n{COLORS['success']}Prometheus metrics written to '{METRICS.write_prometheus()}'{COLORS['reset']}")
+
+
+def show_org_stats(router: ShardRouter) -> None:
+    """Prints organisation-wide totals and mood distribution across all user shards."""
+    totals = router.org_aggregates()
+    print(f"{COLORS['header']}--- 🏢 Organisation Mood Overview ---{COLORS['reset']}")
+    if not totals["total"]:
+        print(f"{COLORS['warning']}⚠️ No entries in any shard yet.{COLORS['reset']}")
+        return
+    print(f"Users: {totals['users']} | Entries: {totals['total']} | Tasks completed: {totals['completion_rate']:.1f}%")
+    print(f"\n{COLORS['menu']}Mood Distribution:{COLORS['reset']}")
+    for mood, share in router.org_mood_distribution(totals).items():
+        print(f"- {mood.title()} {EMOJI_MAP.get(mood, '')}: {share:.1f}%")
+
+
+if os.environ.get(METRICS_ENV_VAR, "").strip() not in ("", "0"):
+    METRICS.enable()
+    atexit.register(METRICS.write_prometheus)
+
 # ======================
 # ▶️ App Execution
 # ======================
+def main(argv: Optional[List[str]] = None) -> None:
+    """Parses command-line arguments; without a command the interactive menu starts."""
+    parser = argparse.ArgumentParser(prog="moodmate", description="MoodMate - Your Emotional Guide")
+    parser.add_argument("--user", default=os.environ.get("MOODMATE_USER"),
+                        help=f"Keep this user's data in their own shard under '{SHARD_ROOT}'.")
+    parser.add_argument("--locale", help=f"Task catalog language (default: ${CATALOG_LOCALE_ENV_VAR} or '{DEFAULT_LOCALE}').")
+    parser.add_argument("--org", help=f"Layer this organization's task catalog on top (default: ${CATALOG_ORG_ENV_VAR}).")
+    commands = parser.add_subparsers(dest="command")
+    stats_parser = commands.add_parser("stats", help="Print your mood statistics and exit.")
+    stats_parser.add_argument("--internal", action="store_true",
+                              help="Also dump call counts, latency and I/O metrics for this run.")
+    stats_parser.add_argument("--workers", type=int, const=ANALYTICS_WORKERS, nargs="?",
+                              help="Compute in parallel processes (default: one per CPU).")
+    summary_parser = commands.add_parser("summary", help="Print a mood summary for the last N days (or all time).")
+    summary_parser.add_argument("--days", type=int, help="Days to cover; all history if omitted.")
+    summary_parser.add_argument("--workers", type=int, const=ANALYTICS_WORKERS, nargs="?",
+                                help="Compute in parallel processes (default: one per CPU).")
+    query_parser = commands.add_parser("query", help="Print the entries matching some filters as JSON lines.")
+    query_parser.add_argument("--mood", type=lambda spec: spec.lower().split(","), help="Comma-separated moods.")
+    query_parser.add_argument("--days", type=int, help="Only the last N days.")
+    query_parser.add_argument("--text", help="Words in the task or note (any case).")
+    query_parser.add_argument("--completed", action="store_true", default=None, help="Only completed tasks.")
+    query_parser.add_argument("--pending", dest="completed", action="store_false", help="Only pending tasks.")
+    query_parser.add_argument("--has-note", action="store_true", default=None, help="Only entries with a note.")
+    query_parser.add_argument("--tag", type=lambda spec: spec.split(","), help="Only notes with one of these themes.")
+    query_parser.add_argument("--sort", default="log", choices=QUERY_SORTS, help="Order of the results (default: as logged).")
+    query_parser.add_argument("--limit", type=int, help="Stop after this many entries.")
+    sync_parser = commands.add_parser("sync", help="Exchange changes with another MoodMate replica.")
+    sync_parser.add_argument("replica", help="The other replica's data directory or log file.")
+    commands.add_parser("org-stats", help=f"Print the mood distribution across every shard in '{SHARD_ROOT}'.")
+    feed_parser = commands.add_parser("feed", help="Print changes as JSON lines, optionally live.")
+    feed_parser.add_argument("--since", type=int, default=0, help="Only changes after this sequence number.")
+    feed_parser.add_argument("--follow", action="store_true", help="Keep printing new changes as they happen.")
+    feed_parser.add_argument("--socket", help="Instead, broadcast live changes to clients of this Unix socket.")
+    tag_parser = commands.add_parser("tag-notes", help="Tag every note with themes and a sentiment score.")
+    tag_parser.add_argument("--workers", type=int, default=ANALYTICS_WORKERS, help="Worker processes (default: one per CPU).")
+    dashboard_parser = commands.add_parser("dashboard", help="Show a live, auto-refreshing dashboard.")
+    dashboard_parser.add_argument("--refresh", type=float, default=DASHBOARD_REFRESH_SECONDS, help="Seconds between redraws.")
+    dashboard_parser.add_argument("--pomodoro", metavar="WORK:BREAK:CYCLES",
+                                  type=lambda spec: tuple(int(part) for part in spec.split(":")),
+                                  help="Run a Pomodoro timer on the dashboard, e.g. 25:5:4.")
+    report_parser = commands.add_parser("report", help="Write text, Markdown, HTML and JSON reports for a period.")
+    report_parser.add_argument("--days", type=int, default=7, help="Whole days to cover, ending with --end (default: 7).")
+    report_parser.add_argument("--end", type=lambda day: datetime.strptime(day, "%Y-%m-%d"),
+                               help="Last day of the period, YYYY-MM-DD (default: today).")
+    report_parser.add_argument("--formats", default=",".join(REPORT_FORMATS),
+                               type=lambda spec: tuple(fmt.strip() for fmt in spec.split(",") if fmt.strip()),
+                               help=f"Comma-separated formats out of {', '.join(REPORT_FORMATS)}.")
+    report_parser.add_argument("--all-users", action="store_true",
+                               help=f"Write a report for every shard in '{SHARD_ROOT}' (e.g. from a daily cron job).")
+    compact_parser = commands.add_parser("compact", help="Roll old entries up into daily/weekly summaries.")
+    compact_parser.add_argument("--raw-days", type=int, default=RETENTION_RAW_DAYS,
+                                help="Keep individual entries for this many days.")
+    compact_parser.add_argument("--daily-days", type=int, default=RETENTION_DAILY_DAYS,
+                                help="Keep daily summaries for this many days, then weekly ones.")
+    compact_parser.add_argument("--no-notes", action="store_true", help="Do not keep note excerpts in summaries.")
+    convert_parser = commands.add_parser("convert", help="Convert a JSON log to the binary format or back.")
+    convert_parser.add_argument("source", help="Log to convert: JSON (any schema) or binary.")
+    convert_parser.add_argument("--output", help=f"Where to write it (default: next to the source, as "
+                                                 f"{BINARY_LOG_EXTENSION} or .json).")
+    commands.add_parser("undo", help="Undo your last edit or delete.")
+    commands.add_parser("redo", help="Redo the last change you undid.")
+    history_parser = commands.add_parser("history", help="Print the recorded changes of an entry as JSON lines.")
+    history_parser.add_argument("entry_id", help="Id of the entry (see `query`).")
+    migrate_parser = commands.add_parser("migrate", help=f"Upgrade a log file of any size to schema v{SCHEMA_VERSION}.")
+    migrate_parser.add_argument("log", nargs="?", help="Log file to upgrade (default: your log).")
+    migrate_parser.add_argument("--output", help="Write the upgraded log here instead of replacing the original.")
+    migrate_parser.add_argument("--checkpoint-every", type=int, default=MIGRATE_CHECKPOINT_EVERY,
+                                help="Entries between resumable progress checkpoints.")
+    args = parser.parse_args(argv)
+    if args.locale or args.org:
+        MOOD_TASKS.configure(args.locale, args.org)
+
+    if args.command == "org-stats":
+        show_org_stats(ShardRouter())
+        return
+    if args.command == "report" and args.all_users:
+        router, since, until = ShardRouter(), *ReportPipeline.period(args.days, args.end)
+        for user in router.users():
+            pipeline = ReportPipeline(router.logger_for(user))
+            pipeline.generate(since, until, args.formats)
+            print(f"{COLORS['success']}📰 {user}: rebuilt {len(pipeline.last_run['built'])} of {len(REPORT_SECTIONS)} sections "
+                  f"-> '{pipeline.folder}'{COLORS['reset']}")
+        return
+    if args.command == "convert": # Works on any file, so no MoodLogger
+        binary = is_binary_log(args.source)
+        output = args.output or os.path.splitext(args.source)[0] + (".json" if binary else BINARY_LOG_EXTENSION)
+        if os.path.abspath(output) == os.path.abspath(args.source):
+            parser.error("the output must be a different file than the source")
+        started = time.perf_counter()
+        count = convert_log(args.source, output)
+        print(f"{COLORS['success']}💾 Converted {count} entries to {'JSON' if binary else 'binary'} in "
+              f"'{output}' ({os.path.getsize(args.source):,} -> {os.path.getsize(output):,} bytes, "
+              f"{time.perf_counter() - started:.1f}s).{COLORS['reset']}")
+        return
+    if args.command == "migrate": # Before any MoodLogger, which would load the whole log to upgrade it
+        log = args.log or (os.path.join(ShardRouter().shard_dir(args.user), os.path.basename(LOG_FILE)) if args.user else LOG_FILE)
+        count = migrate_log(log, args.output, args.checkpoint_every)
+        print(f"{COLORS['success']}🧬 Upgraded {count} entries to schema v{SCHEMA_VERSION} in '{args.output or log}'.{COLORS['reset']}")
+        return
+
+    app = MoodMateApp(ShardRouter().logger_for(args.user) if args.user else None)
+    if os.environ.get(WRITE_BEHIND_ENV_VAR, "").strip() not in ("", "0"):
+        app.logger.enable_write_behind()
+    if args.command == "sync":
+        other = args.replica
+        if os.path.isdir(other):
+            other = os.path.join(other, os.path.basename(app.logger.log_file))
+        pulled, pushed = sync_replicas(app.logger, MoodLogger(other, export_folder=os.path.join(os.path.dirname(other), os.path.basename(EXPORT_FOLDER))))
+        print(f"{COLORS['success']}🔄 Sync complete: {pulled} change(s) received, {pushed} change(s) sent.{COLORS['reset']}")
+    elif args.command == "query":
+        since = int(time.time()) - args.days * SECONDS_PER_DAY if args.days else None
+        for entry in app.logger.query(args.mood, since, completed=args.completed, has_note=args.has_note,
+                                      text=args.text, tags=args.tag, sort=args.sort, limit=args.limit):
+            print(json.dumps(entry))
+    elif args.command == "stats":
+        app.show_stats(internal=args.internal, workers=args.workers)
+    elif args.command == "feed":
+        try:
+            if args.socket:
+                with FeedBroadcaster(app.logger, args.socket):
+                    print(f"{COLORS['success']}📡 Broadcasting changes on '{args.socket}' (Ctrl+C to stop){COLORS['reset']}")
+                    threading.Event().wait()
+            events = app.logger.follow(args.since) if args.follow else app.logger.feed(args.since)
+            for event in events:
+                print(json.dumps(event), flush=True)
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "tag-notes":
+        started = time.perf_counter()
+        count = app.logger.tag_all_notes(args.workers)
+        print(f"{COLORS['success']}🏷️ Tagged {count} new distinct notes in {time.perf_counter() - started:.1f}s.{COLORS['reset']}")
+        insights = app.logger.note_insights()
+        if insights["tagged"]:
+            print(MoodAnalyzer.describe_insights(insights))
+    elif args.command == "dashboard":
+        if args.pomodoro:
+            app.timer.start(*args.pomodoro)
+        try:
+            MoodDashboard(app.logger, app.timer, refresh=args.refresh).run()
+        except KeyboardInterrupt:
+            print(f"\n{COLORS['warning']}👋 Dashboard closed.{COLORS['reset']}")
+    elif args.command == "report":
+        pipeline = ReportPipeline(app.logger)
+        for path in pipeline.generate(*ReportPipeline.period(args.days, args.end), args.formats):
+            print(f"{COLORS['success']}📰 Report written to '{path}'{COLORS['reset']}")
+        print(f"Rebuilt: {', '.join(pipeline.last_run['built']) or 'nothing'} | "
+              f"Reused: {', '.join(pipeline.last_run['reused']) or 'nothing'}")
+    elif args.command == "compact":
+        result = app.logger.compact(args.raw_days, args.daily_days, keep_notes=not args.no_notes)
+        print(f"{COLORS['success']}🗜️ Rolled up {result['rolled_up']} entries ({result['kept']} kept); "
+              f"{result['daily_rollups']} daily and {result['weekly_rollups']} weekly summaries.{COLORS['reset']}")
+    elif args.command in ("undo", "redo"):
+        records = app.logger.undo() if args.command == "undo" else app.logger.redo()
+        if records:
+            print(f"{COLORS['success']}↩️ {'Undone' if args.command == 'undo' else 'Redone'}: {MoodMateApp._describe_change(records)}{COLORS['reset']}")
+        else:
+            print(f"{COLORS['menu']}Nothing to {args.command}.{COLORS['reset']}")
+    elif args.command == "history":
+        for record in app.logger.entry_history(args.entry_id):
+            print(json.dumps(record))
+    elif args.command == "summary":
+        since = int(time.time()) - args.days * SECONDS_PER_DAY if args.days else None
+        period = f"the last {args.days} days" if args.days else "your history"
+        print(MoodAnalyzer.render_summary(app.logger.aggregate(since=since, workers=args.workers),
+                                          title="All-Time" if not args.days else f"{args.days}-Day", period=period,
+                                          anomalies=app.logger.anomalies(since=since),
+                                          insights=app.logger.note_insights(since=since)))
+    else:
+        app.run()
+
+
 if __name__ == "__main__":
-    app = MoodMateApp()
-    app.run()
+    main()
@@ -0,0 +1,243 @@
+"""
+MoodMate benchmark suite.
+
+Generates a deterministic synthetic mood log and times the core MoodLogger and
+MoodAnalyzer operations against it. Results are written as JSON so runs from
+different commits can be compared side by side.
+
+Usage:
+    python moodmate_bench.py --sizes 1000,100000 --repeat 5 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+
+import moodmate
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module
+    resource = None
+
+SYNTHETIC_NOTES = [
+    "Slept badly, long day ahead.",
+    "Great chat with a friend over lunch.",
+    "Deadline pressure is building up again.",
+    "Went for a run and felt much better afterwards.",
+    "Could not focus at all this afternoon.",
+    "Finished the project draft, feeling proud!",
+    "Too many meetings, not enough breaks.",
+    "Quiet evening with a good book.",
+]
+
+
+# ======================
+# 🧪 Synthetic Data
+# ======================
+def iter_synthetic_entries(size: int, note_density: float = 0.3, completion_ratio: float = 0.5,
+                           days: int = 365, seed: int = 42) -> Iterator[Dict]:
+    """Yields `size` deterministic log entries spread evenly over the last `days` days."""
+    rng = random.Random(seed)
+    moods = list(moodmate.MOOD_TASKS.keys())
+    tasks_by_mood = {
+        mood: [task for tasks in moodmate.MOOD_TASKS[mood].values() for task in tasks]
+        for mood in moods
+    }
+    start = int(time.time()) - days * moodmate.SECONDS_PER_DAY
+    step = days * moodmate.SECONDS_PER_DAY / max(size, 1)
+
+    for i in range(size):
+        mood = moods[i % len(moods)] if rng.random() < 0.2 else rng.choice(moods)
+        ts = start + int(step * i)
+        tz = time.localtime(ts).tm_gmtoff
+        yield {
+            "id": f"{rng.getrandbits(128):032x}",
+            "timestamp": (moodmate.EPOCH + timedelta(seconds=ts + tz)).isoformat(),
+            "ts": ts,
+            "tz": tz,
+            "mood": mood,
+            "task": rng.choice(tasks_by_mood[mood]),
+            "note": rng.choice(SYNTHETIC_NOTES) if rng.random() < note_density else None,
+            "completed": rng.random() < completion_ratio,
+        }
+
+
+def write_synthetic_log(path: str, size: int, **options) -> None:
+    """Streams a synthetic log to disk, then converts it to the stored format MoodLogger uses."""
+    with open(path, 'w', newline='\n') as f:
+        f.write("[\n")
+        for i, entry in enumerate(iter_synthetic_entries(size, **options)):
+            f.write(json.dumps(entry) + (",\n" if i < size - 1 else "\n"))
+        f.write("]\n")
+    moodmate.migrate_log(path)
+
+
+# ======================
+# ⏱️ Measurement
+# ======================
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _peak_rss_kb() -> Optional[int]:
+    """Returns the peak resident set size of this process in KiB, if available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # macOS reports bytes
+
+
+def time_operation(func: Callable[[int], object], repeat: int, entries: Optional[int] = None) -> Dict:
+    """Calls `func(i)` `repeat` times and summarizes latency and throughput.
+
+    `entries` is how many entries one call processes; it is only given for operations that
+    read or write the whole log, since a per-entry rate means nothing for the others.
+    """
+    latencies = []
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for i in range(repeat):
+            started = time.perf_counter()
+            func(i)
+            latencies.append(time.perf_counter() - started)
+
+    total = sum(latencies)
+    latencies.sort()
+    return {
+        "calls": repeat,
+        "total_s": total,
+        "ops_per_s": repeat / total if total else None,
+        "entries_per_s": entries * repeat / total if total and entries is not None else None,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+
+
+def _load_binary(path: str) -> List[Dict]:
+    """Opens a binary log and decodes every entry, the counterpart of loading the JSON log."""
+    with moodmate.BinaryLog(path) as log:
+        return list(log)
+
+
+def run_size(size: int, repeat: int, note_density: float, completion_ratio: float, seed: int) -> Dict:
+    """Runs every benchmark against a fresh synthetic log of `size` entries."""
+    workdir = tempfile.mkdtemp(prefix="moodmate_bench_")
+    log_file = os.path.join(workdir, "moodmate_log.json")
+    backup_file = os.path.join(workdir, "moodmate_backup.json")
+    binary_file = os.path.join(workdir, "moodmate_log.mmlog")
+    saved_config = (moodmate.EXPORT_FOLDER, moodmate.MAX_LOG_ENTRIES)
+    # Keep the synthetic history intact instead of trimming it to the default cap
+    moodmate.EXPORT_FOLDER = os.path.join(workdir, "exports")
+    moodmate.MAX_LOG_ENTRIES = max(saved_config[1], size + repeat)
+
+    try:
+        started = time.perf_counter()
+        write_synthetic_log(log_file, size, note_density=note_density,
+                            completion_ratio=completion_ratio, seed=seed)
+        generate_s = time.perf_counter() - started
+
+        logger = moodmate.MoodLogger(log_file)
+        rng = random.Random(seed)
+        moods = list(moodmate.MOOD_TASKS.keys())
+        recent = logger.get_recent_moods(7)
+
+        # (name, call, whole log): only whole-log operations get an entries/s rate
+        benchmarks = [
+            ("get_recent_moods", lambda i: logger.get_recent_moods(7), False),
+            ("get_mood_stats", lambda i: logger.get_mood_stats(), True),
+            ("generate_weekly_summary", lambda i: moodmate.MoodAnalyzer.generate_weekly_summary(recent), False),
+            ("get_pending_tasks", lambda i: logger.get_pending_tasks(), False),
+            ("edit_entry", lambda i: logger.edit_entry(rng.randrange(size), completed=True), False),
+            ("log_mood", lambda i: logger.log_mood(moods[i % len(moods)], "Benchmark task", "bench note"), False),
+            ("delete_entry", lambda i: logger.delete_entry(rng.randrange(size)), False),
+            ("export_json", lambda i: logger.export_data("json"), True),
+            ("export_csv", lambda i: logger.export_data("csv"), True),
+            ("backup", lambda i: logger.backup(backup_file), True),
+            ("restore", lambda i: logger.restore(backup_file), True),
+            ("convert_binary", lambda i: moodmate.convert_log(log_file, binary_file), True),
+            ("load_binary", lambda i: _load_binary(binary_file), True),
+        ]
+
+        results = {}
+        for name, func, whole_log in benchmarks:
+            if size == 0 and name in ("edit_entry", "delete_entry"):
+                continue
+            results[name] = time_operation(func, repeat, size if whole_log else None)
+            print(f"  {name:<24} p50 {results[name]['p50_ms']:>10.2f} ms   "
+                  f"p99 {results[name]['p99_ms']:>10.2f} ms")
+
+        return {
+            "size": size,
+            "file_bytes": os.path.getsize(log_file),
+            "generate_s": generate_s,
+            "operations": results,
+        }
+    finally:
+        moodmate.EXPORT_FOLDER, moodmate.MAX_LOG_ENTRIES = saved_config
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _git_commit() -> Optional[str]:
+    """Returns the current git commit, so results can be compared across commits."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark MoodMate storage and analytics.")
+    parser.add_argument("--sizes", default="1000,10000",
+                        help="Comma-separated log sizes to test (1k to 10M entries).")
+    parser.add_argument("--repeat", type=int, default=5, help="Calls per operation.")
+    parser.add_argument("--note-density", type=float, default=0.3, help="Fraction of entries with a note.")
+    parser.add_argument("--completion-ratio", type=float, default=0.5, help="Fraction of completed tasks.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the synthetic data generator.")
+    parser.add_argument("--output", default="moodmate_bench.json", help="Where to write the JSON results.")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = {
+        "commit": _git_commit(),
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "repeat": args.repeat,
+            "note_density": args.note_density,
+            "completion_ratio": args.completion_ratio,
+            "seed": args.seed,
+        },
+        "runs": [],
+    }
+
+    for size in sizes:
+        print(f"{moodmate.COLORS['header']}--- {size:,} entries ---{moodmate.COLORS['reset']}")
+        report["runs"].append(run_size(size, args.repeat, args.note_density, args.completion_ratio, args.seed))
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n{moodmate.COLORS['success']}✅ Results written to '{args.output}'{moodmate.COLORS['reset']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
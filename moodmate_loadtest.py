@@ -0,0 +1,152 @@
+"""
+Load test for the MoodMate HTTP service.
+
+Opens a number of concurrent keep-alive connections to a running moodmate_server.py
+and fires a weighted mix of requests at it, then reports requests/sec and latency.
+
+Usage:
+    python moodmate_loadtest.py --url http://127.0.0.1:8765 --clients 50 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import moodmate
+
+DEFAULT_MIX = "log:2,quick-log:1,query:3,stats:2,summary:1"
+
+
+def _request_for(kind: str, rng: random.Random) -> Tuple[str, str, Optional[Dict]]:
+    """Builds (method, path, body) for one request of the given kind."""
+    mood = rng.choice(list(moodmate.MOOD_TASKS.keys()))
+    if kind == "log":
+        return "POST", "/log", {"mood": mood, "task": "Load test task", "note": "load test"}
+    if kind == "quick-log":
+        return "POST", "/quick-log", {"mood": mood}
+    if kind == "query":
+        return "GET", f"/query?days=7&mood={mood}&limit=20", None
+    if kind == "stats":
+        return "GET", "/stats", None
+    if kind == "summary":
+        return "GET", "/summary?days=7", None
+    raise ValueError(f"Unknown request kind: {kind}")
+
+
+async def _send(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str,
+                method: str, path: str, body: Optional[Dict], user: Optional[str] = None) -> int:
+    """Sends one request on a kept-alive connection and returns the status code."""
+    payload = json.dumps(body).encode() if body is not None else b""
+    user_header = f"X-MoodMate-User: {user}\r\n" if user else ""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"{user_header}Content-Length: {len(payload)}\r\n\r\n".encode() + payload
+    )
+    await writer.drain()
+
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    length = 0
+    for line in lines[1:]:
+        if line.lower().startswith("content-length:"):
+            length = int(line.split(":", 1)[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(client_id: int, host: str, port: int, mix: List[str], deadline: float,
+                  latencies: List[float], errors: Dict[str, int], users: int = 0) -> None:
+    """Keeps one connection busy with requests until the deadline."""
+    rng = random.Random(client_id)
+    user = f"loadtest-user-{client_id % users}" if users else None
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            method, path, body = _request_for(rng.choice(mix), rng)
+            started = time.perf_counter()
+            try:
+                status = await _send(reader, writer, host, method, path, body, user)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                errors["connection"] = errors.get("connection", 0) + 1
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(url: str, clients: int, duration: float, mix: List[str], users: int = 0) -> Dict:
+    """Runs `clients` concurrent connections for `duration` seconds and summarizes the results.
+
+    With `users` > 0 the clients are spread over that many users (for a sharded server).
+    """
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        _client(i, host, port, mix, deadline, latencies, errors, users) for i in range(clients)
+    ))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    percentile = lambda pct: latencies[min(len(latencies) - 1, int(pct / 100 * len(latencies)))] * 1000 if latencies else 0.0
+    return {
+        "clients": clients,
+        "users": users,
+        "duration_s": elapsed,
+        "requests": len(latencies),
+        "requests_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(50),
+        "p99_ms": percentile(99),
+        "errors": errors,
+    }
+
+
+def _parse_mix(spec: str) -> List[str]:
+    """Expands "log:2,stats:1" into a weighted list of request kinds."""
+    mix = []
+    for item in spec.split(","):
+        kind, _, weight = item.strip().partition(":")
+        mix.extend([kind] * int(weight or 1))
+    return mix
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test a running MoodMate HTTP service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent keep-alive connections.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run.")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted request kinds, e.g. 'log:2,stats:1'.")
+    parser.add_argument("--users", type=int, default=0,
+                        help="Spread clients over this many users (server started with --shard-root).")
+    parser.add_argument("--output", help="Optional path for the JSON results.")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run_load(args.url, args.clients, args.duration, _parse_mix(args.mix), args.users))
+    print(f"{moodmate.COLORS['header']}--- MoodMate load test ---{moodmate.COLORS['reset']}")
+    print(f"Clients:       {results['clients']}")
+    print(f"Requests:      {results['requests']} in {results['duration_s']:.1f}s")
+    print(f"Throughput:    {results['requests_per_s']:.1f} req/s")
+    print(f"Latency:       p50 {results['p50_ms']:.2f} ms | p99 {results['p99_ms']:.2f} ms")
+    print(f"Errors:        {results['errors'] or 'none'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,473 @@
+"""
+MoodMate HTTP/JSON service.
+
+Exposes MoodLogger over a small asyncio HTTP/1.1 server (stdlib only) so a whole
+team can share one MoodMate instance. Storage calls run on a bounded thread pool,
+log requests arriving close together are written in one batch, and connections
+are kept alive between requests.
+
+Usage:
+    python moodmate_server.py --host 127.0.0.1 --port 8765 --workers 4
+    python moodmate_server.py --shard-root moodmate_shards   # one shard per user
+
+With --shard-root every request names its user through the `X-MoodMate-User`
+header or a `user` query parameter, and is served from that user's shard.
+
+Endpoints:
+    GET  /health                          -> {"status": "ok"}
+    POST /log        {"mood", "task", "note"?}
+    POST /quick-log  {"mood"}
+    GET  /query      ?days=&mood=&completed=&has_note=&text=&tag=&min_sentiment=&max_sentiment=&sort=&limit=
+    GET  /stats
+    GET  /summary    ?days=7                (includes trend alerts for the period)
+    GET  /trends                          -> mood baselines and trend alerts
+    POST /complete   {"id"} | {"ids": [...]} | {"all": true}
+    POST /export     {"format": "json" | "csv" | "mmlog"}
+    POST /compact    {"raw_days"?, "daily_days"?}
+    POST /report     {"days"?, "formats"?}   -> report files for the last N whole days
+    GET  /changes    ?since=0&limit=1000&wait=  (wait: seconds to long-poll when nothing is new)
+    GET  /org/stats                       (sharded mode only)
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from random import choice
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import moodmate
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 15  # Seconds an idle connection is kept open
+
+REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """An error that maps directly onto an HTTP status code."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    """Serializes the dates used as `by_day` keys and similar values."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class MoodMateServer:
+    """Serves MoodLogger over HTTP with pooled storage I/O and batched writes."""
+
+    def __init__(self, logger: Optional[moodmate.MoodLogger] = None, workers: int = 4,
+                 batch_size: int = 64, batch_window_ms: float = 5.0,
+                 router: Optional[moodmate.ShardRouter] = None,
+                 compact_every_hours: float = moodmate.COMPACT_INTERVAL_HOURS,
+                 report_every_hours: float = 0, report_days: int = 7):
+        self.logger = logger
+        self.router = router
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="moodmate-io")
+        self.batch_size = batch_size
+        self.batch_window = batch_window_ms / 1000
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self.compact_every = compact_every_hours * 3600
+        self._compactor: Optional[asyncio.Task] = None
+        self.report_every = report_every_hours * 3600
+        self.report_days = report_days
+        self._reporter: Optional[asyncio.Task] = None
+        self.routes = {
+            ("GET", "/health"): self.handle_health,
+            ("POST", "/log"): self.handle_log,
+            ("POST", "/quick-log"): self.handle_quick_log,
+            ("GET", "/query"): self.handle_query,
+            ("GET", "/stats"): self.handle_stats,
+            ("GET", "/summary"): self.handle_summary,
+            ("GET", "/trends"): self.handle_trends,
+            ("POST", "/complete"): self.handle_complete,
+            ("POST", "/export"): self.handle_export,
+            ("POST", "/compact"): self.handle_compact,
+            ("POST", "/report"): self.handle_report,
+            ("GET", "/changes"): self.handle_changes,
+            ("GET", "/org/stats"): self.handle_org_stats,
+        }
+
+    # ----- Plumbing -----
+
+    async def _io(self, func, *args):
+        """Runs a blocking storage call on the bounded thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _batch_writer(self) -> None:
+        """Collects queued entries for up to `batch_window` and stores them with one write."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._write_queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._write_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # One write per shard; shards are independent files, so they are written in parallel
+            by_logger: Dict[int, List] = {}
+            for item in batch:
+                by_logger.setdefault(id(item[0]), []).append(item)
+            await asyncio.gather(*(self._write_batch(items) for items in by_logger.values()))
+
+    async def _write_batch(self, items: List) -> None:
+        logger = items[0][0]
+        try:
+            await self._io(logger.append_entries, [entry for _, entry, _ in items])
+        except Exception as e:
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for _, entry, future in items:
+                if not future.done():
+                    future.set_result(entry)
+
+    async def _compact_periodically(self) -> None:
+        """Applies the retention policy to every log now and then, one log at a time."""
+        while True:
+            loggers = [self.logger] if self.router is None else [
+                self.router.logger_for(user) for user in self.router.users()
+            ]
+            for logger in loggers:
+                try:
+                    await self._io(logger.compact_if_due, self.compact_every / 3600)
+                except Exception as e:
+                    print(f"{moodmate.COLORS['warning']}⚠️ Compaction of '{logger.log_file}' failed: {e}{moodmate.COLORS['reset']}")
+            await asyncio.sleep(min(self.compact_every, 3600))
+
+    async def _report_periodically(self) -> None:
+        """Rewrites every log's report for the last `report_days` days, one log at a time."""
+        while True:
+            loggers = [self.logger] if self.router is None else [
+                self.router.logger_for(user) for user in self.router.users()
+            ]
+            since, until = moodmate.ReportPipeline.period(self.report_days)
+            for logger in loggers:
+                try:
+                    await self._io(moodmate.ReportPipeline(logger).generate, since, until)
+                except Exception as e:
+                    print(f"{moodmate.COLORS['warning']}⚠️ Report for '{logger.log_file}' failed: {e}{moodmate.COLORS['reset']}")
+            await asyncio.sleep(self.report_every)
+
+    async def _store(self, logger: moodmate.MoodLogger, entry: Dict) -> Dict:
+        """Queues an entry for the batch writer and waits until it is on disk."""
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((logger, entry, future))
+        return await future
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict, bytes]]:
+        """Reads one request; returns None when the client closed the connection."""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, "Request headers too large")
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            raise HTTPError(400, "Malformed Content-Length header")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    def _response(status: int, payload, keep_alive: bool) -> bytes:
+        body = json.dumps(payload, default=_json_default).encode()
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        return head.encode() + body
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves requests on one connection until the client closes it or stops keeping it alive."""
+        try:
+            while True:
+                keep_alive = True
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, target, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    status, payload = await self._dispatch(method, target, headers, body)
+                except HTTPError as e:
+                    status, payload, keep_alive = e.status, {"error": str(e)}, False
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _logger_for(self, headers: Dict, params: Dict) -> Optional[moodmate.MoodLogger]:
+        """Picks the user's shard in sharded mode, or the single shared logger."""
+        if self.router is None:
+            return self.logger
+        user = headers.get("x-moodmate-user") or params.get("user")
+        if not user:
+            return None
+        try:
+            return self.router.logger_for(user)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+    async def _dispatch(self, method: str, target: str, headers: Dict, body: bytes) -> Tuple[int, object]:
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in self.routes):
+                raise HTTPError(405, f"{method} is not allowed on {url.path}")
+            raise HTTPError(404, f"No endpoint at {url.path}")
+
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+
+        logger = self._logger_for(headers, params)
+        if logger is None and handler not in (self.handle_health, self.handle_org_stats):
+            raise HTTPError(400, "Name the user with an X-MoodMate-User header or a 'user' parameter")
+        return await handler(logger, params, data)
+
+    # ----- Endpoints -----
+
+    async def handle_health(self, logger: moodmate.MoodLogger, params: Dict, data: Dict):
+        return 200, {"status": "ok"}
+
+    async def handle_log(self, logger: moodmate.MoodLogger, params: Dict, data: Dict):
+        mood, task, note = data.get("mood"), data.get("task"), data.get("note")
+        if not isinstance(mood, str) or mood not in moodmate.MOOD_TASKS:
+            raise HTTPError(400, f"Unknown mood: {mood!r}")
+        if not isinstance(task, str) or not task.strip():
+            raise HTTPError(400, "A non-empty 'task' is required")
+        if note is not None and not isinstance(note, str):
+            raise HTTPError(400, "'note' must be a string or null")
+        note = note or None
+        entry = await self._store(logger, moodmate.MoodLogger.build_entry(mood, task.strip(), note))
+        return 201, entry
+
+    async def handle_quick_log(self, logger: moodmate.MoodLogger, params: Dict, data: Dict):
+        mood = data.get("mood")
+        tasks = moodmate.tasks_for_mood(mood) if isinstance(mood, str) else []
+        if not tasks:
+            raise HTTPError(400, f"Unknown mood: {mood!r}")
+        entry = await self._store(logger, moodmate.MoodLogger.build_entry(mood, choice(tasks)))
+        return 201, entry
+
+    async def handle_query(self, logger: moodmate.MoodLogger, params: Dict, data: Dict):
+        try:
+            days = int(params["days"]) if "days" in params else None
+            limit = int(params["limit"]) if "limit" in params else None
+        except ValueError:
+            raise HTTPError(400, "'days' and 'limit' must be integers")
+        try:
+            bounds = {key: float(params[key]) for key in ("min_sentiment", "max_sentiment") if key in params}
+        except ValueError:
+            raise HTTPError(400, "'min_sentiment' and 'max_sentiment' must be numbers")
+        sort = params.get("sort")
+        if sort is not None and sort not in moodmate.QUERY_SORTS:
+            raise HTTPError(400, f"'sort' must be one of {', '.join(moodmate.QUERY_SORTS)}")
+
+        flag = lambda key: params[key].lower() in ("1", "true", "yes") if key in params else None
+        filters = dict(
+            moods=params["mood"].split(",") if "mood" in params else None,
+            since=int(time.time()) - days * moodmate.SECONDS_PER_DAY if days is not None else None,
+            completed=flag("completed"), has_note=flag("has_note"), text=params.get("text"),
+            tags=params["tag"].split(",") if "tag" in params else None, **bounds,
+        )
+        if sort is None: # The newest `limit` matches, listed oldest first
+            logs = (await self._io(lambda: logger.query(**filters, sort="-log", limit=limit)))[::-1]
+        else:
+            logs = await self._io(lambda: logger.query(**filters, sort=sort, limit=limit))
+        return 200, {"count": len(logs), "entries": logs}
+
+    async def handle_stats(self, logger: moodmate.MoodLogger, params: Dict, data: Dict):
+        stats = await self._io(logger.get_mood_stats)
+        stats["notes"] = await self._io(logger.note_insights)
+        stats["by_day"] = {day.isoformat(): count for day, count in sorted(stats["by_day"].items())}
+        stats["transitions"] = {f"{before}->{after}": count for (before, after), count in stats["transitions"].items()}
+        return 200, stats
+
+    async def handle_summary(self, logger: moodmate.MoodLogger, params: Dict, data: Dict):
+        try:
+            days = int(params.get("days", 7))
+        except ValueError:
+            raise HTTPError(400, "'days' must be an integer")
+        since = int(time.time()) - days * moodmate.SECONDS_PER_DAY
+        partial = await self._io(logger.aggregate, since)
+        anomalies = await self._io(logger.anomalies, since)
+        summary = moodmate.MoodAnalyzer.render_summary(partial, period=f"the last {days} days",
+                                                       anomalies=anomalies, color=False)
+        return 200, {"days": days, "summary": summary, "anomalies": anomalies}
+
+    async def handle_trends(self, logger: moodmate.MoodLogger, params: Dict, data: Dict):
+        return 200, await self._io(logger.trends)
+
+    async def handle_complete(self, logger: moodmate.MoodLogger, params: Dict, data: Dict):
+        if data.get("all"):
+            updated = await self._io(logger.mark_all_pending_as_completed)
+        else:
+            ids = data.get("ids") or ([data["id"]] if "id" in data else [])
+            if not isinstance(ids, list) or not ids or not all(isinstance(entry_id, str) for entry_id in ids):
+                raise HTTPError(400, "Provide 'id', a list of 'ids', or 'all': true")
+            updated = await self._io(logger.complete_tasks, ids)
+        return 200, {"completed": updated}
+
+    async def handle_org_stats(self, logger: moodmate.MoodLogger, params: Dict, data: Dict):
+        if self.router is None:
+            raise HTTPError(404, "Organisation stats need the server to run with --shard-root")
+        totals = await self._io(self.router.org_aggregates)
+        totals["distribution"] = self.router.org_mood_distribution(totals)
+        return 200, totals
+
+    async def handle_export(self, logger: moodmate.MoodLogger, params: Dict, data: Dict):
+        export_format = data.get("format", "json")
+        if export_format not in ("json", "csv", "mmlog"):
+            raise HTTPError(400, "'format' must be 'json', 'csv' or 'mmlog'")
+        try:
+            path = await self._io(logger.export_data, export_format)
+        except Exception as e:
+            raise HTTPError(400, str(e))
+        return 200, {"path": path}
+
+    async def handle_compact(self, logger: moodmate.MoodLogger, params: Dict, data: Dict):
+        policy = {key: data[key] for key in ("raw_days", "daily_days") if key in data}
+        if not all(value is None or (isinstance(value, int) and not isinstance(value, bool)) for value in policy.values()):
+            raise HTTPError(400, "'raw_days' and 'daily_days' must be integers or null")
+        return 200, await self._io(lambda: logger.compact(**policy))
+
+    async def handle_report(self, logger: moodmate.MoodLogger, params: Dict, data: Dict):
+        days = data.get("days", 7)
+        formats = data.get("formats", list(moodmate.REPORT_FORMATS))
+        if not isinstance(days, int) or days < 1:
+            raise HTTPError(400, "'days' must be a positive integer")
+        if not isinstance(formats, list) or not set(formats) <= set(moodmate.REPORT_FORMATS):
+            raise HTTPError(400, f"'formats' must be a list out of {', '.join(moodmate.REPORT_FORMATS)}")
+        pipeline = moodmate.ReportPipeline(logger)
+        paths = await self._io(pipeline.generate, *moodmate.ReportPipeline.period(days), formats)
+        return 200, {"paths": paths, **pipeline.last_run}
+
+    async def handle_changes(self, logger: moodmate.MoodLogger, params: Dict, data: Dict):
+        try:
+            since = int(params.get("since", 0))
+            limit = int(params.get("limit", 1000))
+            wait = min(float(params.get("wait", 0)), KEEP_ALIVE_TIMEOUT)
+        except ValueError:
+            raise HTTPError(400, "'since', 'limit' and 'wait' must be numbers")
+        read = lambda: list(islice(logger.feed(since), max(limit, 0)))
+        watcher = moodmate.ChangeWatcher(logger.changes_file) # Marked before reading, so no change slips in between
+        try:
+            events = await self._io(read)
+            deadline = time.monotonic() + wait
+            while not events and time.monotonic() < deadline: # The change log is only read on the thread pool
+                if await watcher.wait_async(deadline - time.monotonic()):
+                    events = await self._io(read)
+        finally:
+            watcher.close()
+        return 200, {"events": events, "seq": events[-1]["seq"] if events else since}
+
+    # ----- Lifecycle -----
+
+    async def serve(self, host: str, port: int) -> None:
+        """Starts listening and serves until cancelled."""
+        self._write_queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batch_writer())
+        if self.compact_every > 0:
+            self._compactor = asyncio.create_task(self._compact_periodically())
+        if self.report_every > 0:
+            self._reporter = asyncio.create_task(self._report_periodically())
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"{moodmate.COLORS['success']}✅ MoodMate service listening on {addresses}{moodmate.COLORS['reset']}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._batcher.cancel()
+            for task in (self._compactor, self._reporter):
+                if task is not None:
+                    task.cancel()
+            self.executor.shutdown(wait=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run MoodMate as a local HTTP/JSON service.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: localhost only).")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--log-file", default=moodmate.LOG_FILE)
+    parser.add_argument("--shard-root", help="Serve one shard per user from this directory.")
+    parser.add_argument("--workers", type=int, default=4, help="Threads used for storage I/O.")
+    parser.add_argument("--batch-size", type=int, default=64, help="Most log entries written together.")
+    parser.add_argument("--batch-window-ms", type=float, default=5.0,
+                        help="How long the writer waits to fill a batch.")
+    parser.add_argument("--compact-every-hours", type=float, default=moodmate.COMPACT_INTERVAL_HOURS,
+                        help="Roll up old history this often (0 turns scheduled compaction off).")
+    parser.add_argument("--report-every-hours", type=float, default=0,
+                        help="Write every user's report files this often (default 0: only on POST /report).")
+    parser.add_argument("--report-days", type=int, default=7, help="Whole days covered by scheduled reports.")
+    args = parser.parse_args(argv)
+
+    if args.shard_root:
+        logger, router = None, moodmate.ShardRouter(args.shard_root)
+    else:
+        logger, router = moodmate.MoodLogger(args.log_file), None
+    server = MoodMateServer(logger, workers=args.workers, batch_size=args.batch_size,
+                            batch_window_ms=args.batch_window_ms, router=router,
+                            compact_every_hours=args.compact_every_hours,
+                            report_every_hours=args.report_every_hours, report_days=args.report_days)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"\n{moodmate.COLORS['warning']}👋 MoodMate service stopped.{moodmate.COLORS['reset']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import moodmate  # noqa: E402
+
+
+@pytest.fixture
+def make_logger(tmp_path, monkeypatch):
+    """Builds MoodLoggers on files in a fresh temp dir, with the process-wide caches reset."""
+    monkeypatch.setattr(moodmate, "EXPORT_FOLDER", str(tmp_path / "exports"))
+    moodmate.invalidate_log_cache()
+
+    def make(name: str = "moodmate_log.json") -> moodmate.MoodLogger:
+        log_file = tmp_path / name
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        return moodmate.MoodLogger(str(log_file), backup_file=str(log_file.parent / "backup.json"),
+                                   export_folder=str(log_file.parent / "exports"))
+
+    yield make
+    moodmate.flush_write_behind()
+    moodmate.invalidate_log_cache()
+
+
+def log_entries(logger: moodmate.MoodLogger, *specs) -> None:
+    """Logs (mood, task, note) triples in order."""
+    for mood, task, note in specs:
+        logger.log_mood(mood, task, note)
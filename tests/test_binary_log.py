@@ -0,0 +1,47 @@
+import json
+
+import moodmate
+from conftest import log_entries
+
+
+def _rows(entries):
+    return [(entry["task"], entry["note"]) for entry in entries]
+
+
+def test_binary_round_trip_is_exact(make_logger, tmp_path):
+    logger = make_logger()
+    log_entries(logger, ("happy", "t1", "ünïcode ✨"), ("sad", "custom task", ""), ("stressed", "t3", None))
+    logger.complete_task(logger.get_all_logs()[0]["id"])
+    expected = [dict(entry) for entry in logger.get_all_logs()]
+
+    binary, back = str(tmp_path / "log.mmlog"), str(tmp_path / "back.json")
+    assert moodmate.convert_log(logger.log_file, binary) == 3
+    with moodmate.BinaryLog(binary) as log:
+        assert list(log) == expected
+        assert log[-1] == expected[-1]
+    assert moodmate.convert_log(binary, back) == 3
+    with open(back) as f:
+        stored = json.load(f)
+    assert [moodmate._strip_checksum(entry) for entry in stored[1:]] == expected
+
+
+def test_conversion_applies_history_overlay(make_logger, tmp_path):
+    logger = make_logger()
+    log_entries(logger, ("happy", "t1", None), ("sad", "t2", None))
+    logger.edit_entry(0, note="EDITED")
+    logger.delete_entry(1)
+    assert moodmate._history_overlay(logger.log_file) # Still held in the history, not the log
+    expected = _rows(logger.get_all_logs())
+    assert expected == [("t1", "EDITED")]
+
+    binary = str(tmp_path / "log.mmlog")
+    assert moodmate.convert_log(logger.log_file, binary) == 1
+    with moodmate.BinaryLog(binary) as log:
+        assert _rows(log) == expected
+
+    assert _rows(moodmate.scan_records(logger.log_file)) == expected
+    assert moodmate.map_reduce_stats(logger.log_file, workers=1)["total"] == 1
+
+    migrated = str(tmp_path / "migrated.json")
+    assert moodmate.migrate_log(logger.log_file, migrated) == 1
+    assert _rows(make_logger("migrated.json").get_all_logs()) == expected
@@ -0,0 +1,88 @@
+import glob
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import moodmate
+
+
+@pytest.fixture
+def catalogs(tmp_path, monkeypatch):
+    """A catalog directory with the shipped en.json and an organization overlay; compiled into tmp_path."""
+    monkeypatch.setattr(moodmate, "CATALOG_CACHE_DIR", str(tmp_path / "cache"))
+    directory = tmp_path / "catalog"
+    (directory / "orgs" / "acme").mkdir(parents=True)
+    with open(os.path.join(moodmate.CATALOG_DIR, "en.json"), encoding="utf-8") as f:
+        (directory / "en.json").write_text(f.read(), encoding="utf-8")
+    (directory / "orgs" / "acme" / "en.json").write_text(json.dumps({
+        "emoji": {"focused": "🎯"},
+        "tasks": {"happy": {"team": ["Thank a teammate"]}, "focused": {"deep_work": ["Block two hours"]}},
+    }), encoding="utf-8")
+    return directory
+
+
+def _shipped():
+    with open(os.path.join(moodmate.CATALOG_DIR, "en.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_the_shipped_catalog_backs_the_module_tables():
+    shipped = _shipped()
+    assert set(moodmate.MOOD_TASKS) == set(shipped["tasks"])
+    assert moodmate.MOOD_TASKS["tired"] == shipped["tasks"]["tired"]
+    assert moodmate.tasks_for_mood("happy") == [task for tasks in shipped["tasks"]["happy"].values() for task in tasks]
+    assert moodmate.EMOJI_MAP["happy"] == shipped["emoji"]["happy"]
+    assert moodmate.ENCOURAGING_REACTIONS["sad"] == shipped["reactions"]["sad"]
+
+
+def test_an_org_overlay_adds_moods_and_categories(catalogs):
+    catalog = moodmate.TaskCatalog("en", "acme", directory=str(catalogs))
+    assert catalog["happy"]["team"] == ["Thank a teammate"]
+    assert catalog["happy"]["energize"] == _shipped()["tasks"]["happy"]["energize"] # Untouched categories stay
+    assert catalog.all_tasks("focused") == ["Block two hours"]
+    assert "focused" in catalog and "serene" not in catalog
+    with pytest.raises(KeyError):
+        catalog["serene"]
+    assert catalog.all_tasks("serene") == []
+
+    plain = moodmate.TaskCatalog("de", directory=str(catalogs)) # Unknown locale: English
+    assert "team" not in plain["happy"] and "focused" not in plain
+
+
+def test_each_combination_of_sources_is_compiled_once(catalogs, tmp_path):
+    catalog = moodmate.TaskCatalog("en", "acme", directory=str(catalogs))
+    assert len(catalog) == len(_shipped()["tasks"]) + 1
+    compiled = glob.glob(str(tmp_path / "cache" / "catalog-*"))
+    assert len(compiled) == 1 and compiled[0].endswith(".jsonl")
+    with open(compiled[0], encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f] # JSON lines: the index, then one line per mood
+    assert lines[0]["format"] == moodmate.CATALOG_FORMAT and len(lines) == len(catalog) + 1
+    stamp = os.stat(compiled[0]).st_mtime_ns
+
+    again = moodmate.TaskCatalog("en", "acme", directory=str(catalogs))
+    assert again["focused"] == {"deep_work": ["Block two hours"]}
+    assert os.stat(compiled[0]).st_mtime_ns == stamp # Reused, not recompiled
+
+    (catalogs / "orgs" / "acme" / "en.json").write_text(json.dumps({"tasks": {"sad": {"team": ["Ask for help"]}}}))
+    changed = moodmate.TaskCatalog("en", "acme", directory=str(catalogs))
+    assert changed["sad"]["team"] == ["Ask for help"] and "focused" not in changed
+    assert len(glob.glob(str(tmp_path / "cache" / "catalog-*"))) == 2
+
+
+def test_an_unwritable_cache_keeps_the_catalog_in_memory(catalogs, tmp_path, monkeypatch):
+    (tmp_path / "not-a-dir").write_text("")
+    monkeypatch.setattr(moodmate, "CATALOG_CACHE_DIR", str(tmp_path / "not-a-dir" / "cache"))
+    catalog = moodmate.TaskCatalog("en", "acme", directory=str(catalogs))
+    assert catalog.all_tasks("focused") == ["Block two hours"]
+    assert catalog["tired"] == _shipped()["tasks"]["tired"]
+
+
+def test_threads_share_one_copy_of_each_mood(catalogs):
+    catalog = moodmate.TaskCatalog("en", "acme", directory=str(catalogs))
+    with ThreadPoolExecutor(8) as pool:
+        tasks = list(pool.map(lambda _: catalog["happy"], range(64)))
+        flat = list(pool.map(lambda _: catalog.all_tasks("happy"), range(64)))
+    assert all(found is tasks[0] for found in tasks) and all(found is flat[0] for found in flat)
+    assert "Thank a teammate" in flat[0]
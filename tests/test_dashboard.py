@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+import moodmate
+from conftest import log_entries
+
+DAY = moodmate.SECONDS_PER_DAY
+
+
+def _days_ago(days, mood, task):
+    entry = moodmate.MoodLogger.build_entry(mood, task)
+    entry["ts"] -= days * DAY
+    entry["tz"] = time.localtime(entry["ts"]).tm_gmtoff
+    return entry
+
+
+@pytest.fixture
+def logger(make_logger):
+    logger = make_logger()
+    logger.append_entries([_days_ago(20, "sad", "Journal"), _days_ago(3, "tired", "Take a power nap")])
+    log_entries(logger, ("happy", "Dance it out", None), ("happy", "Sing along", None))
+    logger.complete_task(logger.get_all_logs()[-1]["id"])
+    return logger
+
+
+def test_the_snapshot_counts_today_the_week_and_pending_tasks(logger):
+    dashboard = moodmate.MoodDashboard(logger)
+    assert (dashboard.day["total"], dashboard.day["completed"]) == (2, 1)
+    assert (dashboard.week["total"], dict(dashboard.week["by_mood"])) == (3, {"happy": 2, "tired": 1})
+    assert len(dashboard.pending) == 3 # The old entry is still pending
+    frame = dashboard.tick()
+    assert "Pending tasks:" in frame and "Happy" in frame
+    dashboard.watcher.close()
+
+
+def test_changes_are_applied_from_the_feed_without_a_new_snapshot(logger, monkeypatch):
+    dashboard = moodmate.MoodDashboard(logger)
+    monkeypatch.setattr(logger, "get_recent_moods", lambda days=7: pytest.fail("took a new snapshot"))
+    log_entries(logger, ("stressed", "Go for a walk", None))
+    logger.complete_task(logger.get_all_logs()[1]["id"]) # "Take a power nap"
+    logger.delete_entry(3) # "Sing along"
+    dashboard.tick()
+
+    assert (dashboard.day["total"], dashboard.day["completed"]) == (2, 0)
+    assert dict(dashboard.week["by_mood"]) == {"happy": 1, "tired": 1, "stressed": 1}
+    assert dashboard.week["completed"] == 1
+    assert len(dashboard.pending) == 3
+    dashboard.watcher.close()
+
+
+def test_a_frame_applies_at_most_max_events(logger):
+    dashboard = moodmate.MoodDashboard(logger, max_events=2)
+    log_entries(logger, *[("motivated", f"Step {i}", None) for i in range(5)])
+    dashboard.tick()
+    assert dashboard.day["total"] == 4 and dashboard.backlog
+    dashboard.tick()
+    dashboard.tick()
+    assert dashboard.day["total"] == 7 and not dashboard.backlog
+    dashboard.watcher.close()
+
+
+def test_the_pomodoro_schedule_is_shown_without_blocking():
+    timer = moodmate.PomodoroTimer()
+    assert timer.status() is None
+    timer.start(25, 5, 2)
+    status = timer.status()
+    assert (status["phase"], status["cycle"], status["cycles"]) == ("FOCUS", 1, 2)
+    later = timer.status(now=time.time() + 26 * 60)
+    assert (later["phase"], later["cycle"]) == ("BREAK", 1)
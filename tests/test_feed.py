@@ -0,0 +1,112 @@
+import json
+import socket
+import threading
+import time
+
+import moodmate
+from conftest import log_entries
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _connect(path):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(5)
+    client.connect(path)
+    return client, client.makefile('r', encoding='utf-8')
+
+
+def test_the_feed_lists_every_change_as_an_event(make_logger):
+    logger = make_logger()
+    log_entries(logger, ("happy", "Dance it out", None), ("sad", "Call a friend", None))
+    first, second = logger.get_all_logs()
+    logger.edit_entry(0, note="with music")
+    logger.delete_entry(1)
+
+    events = list(logger.feed())
+    assert [(event["type"], event["id"]) for event in events] == [
+        ("new", first["id"]), ("new", second["id"]), ("edit", first["id"]), ("delete", second["id"]),
+    ]
+    assert events[2]["fields"]["note"] == "with music"
+    assert logger.feed_head() == events[-1]["seq"]
+    seqs = [event["seq"] for event in events]
+    assert [event["seq"] for event in logger.feed(seqs[0], seqs[2])] == seqs[1:3]
+
+
+def test_follow_wakes_up_for_new_events(make_logger):
+    logger = make_logger()
+    log_entries(logger, ("happy", "Dance it out", None))
+    head = logger.feed_head()
+    writer = threading.Timer(0.1, lambda: log_entries(logger, ("motivated", "Start the project", None)))
+    writer.start()
+    try:
+        followed = next(logger.follow(timeout=5, poll_interval=0.05))
+    finally:
+        writer.join()
+    assert (followed["type"], followed["fields"]["task"]) == ("new", "Start the project")
+    assert followed["seq"] > head
+    assert list(logger.follow(timeout=0.1, poll_interval=0.05)) == [] # Nothing new: ends after the timeout
+
+
+def test_the_broadcaster_pushes_events_to_every_subscriber(make_logger, tmp_path):
+    logger = make_logger()
+    log_entries(logger, ("happy", "Dance it out", None))
+    with moodmate.FeedBroadcaster(logger, str(tmp_path / "feed.sock"), poll_interval=0.05) as broadcaster:
+        clients = [_connect(broadcaster.socket_path) for _ in range(2)]
+        greetings = [json.loads(stream.readline()) for _, stream in clients]
+        assert greetings == [{"seq": logger.feed_head()}] * 2
+        _wait_for(lambda: broadcaster.subscribers == 2)
+
+        log_entries(logger, ("sad", "Call a friend", None), ("tired", "Take a power nap", None))
+        for _, stream in clients:
+            events = [json.loads(stream.readline()) for _ in range(2)]
+            assert [(event["type"], event["fields"]["task"]) for event in events] == [
+                ("new", "Call a friend"), ("new", "Take a power nap")]
+
+        client, stream = clients[0]
+        stream.close()
+        client.close()
+        log_entries(logger, ("happy", "Sing along", None))
+        assert json.loads(clients[1][1].readline())["fields"]["task"] == "Sing along"
+        _wait_for(lambda: broadcaster.subscribers == 1)
+        clients[1][1].close()
+        clients[1][0].close()
+
+
+def test_subscribe_reads_the_greeting_and_events(make_logger, tmp_path):
+    logger = make_logger()
+    with moodmate.FeedBroadcaster(logger, str(tmp_path / "feed.sock"), poll_interval=0.05) as broadcaster:
+        stream = moodmate.subscribe(broadcaster.socket_path)
+        assert next(stream) == {"seq": logger.feed_head()}
+        _wait_for(lambda: broadcaster.subscribers == 1)
+        log_entries(logger, ("happy", "Dance it out", None))
+        assert next(stream)["fields"]["mood"] == "happy"
+        stream.close()
+
+
+def test_a_stalled_subscriber_does_not_hold_up_the_others(make_logger, tmp_path, monkeypatch):
+    monkeypatch.setattr(moodmate, "FEED_SEND_TIMEOUT", 30.0)
+    monkeypatch.setattr(moodmate, "FEED_CLIENT_BACKLOG", 16)
+    logger = make_logger()
+    with moodmate.FeedBroadcaster(logger, str(tmp_path / "feed.sock"), poll_interval=0.05) as broadcaster:
+        stalled, _ = _connect(broadcaster.socket_path) # Never reads past its socket buffer
+        client, stream = _connect(broadcaster.socket_path)
+        stream.readline()
+        _wait_for(lambda: broadcaster.subscribers == 2)
+
+        note = "x" * 20000
+        started = time.monotonic()
+        for batch in range(0, 80, 8):
+            log_entries(logger, *[("happy", f"Dance it out {n}", note) for n in range(batch, batch + 8)])
+            tasks = [json.loads(stream.readline())["fields"]["task"] for _ in range(8)]
+            assert tasks == [f"Dance it out {n}" for n in range(batch, batch + 8)]
+        assert time.monotonic() - started < 10 # Well before the stalled client times out
+        _wait_for(lambda: broadcaster.subscribers == 1) # Fell too far behind and was dropped
+        stalled.close()
+        stream.close()
+        client.close()
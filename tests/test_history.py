@@ -0,0 +1,89 @@
+import pytest
+
+import moodmate
+from conftest import log_entries
+
+
+def _tasks(logger):
+    return [entry["task"] for entry in logger.get_all_logs()]
+
+
+def test_edits_and_deletes_undo_and_redo_without_rewriting_the_log(make_logger):
+    logger = make_logger()
+    log_entries(logger, ("happy", "One", None), ("sad", "Two", None), ("tired", "Three", None))
+    inode = moodmate._file_signature(logger.log_file)
+
+    logger.edit_entry(0, task="Uno")
+    logger.delete_entry(1)
+    assert _tasks(logger) == ["Uno", "Three"]
+    assert moodmate._file_signature(logger.log_file) == inode
+
+    logger.undo()
+    assert _tasks(logger) == ["Uno", "Two", "Three"]
+    logger.undo()
+    assert _tasks(logger) == ["One", "Two", "Three"]
+    logger.redo()
+    assert _tasks(logger) == ["Uno", "Two", "Three"]
+
+    moodmate.invalidate_log_cache() # A new process replays the same history
+    assert _tasks(make_logger()) == ["Uno", "Two", "Three"]
+
+
+def test_undo_and_redo_survive_compaction(make_logger):
+    logger = make_logger()
+    log_entries(logger, ("happy", "One", None), ("sad", "Two", None), ("tired", "Three", None))
+    logger.edit_entry(2, note="later")
+    logger.delete_entry(0)
+
+    result = logger.compact(raw_days=None, daily_days=None, max_entries=None)
+    assert result["rolled_up"] == 0
+    assert not moodmate._history_overlay(logger.log_file) # Folded into the stored log
+    assert _tasks(logger) == ["Two", "Three"]
+
+    logger.undo()
+    assert _tasks(logger) == ["One", "Two", "Three"]
+    logger.undo()
+    assert logger.get_all_logs()[2]["note"] is None
+    logger.redo()
+    logger.redo()
+    assert _tasks(logger) == ["Two", "Three"] and logger.get_all_logs()[1]["note"] == "later"
+    assert logger.redo() == [] # Nothing left to redo
+
+
+def test_pruning_keeps_only_the_newest_undo_steps(make_logger):
+    logger = make_logger()
+    log_entries(logger, ("happy", "One", None))
+    for i in range(5):
+        logger.edit_entry(0, note=f"v{i}")
+    assert logger.prune_history(depth=2) > 0
+    moodmate.invalidate_log_cache()
+    logger = make_logger()
+    assert logger.undo() and logger.undo()
+    assert logger.get_all_logs()[0]["note"] == "v2"
+    assert logger.undo() == []
+
+
+def test_readers_patch_in_the_overlay_without_parsing_the_whole_log(make_logger, monkeypatch):
+    logger = make_logger()
+    log_entries(logger, ("happy", "One", None), ("sad", "Two", None), ("tired", "Three", None), ("sad", "Four", None))
+    logger.complete_task(logger.get_all_logs()[3]["id"])
+    logger.edit_entry(0, mood="sad")
+    logger.delete_entry(1)
+    logger.edit_entry(2, completed=False) # Reopens "Four"
+    expected = logger.get_all_logs()
+
+    moodmate.invalidate_log_cache() # A new process, with the edits still in the overlay
+    logger = make_logger()
+    with monkeypatch.context() as patch:
+        patch.setattr(moodmate.MoodLogger, "_read_logs", lambda self, *args: pytest.fail("parsed the whole log"))
+        assert [entry["task"] for entry in logger.query(moods=["sad"])] == ["One", "Four"]
+        assert [entry["task"] for entry in logger.query(moods=["sad"], sort="-log", limit=1)] == ["Four"]
+        assert [entry["task"] for entry in logger.get_pending_tasks()] == ["One", "Three", "Four"]
+        assert logger.aggregate(workers=2)["by_mood"] == {"sad": 2, "tired": 1}
+
+        assert logger.complete_tasks([expected[0]["id"], expected[1]["id"]]) == 2
+        assert [entry["task"] for entry in logger.get_pending_tasks()] == ["Four"]
+    assert [(entry["task"], entry["completed"]) for entry in logger.get_all_logs()] == [
+        ("One", True), ("Three", True), ("Four", False)]
+    logger.undo()
+    assert [entry["task"] for entry in logger.get_pending_tasks()] == ["One", "Three", "Four"]
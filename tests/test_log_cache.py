@@ -0,0 +1,41 @@
+import json
+
+import moodmate
+from conftest import log_entries
+
+
+def test_back_to_back_reads_parse_the_log_once(make_logger, monkeypatch):
+    logger = make_logger()
+    log_entries(logger, ("happy", "Dance it out", None), ("sad", "Call a friend", "rainy"))
+    moodmate.invalidate_log_cache()
+    parses = []
+    read_logs = moodmate.MoodLogger._read_logs
+    monkeypatch.setattr(moodmate.MoodLogger, "_read_logs", lambda self, f, *args: parses.append(f.name) or read_logs(self, f, *args))
+
+    assert len(logger.get_all_logs()) == 2
+    logger.get_mood_stats()
+    logger.get_recent_moods(7)
+    assert len(make_logger().get_all_logs()) == 2 # Another logger on the same file shares the parse
+    assert len(parses) == 1
+
+    log_entries(logger, ("tired", "Take a power nap", None)) # Writes prime the cache with what they stored
+    assert [entry["task"] for entry in logger.get_all_logs()][-1] == "Take a power nap"
+    assert len(parses) == 1
+
+
+def test_a_rewrite_by_another_process_is_picked_up(make_logger):
+    logger = make_logger()
+    log_entries(logger, ("happy", "Dance it out", None))
+    stored = logger.get_all_logs()[0]
+
+    with open(logger.log_file, 'w') as f:
+        json.dump([{"timestamp": stored["timestamp"], "mood": "sad", "task": "Call a friend",
+                    "note": None, "completed": False}], f, indent=4)
+    assert [(entry["mood"], entry["task"]) for entry in logger.get_all_logs()] == [("sad", "Call a friend")]
+
+
+def test_callers_cannot_corrupt_the_cached_log(make_logger):
+    logger = make_logger()
+    log_entries(logger, ("happy", "Dance it out", None))
+    logger.get_all_logs().clear()
+    assert len(logger.get_all_logs()) == 1
@@ -0,0 +1,40 @@
+import moodmate
+
+MOODS = ["happy", "sad", "tired", "stressed", "motivated", "sad"]
+
+
+def _history(logger, count=300, start=1_700_000_000):
+    entries = []
+    for i in range(count):
+        entry = moodmate.MoodLogger.build_entry(MOODS[i * 7 % len(MOODS)], f"task {i}", f"note {i}" if i % 5 == 0 else None)
+        entry.update(ts=start + i * 7200, tz=3600 if i % 3 else 0, completed=i % 4 == 0)
+        entries.append(entry)
+    logger.append_entries(entries)
+    return entries
+
+
+def test_parallel_stats_equal_the_serial_fold(make_logger):
+    logger = make_logger()
+    entries = _history(logger)
+    serial = logger.aggregate()
+    assert serial["total"] == 300 and serial["transitions"]
+
+    for workers in (2, 3):
+        assert logger.aggregate(workers=workers) == serial
+    assert logger.aggregate(tz=-18000, workers=2) == logger.aggregate(tz=-18000)
+
+    since, until = entries[40]["ts"], entries[250]["ts"]
+    assert logger.aggregate(since, until, workers=3) == logger.aggregate(since, until)
+    assert logger.aggregate(since, until)["total"] == 210
+
+
+def test_chunks_cover_the_file_on_line_boundaries(make_logger):
+    logger = make_logger()
+    _history(logger, count=50)
+    ranges = moodmate._chunk_ranges(logger.log_file, 8)
+    with open(logger.log_file, 'rb') as f:
+        data = f.read()
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert all(data[start - 1:start] == b"\n" for start, _ in ranges[1:])
+    assert moodmate.map_reduce_stats(logger.log_file, workers=2) == moodmate._fold_entries(logger.get_all_logs())
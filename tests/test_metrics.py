@@ -0,0 +1,50 @@
+import glob
+
+import pytest
+
+import moodmate
+from conftest import log_entries
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    """A fresh, enabled registry; the instrumented methods are put back afterwards."""
+    registry = moodmate.Metrics()
+    monkeypatch.setattr(moodmate, "METRICS", registry)
+    for cls in (moodmate.MoodLogger, moodmate.MoodAnalyzer):
+        for attr, value in list(vars(cls).items()):
+            if not attr.startswith("_"):
+                monkeypatch.setattr(cls, attr, value)
+    registry.enable()
+    return registry
+
+
+def test_methods_are_only_wrapped_once_metrics_are_enabled(make_logger):
+    assert not getattr(moodmate.MoodLogger.log_mood, "__wrapped_by_metrics__", False)
+    assert not moodmate.METRICS.enabled
+
+
+def test_calls_latency_and_io_are_recorded_per_operation(make_logger, metrics):
+    logger = make_logger()
+    log_entries(logger, ("happy", "Dance it out", None), ("sad", "Call a friend", "rainy"))
+    logs = logger.get_all_logs()
+    moodmate.MoodAnalyzer.generate_weekly_summary(logs)
+
+    ops = metrics.snapshot()
+    assert ops["MoodLogger.log_mood"]["calls"] == 2
+    assert ops["MoodLogger.log_mood"]["bytes_written"] > 0
+    assert sum(ops["MoodLogger.log_mood"]["buckets"]) == 2
+    assert ops["MoodAnalyzer.generate_weekly_summary"]["entries_scanned"] == 2
+
+    exposition = metrics.to_prometheus()
+    assert 'moodmate_op_duration_seconds_count{op="MoodLogger.log_mood"} 2' in exposition
+    assert 'moodmate_op_duration_seconds_bucket{op="MoodLogger.log_mood",le="+Inf"} 2' in exposition
+    assert "MoodLogger.log_mood" in metrics.format_report()
+
+
+def test_profile_flow_writes_a_cprofile_dump(make_logger, monkeypatch):
+    monkeypatch.setenv(moodmate.PROFILE_ENV_VAR, "cprofile")
+    logger = make_logger()
+    with moodmate.profile_flow("_view_stats"):
+        logger.get_mood_stats()
+    assert len(glob.glob(f"{moodmate.EXPORT_FOLDER}/profile_view_stats_*.prof")) == 1
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+import moodmate
+
+
+def _legacy_log(path, count):
+    """A log as the first MoodMate wrote it: indent=4, no header, no ids, no epoch fields."""
+    with open(path, 'w') as f:
+        json.dump([
+            {"timestamp": f"2020-01-{i % 28 + 1:02d}T09:{i % 60:02d}:00", "mood": ("happy", "sad", "tired")[i % 3],
+             "task": f"task {i}"}
+            for i in range(count)
+        ], f, indent=4)
+
+
+def _stored(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_a_legacy_log_is_streamed_into_the_current_schema(tmp_path, make_logger):
+    source, output = tmp_path / "old.json", tmp_path / "moodmate_log.json"
+    _legacy_log(source, 12)
+    assert moodmate.migrate_log(str(source), str(output)) == 12
+
+    header, *records = _stored(output)
+    assert header == {"format": moodmate.LOG_FORMAT, "schema": moodmate.SCHEMA_VERSION}
+    assert all(moodmate.ENTRY_KEYS <= record.keys() for record in records)
+    assert (records[0]["completed"], records[0]["note"]) == (False, None)
+    assert len({record["id"] for record in records}) == 12
+
+    logger = make_logger("moodmate_log.json")
+    assert [entry["task"] for entry in logger.get_all_logs()] == [f"task {i}" for i in range(12)]
+    assert len(logger.get_pending_tasks()) == 12
+
+
+def test_an_interrupted_migration_resumes_from_its_checkpoint(tmp_path, monkeypatch):
+    source, output = tmp_path / "old.json", tmp_path / "new.json"
+    _legacy_log(source, 35)
+    migrate_entry = moodmate.migrate_entry
+    calls = []
+
+    def crash_after_25(entry, version=0):
+        calls.append(entry["task"])
+        if len(calls) > 25:
+            raise KeyboardInterrupt
+        return migrate_entry(entry, version)
+
+    monkeypatch.setattr(moodmate, "migrate_entry", crash_after_25)
+    with pytest.raises(KeyboardInterrupt):
+        moodmate.migrate_log(str(source), str(output), checkpoint_every=10)
+    assert not output.exists()
+    assert json.loads((tmp_path / "new.json.migrate.json").read_text())["records"] == 20
+
+    calls.clear()
+    monkeypatch.setattr(moodmate, "migrate_entry", lambda entry, version=0: calls.append(entry["task"]) or migrate_entry(entry, version))
+    assert moodmate.migrate_log(str(source), str(output), checkpoint_every=10) == 35
+    assert calls == [f"task {i}" for i in range(20, 35)] # Only what the checkpoint had not covered
+    assert [record["task"] for record in _stored(output)[1:]] == [f"task {i}" for i in range(35)]
+    assert not (tmp_path / "new.json.migrate.json").exists()
+
+
+def test_loading_an_old_log_upgrades_it_once(make_logger):
+    logger = make_logger()
+    _legacy_log(logger.log_file, 3)
+    assert [entry["mood"] for entry in logger.get_all_logs()] == ["happy", "sad", "tired"]
+    assert moodmate._is_header(_stored(logger.log_file)[0]) # Saved in the current schema
@@ -0,0 +1,80 @@
+import json
+import shutil
+
+import pytest
+
+import moodmate
+from conftest import log_entries
+
+
+@pytest.fixture
+def lexicon(tmp_path, monkeypatch):
+    """A private copy of the shipped lexicon, with the per-process caches reset."""
+    path = tmp_path / "en.lexicon.json"
+    shutil.copy(moodmate.lexicon_path("en"), path)
+    monkeypatch.setattr(moodmate, "lexicon_path", lambda locale=None: str(path))
+    monkeypatch.setattr(moodmate, "_LEXICONS", {})
+    monkeypatch.setattr(moodmate, "_NOTE_TAGS", {})
+    return path
+
+
+@pytest.fixture
+def analyzed(monkeypatch):
+    """Records every note that actually gets analyzed."""
+    notes = []
+    analyze_note = moodmate.analyze_note
+    monkeypatch.setattr(moodmate, "analyze_note", lambda note, lexicon: notes.append(note) or analyze_note(note, lexicon))
+    return notes
+
+
+def test_notes_get_themes_keywords_and_a_tone(lexicon):
+    words = moodmate.load_lexicon(str(lexicon))
+    result = moodmate.analyze_note("Great workout at the gym with friends", words)
+    assert result["tags"] == ["exercise", "social"]
+    assert "workout" in result["keywords"] and result["sentiment"] > 0
+    assert moodmate.analyze_note("Not great, the deadline at work", words)["sentiment"] < 0
+    assert moodmate.analyze_note("very happy", words)["sentiment"] > moodmate.analyze_note("happy", words)["sentiment"]
+
+
+def test_each_distinct_note_is_analyzed_once(make_logger, lexicon, analyzed):
+    logger = make_logger()
+    notes = ["Slept badly", "Long run", "Slept badly"]
+    first = logger.note_tags(notes)
+    assert analyzed == ["Slept badly", "Long run"]
+    assert first[moodmate.note_hash("Slept badly")]["tags"] == ["sleep"]
+
+    logger.note_tags(["Long run", "Dinner with mum"])
+    assert analyzed[2:] == ["Dinner with mum"]
+
+    moodmate._NOTE_TAGS.clear() # A new process reads the cache file instead of re-tagging
+    assert logger.note_tags(notes + ["Dinner with mum"])[moodmate.note_hash("Dinner with mum")]["tags"] == ["food", "family"]
+    assert len(analyzed) == 3
+
+
+def test_changing_the_lexicon_tags_everything_again(make_logger, lexicon, analyzed):
+    logger = make_logger()
+    logger.note_tags(["Long run"])
+    words = json.loads(lexicon.read_text())
+    words["tags"]["exercise"].remove("run")
+    lexicon.write_text(json.dumps(words))
+    moodmate._LEXICONS.clear()
+    moodmate._NOTE_TAGS.clear()
+
+    assert logger.note_tags(["Long run"])[moodmate.note_hash("Long run")]["tags"] == []
+    assert analyzed == ["Long run", "Long run"]
+
+
+def test_backfill_and_insights_cover_the_whole_log(make_logger, lexicon, analyzed):
+    logger = make_logger()
+    log_entries(logger, ("happy", "Dance it out", "Great yoga class"), ("stressed", "Go for a walk", "Deadline at work"),
+                ("tired", "Take a power nap", None), ("stressed", "Journal", "Deadline at work"))
+    assert logger.tag_all_notes() == 2
+    assert logger.tag_all_notes() == 0
+    assert len(analyzed) == 2
+
+    insights = logger.note_insights()
+    assert insights["tagged"] == 3
+    assert insights["tags"] == {"work": 2, "exercise": 1, "study": 1}
+    assert "deadline" in insights["keywords"]
+    assert [entry["task"] for entry in logger.scan(tags=["work"])] == ["Go for a walk", "Journal"]
+    assert [entry["task"] for entry in logger.scan(min_sentiment=0.1)] == ["Dance it out"]
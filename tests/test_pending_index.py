@@ -0,0 +1,54 @@
+import json
+import os
+
+import pytest
+
+import moodmate
+from conftest import log_entries
+
+
+def _tasks(entries):
+    return [entry["task"] for entry in entries]
+
+
+def test_completing_tasks_patches_their_lines_in_place(make_logger):
+    logger = make_logger()
+    log_entries(logger, ("happy", "Dance it out", None), ("sad", "Call a friend", None), ("tired", "Take a power nap", None))
+    ids = [entry["id"] for entry in logger.get_all_logs()]
+    assert [entry["id"] for entry in logger.get_pending_tasks()] == ids
+
+    inode = os.stat(logger.log_file).st_ino
+    assert logger.complete_tasks([ids[0], ids[2], "no-such-id"]) == 2
+    assert os.stat(logger.log_file).st_ino == inode # Not rewritten
+    assert _tasks(logger.get_pending_tasks()) == ["Call a friend"]
+    assert logger.complete_task(ids[0]) is False # Already done
+
+    moodmate.invalidate_log_cache()
+    with open(logger.log_file) as f:
+        json.load(f) # Still one valid JSON array
+    assert [entry["completed"] for entry in logger.get_all_logs()] == [True, False, True]
+
+
+def test_pending_tasks_are_read_through_the_index_alone(make_logger, monkeypatch):
+    logger = make_logger()
+    log_entries(logger, ("happy", "Dance it out", None), ("sad", "Call a friend", "rainy"))
+    logger.complete_task(logger.get_all_logs()[0]["id"])
+
+    moodmate.invalidate_log_cache()
+    monkeypatch.setattr(moodmate.MoodLogger, "_read_logs", lambda self, *args: pytest.fail("parsed the whole log"))
+    pending = logger.get_pending_tasks()
+    assert [(entry["task"], entry["note"], entry["completed"]) for entry in pending] == [("Call a friend", "rainy", False)]
+
+
+def test_a_log_rewritten_elsewhere_gets_a_fresh_index(make_logger):
+    logger = make_logger()
+    log_entries(logger, ("happy", "Dance it out", None), ("sad", "Call a friend", None))
+    first, second = logger.get_all_logs()
+    assert len(logger.get_pending_tasks()) == 2
+
+    with open(logger.log_file, 'w') as f: # Written by an older MoodMate, index left behind
+        json.dump([dict(first, completed=True), second], f, indent=4)
+    assert _tasks(logger.get_pending_tasks()) == ["Call a friend"]
+    assert logger.complete_task(second["id"])
+    assert logger.get_pending_tasks() == []
+
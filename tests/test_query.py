@@ -0,0 +1,58 @@
+import moodmate
+from conftest import log_entries
+
+
+def _cold(logger):
+    """Drops the parsed log, so the next query scans the file."""
+    moodmate.invalidate_log_cache(logger.log_file)
+    return logger
+
+
+def test_non_ascii_mood_matches_on_cold_scan(make_logger):
+    logger = make_logger()
+    log_entries(logger, ("müde", "Nap", None), ("happy", "Dance", None), ("müde", "Tea", "早く寝る"))
+
+    warm = [entry["task"] for entry in logger.query(moods=["müde"])]
+    assert warm == ["Nap", "Tea"]
+    assert [entry["task"] for entry in _cold(logger).query(moods=["müde"])] == warm
+    assert [entry["task"] for entry in moodmate.scan_records(logger.log_file, moods=["müde"])] == warm
+
+
+
+def test_compiled_filter_precheck_never_rejects_a_match():
+    entries = [
+        {"id": "a", "ts": 100, "tz": 0, "mood": "sad", "task": "Run", "note": None, "completed": False},
+        {"id": "b", "ts": 200, "tz": 0, "mood": "müde", "task": "Nap", "note": "", "completed": True},
+        {"id": "c", "ts": 300, "tz": 0, "mood": "happy", "task": "Read", "note": "Long RUN", "completed": True},
+    ]
+    filters = [
+        {"moods": ["müde", "happy"]}, {"moods": []}, {"since": 200}, {"until": 200}, {"since": 150, "until": 300},
+        {"completed": True, "has_note": True}, {"has_note": False}, {"text": "run"},
+        {"note_filter": lambda note: "long" in note.lower()},
+    ]
+    for options in filters:
+        predicate, precheck = moodmate.compile_filter(**options)
+        for entry in entries:
+            line = moodmate._encode_record(entry).encode()
+            if predicate(entry):
+                assert precheck(line), (options, entry["id"])
+    predicate, precheck = moodmate.compile_filter(completed=True, has_note=True)
+    assert [entry["id"] for entry in entries if predicate(entry)] == ["c"]
+    assert moodmate.compile_filter() == (None, None)
+
+
+def test_cold_and_warm_queries_agree(make_logger):
+    logger = make_logger()
+    log_entries(logger, *[(mood, f"{mood} task {i}", note) for i, (mood, note) in enumerate(
+        [("happy", None), ("sad", "Rainy day"), ("stressed", ""), ("happy", "Ran 5k"), ("sad", None), ("tired", "ÄÖÜ run")] * 3)])
+    logger.complete_task(logger.get_all_logs()[1]["id"])
+    ts = [entry["ts"] for entry in logger.get_all_logs()]
+    queries = [
+        {}, {"moods": ["sad", "tired"]}, {"completed": True}, {"completed": False, "moods": ["happy"]},
+        {"has_note": True}, {"has_note": False}, {"text": "RUN"}, {"text": "äöü"},
+        {"since": ts[3], "until": ts[-1]}, {"sort": "-log", "limit": 4}, {"sort": "mood", "limit": 5},
+        {"moods": []},
+    ]
+    for filters in queries:
+        warm = logger.query(**filters)
+        assert _cold(logger).query(**filters) == warm, filters
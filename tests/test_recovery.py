@@ -0,0 +1,107 @@
+import glob
+import json
+
+import pytest
+
+import moodmate
+from conftest import log_entries
+
+
+def _cut_closing_bracket(path):
+    with open(path, 'rb+') as f:
+        data = f.read()
+        assert data.endswith(b"\n]\n")
+        f.seek(len(data) - 3)
+        f.truncate()
+
+
+def test_torn_tail_is_cut_off_and_set_aside(make_logger, tmp_path):
+    logger = make_logger()
+    log_entries(logger, ("happy", "One", None), ("sad", "Two", None), ("tired", "Three", "tea"))
+    _cut_closing_bracket(logger.log_file)
+    with open(logger.log_file, 'ab') as f:
+        f.write(b',\n{"id": "torn", "mood": "ha') # Killed in the middle of an append
+
+    moodmate.invalidate_log_cache()
+    reopened = make_logger()
+    assert [entry["task"] for entry in reopened.get_all_logs()] == ["One", "Two", "Three"]
+    with open(reopened.log_file) as f:
+        assert len(json.load(f)) == 4 # Header and three entries: valid JSON again
+    aside = glob.glob(str(tmp_path / "moodmate_log.torn-*.txt"))
+    assert len(aside) == 1
+    with open(aside[0], 'rb') as f:
+        assert b'"id": "torn"' in f.read()
+
+    log_entries(reopened, ("happy", "Four", None)) # Appending continues from the repaired log
+    moodmate.invalidate_log_cache()
+    assert [entry["task"] for entry in make_logger().get_all_logs()] == ["One", "Two", "Three", "Four"]
+
+
+def test_intact_records_written_before_a_crash_are_kept(make_logger):
+    logger = make_logger()
+    log_entries(logger, ("happy", "One", None))
+    _cut_closing_bracket(logger.log_file)
+    entry = moodmate.MoodLogger.build_entry("sad", "Written, not closed")
+    with open(logger.log_file, 'ab') as f:
+        f.write(b",\n" + moodmate._encode_record(entry).encode()) # Killed before the closing bracket
+
+    moodmate.invalidate_log_cache()
+    reopened = make_logger()
+    assert [entry["task"] for entry in reopened.get_all_logs()] == ["One", "Written, not closed"]
+    assert [change["id"] for change in reopened.changes_since(0)][-1] == entry["id"] # Caught up in the change log
+
+
+
+def _tamper(path, old, new):
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert len(old) == len(new) and data.count(old) == 1
+    with open(path, 'wb') as f:
+        f.write(data.replace(old, new))
+
+
+def test_a_record_failing_its_checksum_is_set_aside(make_logger, tmp_path):
+    logger = make_logger()
+    log_entries(logger, ("happy", "One", None), ("sad", "Two", None), ("tired", "Three", None))
+    _tamper(logger.log_file, b'"task": "Two"', b'"task": "Six"')
+
+    with pytest.raises(ValueError):
+        list(moodmate.scan_records(logger.log_file))
+    moodmate.invalidate_log_cache()
+    reopened = make_logger()
+    assert [entry["task"] for entry in reopened.query(moods=["sad", "tired"])] == ["Three"] # Cold scan, then a full load
+    assert [entry["task"] for entry in reopened.get_all_logs()] == ["One", "Three"]
+    aside = glob.glob(str(tmp_path / "moodmate_log.damaged-*.txt"))
+    assert len(aside) == 1
+    with open(aside[0], 'rb') as f:
+        assert b'"task": "Six"' in f.read()
+    assert len(list(moodmate.scan_records(reopened.log_file))) == 2 # The log on disk no longer holds it
+
+
+def test_a_damaged_backup_is_not_restored(make_logger, tmp_path):
+    logger = make_logger()
+    log_entries(logger, ("happy", "One", None), ("sad", "Two", None))
+    backup = logger.backup()
+    _tamper(backup, b'"task": "One"', b'"task": "Uno"')
+    with pytest.raises(ValueError):
+        logger.restore(backup)
+    assert [entry["task"] for entry in logger.get_all_logs()] == ["One", "Two"]
+
+
+def test_checkpoints_are_replaced_whole(make_logger, monkeypatch):
+    logger = make_logger()
+    log_entries(logger, ("happy", "One", None))
+    with open(logger.pending_index_file) as f:
+        before = f.read()
+    replace = moodmate.os.replace
+
+    def crash_on_checkpoint(src, dst):
+        if dst == logger.pending_index_file:
+            raise OSError("disk full")
+        replace(src, dst)
+
+    monkeypatch.setattr(moodmate.os, "replace", crash_on_checkpoint)
+    with pytest.raises(OSError):
+        logger.complete_tasks([logger.get_pending_tasks()[0]["id"]])
+    with open(logger.pending_index_file) as f:
+        assert f.read() == before
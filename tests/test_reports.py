@@ -0,0 +1,51 @@
+import json
+import os
+
+import moodmate
+from conftest import log_entries
+
+
+def report(make_logger):
+    logger = make_logger()
+    log_entries(logger, ("happy", "Dance it out", "Great yoga class"), ("stressed", "Go for a walk", "Deadline <at> work"),
+                ("happy", "Call a friend", None))
+    logger.complete_task(logger.get_pending_tasks()[0]["id"])
+    return logger, moodmate.ReportPipeline(logger)
+
+
+def test_every_format_is_written_with_the_same_facts(make_logger):
+    logger, pipeline = report(make_logger)
+    since, until = pipeline.period(7)
+    paths = pipeline.generate(since, until, title="Week")
+    assert [os.path.splitext(path)[1] for path in paths] == [".txt", ".md", ".html", ".json"]
+    assert all(os.path.dirname(path) == os.path.join(logger.export_folder, moodmate.REPORT_FOLDER) for path in paths)
+    txt, md, page, data = (open(path, encoding="utf-8").read() for path in paths)
+
+    assert txt.startswith("Week\n====\n") and "- Total entries: 3" in txt and "- Tasks completed: 1 of 3 (33.3%)" in txt
+    assert md.startswith("# Week\n") and "## Most Frequent Moods" in md and "- Happy 😊: 2 times (67%)" in md
+    assert "<h1>Week</h1>" in page and "Deadline &lt;at&gt; work" in page and "<at>" not in page
+    sections = json.loads(data)["sections"]
+    assert list(sections) == list(moodmate.REPORT_SECTIONS)
+    assert sections["overview"]["total"] == 3 and sections["overview"]["completed"] == 1
+
+
+def test_an_empty_period_says_so(make_logger):
+    logger, pipeline = report(make_logger)
+    since, until = pipeline.period(7, moodmate.datetime(2020, 3, 1))
+    txt, = pipeline.generate(since, until, formats=("txt",))
+    assert "No entries in this period." in open(txt, encoding="utf-8").read()
+
+
+def test_reruns_rebuild_only_the_sections_a_change_touches(make_logger):
+    logger, pipeline = report(make_logger)
+    since, until = pipeline.period(7)
+    pipeline.generate(since, until)
+    assert sorted(pipeline.last_run["built"]) == sorted(moodmate.REPORT_SECTIONS)
+
+    pipeline.generate(since, until)
+    assert pipeline.last_run["built"] == []
+
+    logger.complete_task(logger.get_pending_tasks()[0]["id"])
+    txt = pipeline.generate(since, until, formats=("txt",))[0]
+    assert "overview" in pipeline.last_run["built"] and "notes" in pipeline.last_run["reused"]
+    assert "- Tasks completed: 2 of 3 (66.7%)" in open(txt, encoding="utf-8").read()
@@ -0,0 +1,95 @@
+import os
+import time
+
+import moodmate
+
+DAY = moodmate.SECONDS_PER_DAY
+
+
+def _at(ts, mood, task, note=None):
+    entry = moodmate.MoodLogger.build_entry(mood, task, note)
+    entry.update(ts=ts, tz=0)
+    return entry
+
+
+def test_old_entries_are_rolled_up_without_changing_the_totals(make_logger):
+    logger = make_logger()
+    now = int(time.time())
+    logger.append_entries([
+        _at(now - 800 * DAY, "sad", "Call a friend", "long ago"), _at(now - 799 * DAY, "tired", "Take a power nap"),
+        _at(now - 400 * DAY, "happy", "Dance it out"), _at(now - 400 * DAY + 60, "sad", "Journal", "rainy"),
+        _at(now - 2 * DAY, "happy", "Sing along"), _at(now - 60, "motivated", "Start the project"),
+    ])
+    before = logger.get_mood_stats()
+
+    result = logger.compact(now=now)
+    assert (result["rolled_up"], result["kept"], result["daily_rollups"]) == (4, 2, 1)
+    assert result["downsampled"] == 2 and result["weekly_rollups"] in (1, 2)
+    assert [entry["task"] for entry in logger.get_all_logs()] == ["Sing along", "Start the project"]
+
+    after = logger.get_mood_stats()
+    for key in ("total", "completed", "notes_count"):
+        assert after[key] == before[key]
+    assert dict(after["by_mood"]) == dict(before["by_mood"])
+    rolled_day = moodmate._day_to_date((now - 400 * DAY) // DAY)
+    assert after["by_day"][rolled_day] == 2
+    week = moodmate._day_to_date(moodmate._week_of((now - 800 * DAY) // DAY))
+    assert after["by_day"][week] >= 1 and week.weekday() == 0 # Weekly rollups are dated to their Monday
+
+    rollups = logger._load_rollups()
+    assert "rainy" in rollups["daily"][str((now - 400 * DAY) // DAY)]["notes"]
+    assert logger.compact(now=now)["rolled_up"] == 0
+
+
+def test_compaction_runs_on_its_schedule(make_logger):
+    logger = make_logger()
+    assert logger.compact_if_due(interval_hours=24) is not None # Never compacted yet
+    assert logger.compact_if_due(interval_hours=24) is None
+    assert logger.compact_if_due(interval_hours=0) is not None
+
+
+def test_the_entry_cap_rolls_up_the_oldest_entries(make_logger):
+    logger = make_logger()
+    now = int(time.time())
+    logger.append_entries([_at(now - 10 * DAY + i, "happy", f"task {i}") for i in range(10)])
+    result = logger.compact(max_entries=4, now=now)
+    assert result["rolled_up"] == 6
+    assert [entry["task"] for entry in logger.get_all_logs()] == [f"task {i}" for i in range(6, 10)]
+    assert logger.get_mood_stats()["total"] == 10
+
+
+def test_overflow_compaction_runs_once_per_batch(make_logger, monkeypatch):
+    monkeypatch.setattr(moodmate, "MAX_LOG_ENTRIES", 20)
+    logger = make_logger()
+    start = int(time.time()) - 30 * DAY
+    rewrites, inode = 0, None
+    for i in range(40):
+        logger.append_entries([_at(start + i * 60, "happy", f"task {i}")])
+        current = os.stat(logger.log_file).st_ino
+        rewrites += inode is not None and current != inode
+        inode = current
+
+    assert rewrites == 7 # Back to 18 entries at appends 21, 24, ..., 39 instead of at every one past 20
+    assert len(logger.get_all_logs()) <= 20
+    assert logger.get_mood_stats()["total"] == 40 # Rolled up, not dropped
+    assert logger._load_rollups()["compacted_at"] == 0 # The cap does not count as a scheduled run
+    assert logger.compact_if_due(interval_hours=24) is not None
+
+
+def test_the_entry_cap_keeps_the_summary_window(make_logger, monkeypatch):
+    monkeypatch.setattr(moodmate, "MAX_LOG_ENTRIES", 10)
+    logger = make_logger()
+    now = int(time.time())
+    logger.append_entries([_at(now - 20 * DAY + i, "sad", f"old {i}") for i in range(4)])
+    for i in range(12):
+        logger.append_entries([_at(now - DAY + i, "happy", f"recent {i}")])
+
+    tasks = [entry["task"] for entry in logger.get_all_logs()]
+    assert tasks == [f"recent {i}" for i in range(12)] # Over the cap, but the week's summary needs them
+    assert len(logger.get_recent_moods(moodmate.SUMMARY_DAYS)) == 12
+    assert logger.get_mood_stats()["total"] == 16
+
+    compactions = []
+    monkeypatch.setattr(moodmate.MoodLogger, "compact", lambda self, **kwargs: compactions.append(kwargs))
+    logger.append_entries([_at(now - 60, "happy", "one more")])
+    assert compactions == [] # Nothing to roll up until the oldest recent entry leaves the window
@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+from moodmate_server import MoodMateServer
+
+
+class _Writer:
+    """Collects what the server writes to one connection."""
+
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data: bytes) -> None:
+        self.data += data
+
+    async def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+async def _request(server: MoodMateServer, method: str, path: str, body=None, headers: str = ""):
+    payload = json.dumps(body).encode() if body is not None else b""
+    if "content-length" not in headers.lower():
+        headers += f"Content-Length: {len(payload)}\r\n"
+    reader = asyncio.StreamReader()
+    reader.feed_data(f"{method} {path} HTTP/1.1\r\nConnection: close\r\n{headers}\r\n".encode() + payload)
+    reader.feed_eof()
+    writer = _Writer()
+    await server.handle_connection(reader, writer)
+    head, _, response = writer.data.partition(b"\r\n\r\n")
+    return int(head.split(b" ")[1]), json.loads(response)
+
+
+def _serve(logger, scenario):
+    async def run():
+        server = MoodMateServer(logger, compact_every_hours=0)
+        server._write_queue = asyncio.Queue()
+        server._batcher = asyncio.create_task(server._batch_writer())
+        try:
+            return await scenario(server)
+        finally:
+            server._batcher.cancel()
+            server.executor.shutdown(wait=True)
+    return asyncio.run(run())
+
+
+def test_log_rejects_wrongly_typed_fields(make_logger):
+    async def scenario(server):
+        assert (await _request(server, "POST", "/log", {"mood": "happy", "task": "Walk", "note": 5}))[0] == 400
+        assert (await _request(server, "POST", "/log", {"mood": ["happy"], "task": "Walk"}))[0] == 400
+        status, entry = await _request(server, "POST", "/log", {"mood": "happy", "task": "Walk", "note": "fresh air"})
+        assert status == 201 and entry["note"] == "fresh air"
+        assert (await _request(server, "GET", "/stats"))[0] == 200
+        assert (await _request(server, "GET", "/summary"))[0] == 200
+
+    _serve(make_logger(), scenario)
+
+
+def test_malformed_content_length_is_a_bad_request(make_logger):
+    async def scenario(server):
+        for length in ("abc", "-5"):
+            status, payload = await _request(server, "POST", "/log", headers=f"Content-Length: {length}\r\n")
+            assert status == 400 and "Content-Length" in payload["error"]
+
+    _serve(make_logger(), scenario)
+
+
+def test_wrongly_typed_ids_and_policies_are_bad_requests(make_logger):
+    async def scenario(server):
+        assert (await _request(server, "POST", "/complete", {"ids": "abc"}))[0] == 400
+        assert (await _request(server, "POST", "/complete", {"ids": {"abc": 1}}))[0] == 400
+        assert (await _request(server, "POST", "/compact", {"raw_days": True}))[0] == 400
+        status, entry = await _request(server, "POST", "/log", {"mood": "happy", "task": "Walk"})
+        assert (await _request(server, "POST", "/complete", {"ids": [entry["id"]]})) == (200, {"completed": 1})
+
+    _serve(make_logger(), scenario)
+
+
+def test_summary_is_plain_text(make_logger):
+    async def scenario(server):
+        await _request(server, "POST", "/log", {"mood": "tired", "task": "Take a power nap"})
+        status, payload = await _request(server, "GET", "/summary?days=3")
+        assert status == 200 and "\x1b" not in payload["summary"]
+        assert "Total entries: 1" in payload["summary"] and "Tired" in payload["summary"]
+
+    _serve(make_logger(), scenario)
+
+
+def test_changes_wait_for_the_next_event(make_logger):
+    logger = make_logger()
+
+    async def scenario(server):
+        status, payload = await _request(server, "GET", "/changes?since=0")
+        head = payload["seq"]
+        asyncio.get_running_loop().call_later(0.2, logger.log_mood, "happy", "Dance it out", None)
+        status, payload = await _request(server, "GET", f"/changes?since={head}&wait=5")
+        assert status == 200 and [event["fields"]["task"] for event in payload["events"]] == ["Dance it out"]
+        status, payload = await _request(server, "GET", f"/changes?since={payload['seq']}&wait=0.2")
+        assert payload["events"] == []
+
+    _serve(logger, scenario)
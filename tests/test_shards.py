@@ -0,0 +1,67 @@
+import hashlib
+import os
+
+import pytest
+
+import moodmate
+from conftest import log_entries
+
+
+@pytest.fixture
+def router(tmp_path, make_logger):
+    return moodmate.ShardRouter(str(tmp_path / "shards"))
+
+
+def test_users_map_to_hash_bucketed_directories(router):
+    digest = hashlib.sha1(b"alice").hexdigest()
+    assert router.shard_dir("alice") == os.path.join(router.root, digest[:2], "alice")
+
+    odd = "bob/../x y"
+    digest = hashlib.sha1(odd.encode()).hexdigest()
+    assert router.shard_dir(odd) == os.path.join(router.root, digest[:2], f"bob_.._x_y-{digest[:8]}")
+    assert router.shard_dir("a/b") != router.shard_dir("a_b") # Sanitized names do not collide
+    assert router.shard_dir("alice") == router.shard_dir("alice")
+
+
+def test_dot_names_stay_inside_their_bucket(router):
+    for user in (".", "..", "..."):
+        digest = hashlib.sha1(user.encode()).hexdigest()
+        path = router.shard_dir(user)
+        assert path == os.path.join(router.root, digest[:2], f"{user}-{digest[:8]}")
+        assert os.path.dirname(os.path.normpath(path)) == os.path.join(router.root, digest[:2])
+    log_entries(router.logger_for(".."), ("happy", "Dance it out", None))
+    assert router.users() == [".."]
+
+
+def test_each_user_gets_their_own_shard(router):
+    alice, bob = router.logger_for("alice"), router.logger_for(" bob ")
+    assert router.logger_for("alice") is alice
+    log_entries(alice, ("happy", "Dance it out", None))
+    log_entries(bob, ("sad", "Call a friend", None), ("tired", "Take a power nap", None))
+
+    assert os.path.dirname(alice.log_file) == router.shard_dir("alice")
+    assert os.path.dirname(bob.backup_file) == router.shard_dir("bob")
+    assert sorted(router.users()) == ["alice", "bob"]
+    assert [entry["task"] for entry in alice.get_all_logs()] == ["Dance it out"]
+    with pytest.raises(ValueError):
+        router.logger_for("  ")
+
+
+def test_org_totals_only_reread_shards_that_changed(router, monkeypatch):
+    log_entries(router.logger_for("alice"), ("happy", "Dance it out", None), ("sad", "Call a friend", "rain"))
+    log_entries(router.logger_for("bob"), ("happy", "Sing along", None))
+    totals = router.org_aggregates(workers=2)
+    assert (totals["users"], totals["total"], totals["notes_count"]) == (2, 3, 1)
+    assert dict(totals["by_mood"]) == {"happy": 2, "sad": 1}
+    assert router.org_mood_distribution(totals)["happy"] == pytest.approx(200 / 3)
+
+    recomputed = []
+    get_mood_stats = moodmate.MoodLogger.get_mood_stats
+    monkeypatch.setattr(moodmate.MoodLogger, "get_mood_stats",
+                        lambda self, *args, **kwargs: recomputed.append(self.log_file) or get_mood_stats(self, *args, **kwargs))
+    assert router.org_aggregates()["total"] == 3
+    assert recomputed == []
+
+    log_entries(router.logger_for("bob"), ("tired", "Take a power nap", None))
+    assert router.org_aggregates()["total"] == 4
+    assert recomputed == [router.logger_for("bob").log_file]
@@ -0,0 +1,99 @@
+import moodmate
+from conftest import log_entries
+
+
+def _replicas(make_logger):
+    local, remote = make_logger("a/moodmate_log.json"), make_logger("b/moodmate_log.json")
+    assert local.replica_id != remote.replica_id
+    return local, remote
+
+
+def _by_id(logger):
+    return {entry["id"]: entry for entry in logger.get_all_logs()}
+
+
+def _index_of(logger, entry_id):
+    return next(i for i, entry in enumerate(logger.get_all_logs()) if entry["id"] == entry_id)
+
+
+def test_new_entries_reach_both_replicas(make_logger):
+    local, remote = _replicas(make_logger)
+    log_entries(local, ("happy", "Local task", None))
+    log_entries(remote, ("sad", "Remote task", "rain"))
+    assert moodmate.sync_replicas(local, remote) == (1, 1)
+    assert _by_id(local) == _by_id(remote)
+    assert moodmate.sync_replicas(local, remote) == (0, 0) # Only changes since the last sync travel
+
+
+def test_concurrent_edits_merge_per_field(make_logger):
+    local, remote = _replicas(make_logger)
+    log_entries(local, ("happy", "Walk", None))
+    moodmate.sync_replicas(local, remote)
+    entry_id = next(iter(_by_id(local)))
+
+    local.edit_entry(_index_of(local, entry_id), note="from local")
+    remote.edit_entry(_index_of(remote, entry_id), completed=True)
+    remote.edit_entry(_index_of(remote, entry_id), task="Long walk")
+    local.edit_entry(_index_of(local, entry_id), task="Run") # Conflicting field: the later version wins
+    moodmate.sync_replicas(local, remote)
+
+    merged = _by_id(local)[entry_id]
+    assert merged == _by_id(remote)[entry_id]
+    assert (merged["note"], merged["completed"], merged["task"]) == ("from local", True, "Run")
+
+
+def test_delete_wins_over_a_concurrent_edit_until_undone(make_logger):
+    local, remote = _replicas(make_logger)
+    log_entries(local, ("happy", "Walk", None), ("tired", "Tea", None))
+    moodmate.sync_replicas(local, remote)
+    walk = next(entry["id"] for entry in local.get_all_logs() if entry["task"] == "Walk")
+
+    local.delete_entry(_index_of(local, walk))
+    remote.edit_entry(_index_of(remote, walk), note="edited while deleted elsewhere")
+    moodmate.sync_replicas(local, remote)
+    assert walk not in _by_id(local) and walk not in _by_id(remote)
+
+    moodmate.sync_replicas(local, remote) # The tombstone is not lifted by relaying old changes
+    assert walk not in _by_id(remote)
+
+    local.undo()
+    moodmate.sync_replicas(local, remote)
+    assert _by_id(local)[walk]["task"] == _by_id(remote)[walk]["task"] == "Walk"
+
+
+def test_merging_writes_only_the_merged_entries(make_logger, monkeypatch):
+    local, remote = _replicas(make_logger)
+    log_entries(local, ("happy", "Walk", None), ("tired", "Tea", None))
+    moodmate.sync_replicas(local, remote)
+    walk = next(entry["id"] for entry in remote.get_all_logs() if entry["task"] == "Walk")
+    remote.edit_entry(_index_of(remote, walk), note="with the dog")
+    log_entries(remote, ("motivated", "Plan the week", None))
+
+    def rewrite(*args):
+        raise AssertionError("the whole log was rewritten")
+    monkeypatch.setattr(moodmate.MoodLogger, "_save", rewrite)
+    assert moodmate.sync_replicas(local, remote) == (2, 0)
+    assert _by_id(local) == _by_id(remote)
+    assert _by_id(local)[walk]["note"] == "with the dog"
+    assert local.undo() == [] # Merged changes are not the user's to undo
+
+
+def test_changes_every_replica_has_pulled_are_dropped(make_logger, monkeypatch):
+    monkeypatch.setattr(moodmate, "CHANGE_LOG_TRUNCATE_MIN", 2)
+    local, remote = _replicas(make_logger)
+    log_entries(local, ("happy", "Walk", None), ("tired", "Tea", None), ("sad", "Call a friend", None),
+                ("bored", "Read", None), ("inspired", "Sketch", None))
+    moodmate.sync_replicas(local, remote)
+    assert [change["seq"] for change in local.changes_since(0)] == [5] # The versions file has the rest
+
+    moodmate._VERSIONS.clear() # As a new process would: the versions come from the file
+    walk = next(entry["id"] for entry in local.get_all_logs() if entry["task"] == "Walk")
+    local.edit_entry(_index_of(local, walk), note="from local")
+    remote.edit_entry(_index_of(remote, walk), completed=True)
+    moodmate.sync_replicas(local, remote)
+    assert _by_id(local) == _by_id(remote)
+    assert (_by_id(local)[walk]["note"], _by_id(local)[walk]["completed"]) == ("from local", True)
+
+    newcomer = make_logger("c/moodmate_log.json") # Behind the dropped changes: gets a snapshot
+    assert moodmate.sync_replicas(newcomer, local)[0] > 0
+    assert _by_id(newcomer) == _by_id(local)
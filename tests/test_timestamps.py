@@ -0,0 +1,31 @@
+import json
+from datetime import date
+
+import moodmate
+from conftest import log_entries
+
+
+def test_new_entries_carry_an_epoch_and_offset_matching_their_timestamp(make_logger):
+    logger = make_logger()
+    log_entries(logger, ("happy", "Dance it out", None))
+    entry = logger.get_all_logs()[0]
+    assert isinstance(entry["ts"], int) and isinstance(entry["tz"], int)
+    assert moodmate._format_entry_time(entry, "%Y-%m-%dT%H:%M:%S") == entry["timestamp"][:19]
+
+
+def test_legacy_entries_are_upgraded_and_bucketed_by_day(make_logger):
+    logger = make_logger()
+    with open(logger.log_file, 'w') as f:
+        json.dump([
+            {"timestamp": "2020-03-01T23:30:00+00:00", "mood": "happy", "task": "Dance it out", "note": None, "completed": False},
+            {"timestamp": "2020-03-02T08:00:00+00:00", "mood": "sad", "task": "Call a friend", "note": None, "completed": True},
+        ], f, indent=4)
+
+    first, second = logger.get_all_logs()
+    assert (first["ts"], first["tz"]) == (1583105400, 0)
+    assert dict(logger.get_mood_stats(tz=0)["by_day"]) == {date(2020, 3, 1): 1, date(2020, 3, 2): 1}
+    assert dict(logger.get_mood_stats(tz=3600)["by_day"]) == {date(2020, 3, 2): 2}
+    assert dict(logger.get_mood_stats()["by_day"]) == {date(2020, 3, 1): 1, date(2020, 3, 2): 1} # Each in its own offset
+
+    log_entries(logger, ("tired", "Take a power nap", None))
+    assert [entry["task"] for entry in logger.get_recent_moods(7)] == ["Take a power nap"]
@@ -0,0 +1,52 @@
+import moodmate
+
+HOUR = 3600
+START = 1_750_000_000
+
+
+def _entry(i, mood):
+    entry = moodmate.MoodLogger.build_entry(mood, f"task {i}")
+    entry.update(ts=START + i * HOUR, tz=0)
+    return entry
+
+
+def test_the_anomaly_hook_fires_when_moods_shift_toward_distress(make_logger):
+    logger = make_logger()
+    alerts = []
+    logger.add_anomaly_hook(alerts.append)
+    for i in range(20):
+        logger.append_entries([_entry(i, ("happy", "motivated", "inspired")[i % 3])])
+    assert alerts == [] # A steady, pleasant history raises nothing
+
+    distressed = [_entry(20 + i, ("stressed", "overwhelmed", "anxious")[i % 3]) for i in range(6)]
+    for entry in distressed:
+        logger.append_entries([entry])
+    assert alerts and {alert["kind"] for alert in alerts} <= {"distress_shift", "negative_shift", "tension_shift"}
+    assert {alert["id"] for alert in alerts} <= {entry["id"] for entry in distressed}
+    assert alerts[0]["message"] == moodmate.TREND_MESSAGES[alerts[0]["kind"]]
+    assert [anomaly["id"] for anomaly in logger.anomalies(now=START + 26 * HOUR)] == [alert["id"] for alert in alerts]
+
+
+def test_gaps_and_silence_are_flagged_against_the_usual_pace(make_logger):
+    logger = make_logger()
+    logger.append_entries([_entry(i, "happy") for i in range(15)])
+    resumed = _entry(14 + 5 * 24, "happy") # Five days after the last hourly entry
+    logger.append_entries([resumed])
+    assert [(anomaly["kind"], anomaly["id"]) for anomaly in logger.anomalies(now=resumed["ts"])] == [("logging_gap", resumed["id"])]
+
+    silence = logger.anomalies(now=resumed["ts"] + 10 * 24 * HOUR)[-1]
+    assert silence["kind"] == "silence"
+
+
+def test_baselines_are_kept_between_runs_and_ignore_backfill(make_logger):
+    logger = make_logger()
+    logger.append_entries([_entry(i, "happy") for i in range(12)])
+    assert logger.trends()["entries"] == 12
+
+    moodmate.invalidate_log_cache()
+    reopened = make_logger()
+    reopened.append_entries([_entry(12, "tired"), _entry(3, "overwhelmed")]) # The second one is backfill
+    trends = reopened.trends()
+    assert trends["entries"] == 13
+    assert trends["usual_gap_hours"] == 1.0
+    assert trends["valence"] < moodmate.mood_score("happy")[0]
@@ -0,0 +1,35 @@
+import signal
+
+import pytest
+
+import moodmate
+
+
+def test_signal_exit_waits_until_the_main_thread_releases_the_log(make_logger, monkeypatch):
+    logger = make_logger()
+    calls = []
+    monkeypatch.setitem(moodmate._PREVIOUS_SIGNAL_HANDLERS, signal.SIGTERM, lambda signum, frame: calls.append(signum))
+    with logger._lock:
+        with logger._lock:
+            moodmate._exit_on_signal(signal.SIGTERM, None)
+        assert calls == [] # Still inside the outer write
+    assert calls == [signal.SIGTERM]
+
+    moodmate._exit_on_signal(signal.SIGTERM, None)
+    assert calls == [signal.SIGTERM] * 2
+
+
+def test_queued_entries_are_stored_after_a_signal_mid_write(make_logger, monkeypatch):
+    logger = make_logger()
+    logger.enable_write_behind(batch_size=100, delay=60)
+    logger.log_mood("happy", "Queued")
+    monkeypatch.setitem(moodmate._PREVIOUS_SIGNAL_HANDLERS, signal.SIGTERM, signal.SIG_DFL)
+
+    with pytest.raises(SystemExit):
+        with logger._lock:
+            moodmate._exit_on_signal(signal.SIGTERM, None)
+            logger.append_entries([moodmate.MoodLogger.build_entry("tired", "Stored directly")])
+    moodmate.flush_write_behind() # What the atexit hook does
+
+    moodmate.invalidate_log_cache()
+    assert sorted(entry["task"] for entry in make_logger().get_all_logs()) == ["Queued", "Stored directly"]